@@ -0,0 +1,516 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from mysql.connector import Error
+
+from cache import cache
+from db import PoolTimeout, stream_rows
+from search_index import fold
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("soccer.analytics")
+
+########## Analytics Engine #################
+# Optional in-memory copy of Matches and Statistics as NumPy columns, from which standings,
+# leaderboards, top scorers, head-to-head tables and rolling form are computed with
+# vectorized operations instead of per-request SQL:
+#   - facts: one array per column (ints only: dates are day numbers, pass_acc hundredths),
+#     Matches sorted by match_id and Statistics by (match_id, player_id)
+#   - dimensions: Players/Teams/Leagues/Country ids sorted, so ids are integer-coded with
+#     searchsorted and names are looked up by code
+#   - a snapshot: the aggregates derived from both, immutable once built
+# A background task refreshes the facts every ANALYTICS_REFRESH_SECONDS with the rows of the
+# last ANALYTICS_RECENT_DAYS days plus every newer match_id (new matches and late score
+# updates), merged into the arrays by key. Everything is reloaded when a cached-table
+# generation changes (/cache/invalidate, score correction and transfer jobs) and at least
+# every ANALYTICS_RELOAD_SECONDS, which is what picks up deletes and older edits.
+# While a snapshot is older than a known write get() returns None and the endpoints use SQL.
+
+FACT_TABLES = ("Matches", "Statistics")
+DIMENSION_TABLES = ("Players", "Teams", "Leagues", "Country")
+LOAD_BATCH = 100000
+
+# (column, dtype) in the order of the SELECT lists below
+MATCH_COLUMNS = (("match_id", "int32"), ("day", "int32"), ("home", "int32"), ("away", "int32"),
+                 ("home_score", "int16"), ("away_score", "int16"), ("league", "int32"))
+MATCHES_QUERY = """SELECT match_id, DATEDIFF(date, '1970-01-01'), IFNULL(hometeam_id, -1), IFNULL(awayteam_id, -1),
+                          IFNULL(hometeam_score, 0), IFNULL(awayteam_score, 0), IFNULL(league_id, -1)
+                   FROM Matches"""
+
+STAT_COLUMNS = (("match_id", "int64"), ("player_id", "int64"), ("day", "int32"), ("goal", "int16"),
+                ("assist", "int16"), ("pass_acc", "int16"), ("playtime", "int16"))
+STATISTICS_QUERY = """SELECT match_id, player_id, DATEDIFF(match_date, '1970-01-01'), IFNULL(goal, 0),
+                             IFNULL(assist, 0), CAST(IFNULL(pass_acc, 0) * 100 AS SIGNED), IFNULL(playtime, 0)
+                      FROM Statistics"""
+
+# kind -> (query, number of integer columns after id and name)
+DIMENSION_QUERIES = {
+    "players": ("SELECT player_id, playername, IFNULL(team_id, -1), IFNULL(player_nationality_id, -1) FROM Players", 2),
+    "teams": ("SELECT team_id, teamname, IFNULL(league_id, -1) FROM Teams", 1),
+    "leagues": ("SELECT league_id, leaguename FROM Leagues", 0),
+    "countries": ("SELECT country_id, countryname FROM Country", 0),
+}
+
+
+def seasons_of(days):
+    """Season (starting year) of each day number: seasons start in July, as in TeamStandings."""
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return (months // 12 + 1970 - (months % 12 < 6)).astype(np.int32)
+
+
+def season_days(season):
+    """[first, last + 1) day numbers of a season."""
+    return (int(np.datetime64(f"{season}-07-01", "D").astype(np.int64)),
+            int(np.datetime64(f"{season + 1}-07-01", "D").astype(np.int64)))
+
+
+def _code(ids, values):
+    """Position of each value in the sorted `ids`, -1 where it is missing."""
+    values = np.asarray(values)
+    if not len(ids):
+        return np.full(len(values), -1, np.int32)
+    positions = np.minimum(np.searchsorted(ids, values), len(ids) - 1)
+    return np.where(ids[positions] == values, positions, -1).astype(np.int32)
+
+
+def _rank(values):
+    """RANK() OVER (ORDER BY value DESC): 1 + the number of strictly greater values."""
+    return 1 + np.searchsorted(np.sort(-values), -values, side="left")
+
+
+##### Loading
+def _load_columns(query, columns, params=()):
+    """Stream a query into one array per column, converting batch by batch to the compact dtypes."""
+    chunks = {name: [] for name, _ in columns}
+    for rows in stream_rows(query, params, batch_size=LOAD_BATCH, dictionary=False):
+        batch = np.array(rows, dtype=np.int64)
+        for index, (name, dtype) in enumerate(columns):
+            chunks[name].append(batch[:, index].astype(dtype))
+    return {name: np.concatenate(chunks[name]) if chunks[name] else np.empty(0, dtype)
+            for name, dtype in columns}
+
+
+def _load_matches(where="", params=()):
+    matches = _load_columns(MATCHES_QUERY + where, MATCH_COLUMNS, params)
+    order = np.argsort(matches["match_id"], kind="stable")
+    return {name: column[order] for name, column in matches.items()}
+
+
+def _load_statistics(where="", params=()):
+    stats = _load_columns(STATISTICS_QUERY + where, STAT_COLUMNS, params)
+    # One int64 key per row: (match_id, player_id) order, and the primary key for merging
+    stats["key"] = stats.pop("match_id") << 32 | stats.pop("player_id")
+    order = np.argsort(stats["key"], kind="stable")
+    return {name: column[order] for name, column in stats.items()}
+
+
+def _load_dimension(query, extra):
+    """(sorted ids, names by code, [one array per extra column])."""
+    rows = sorted(row for rows in stream_rows(query, dictionary=False) for row in rows)
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    return ids, [row[1] for row in rows], [np.array([row[i] for row in rows], dtype=np.int64)
+                                           for i in range(2, 2 + extra)]
+
+
+def _load_dimensions():
+    return {kind: _load_dimension(query, extra) for kind, (query, extra) in DIMENSION_QUERIES.items()}
+
+
+def _upsert(base, delta, key):
+    """Merge `delta` into `base` (column dicts sorted by `key`): equal keys are replaced, new keys inserted.
+
+    Returns the merged columns (`base` itself when nothing differs) and the number of rows changed.
+    """
+    if not len(delta[key]):
+        return base, 0
+    keys = base[key]
+    positions = np.searchsorted(keys, delta[key])
+    found = positions < len(keys)
+    found[found] = keys[positions[found]] == delta[key][found]
+    same = found.copy()
+    for name, column in base.items():
+        same[found] &= column[positions[found]] == delta[name][found]
+    changed = int(len(same) - same.sum())
+    if not changed:
+        return base, 0
+
+    updated, new = positions[found & ~same], ~found
+    merged = {}
+    for name, column in base.items():
+        column = column.copy()
+        column[updated] = delta[name][found & ~same]
+        merged[name] = np.insert(column, positions[new], delta[name][new])
+    return merged, changed
+
+
+##### Snapshot
+class AnalyticsSnapshot:
+    def __init__(self, matches, stats, dims, generations=None):
+        self.generations = generations
+        self.built_at = time.time()
+        self.match_count = len(matches["match_id"])
+        self.stat_count = len(stats["key"])
+
+        self.player_ids, self.player_names, (player_team, player_nationality) = dims["players"]
+        self.team_ids, self.team_names, (team_league,) = dims["teams"]
+        self.league_ids, self.league_names, _ = dims["leagues"]
+        self.country_ids, self.country_names, _ = dims["countries"]
+        self.player_team = _code(self.team_ids, player_team)
+        self.player_nationality = _code(self.country_ids, player_nationality)
+        self.team_league = team_league
+        self.team_league_code = _code(self.league_ids, team_league)
+        # Listing order of names (ORDER BY playername): folded name, then name, then id
+        by_name = sorted(range(len(self.player_ids)),
+                         key=lambda code: (fold(self.player_names[code] or ""), self.player_names[code] or "",
+                                           self.player_ids[code]))
+        self.player_name_rank = np.empty(len(by_name), np.int32)
+        self.player_name_rank[by_name] = np.arange(len(by_name), dtype=np.int32)
+
+        self._build_standings(matches)
+        self._build_adjacency(matches)
+        self._build_player_totals(stats)
+
+    ##### Standings: one row per (league, season, team), as TeamStandings
+    def _build_standings(self, matches):
+        season = seasons_of(matches["day"])
+        league = np.concatenate([matches["league"], matches["league"]])
+        seasons = np.concatenate([season, season])
+        team = np.concatenate([matches["home"], matches["away"]])
+        scored = np.concatenate([matches["home_score"], matches["away_score"]])
+        conceded = np.concatenate([matches["away_score"], matches["home_score"]])
+
+        order = np.lexsort((team, seasons, league))
+        league, seasons, team = league[order], seasons[order], team[order]
+        scored, conceded = scored[order], conceded[order]
+        boundary = np.ones(len(order), bool)
+        boundary[1:] = (league[1:] != league[:-1]) | (seasons[1:] != seasons[:-1]) | (team[1:] != team[:-1])
+        starts = np.flatnonzero(boundary)
+
+        def total(flags):
+            return np.add.reduceat(flags.astype(np.int64), starts) if len(starts) else np.empty(0, np.int64)
+
+        self.standing_league, self.standing_season, self.standing_team = league[starts], seasons[starts], team[starts]
+        self.standing_win = total(scored > conceded)
+        self.standing_lose = total(scored < conceded)
+        self.standing_draw = total(scored == conceded)
+
+    def _league_results(self, league, season):
+        """Team codes of the league's current teams and their win/lose/draw in the league's matches."""
+        first, last = np.searchsorted(self.standing_league, [league, league + 1])
+        rows = np.arange(first, last)
+        if season is not None:
+            rows = rows[self.standing_season[rows] == season]
+        teams, inverse = np.unique(self.standing_team[rows], return_inverse=True)
+        members = np.flatnonzero(self.team_league == league)
+        found = _code(teams, self.team_ids[members])
+        results = []
+        for column in (self.standing_win, self.standing_lose, self.standing_draw):
+            sums = np.bincount(inverse, weights=column[rows], minlength=len(teams)).astype(np.int64)
+            results.append(np.where(found >= 0, sums[np.maximum(found, 0)] if len(teams) else 0, 0))
+        return (members,) + tuple(results)
+
+    def league_standings(self, league, season=None):
+        """Rows of /league/standings: points = 3 * win + draw."""
+        league_code = _code(self.league_ids, [league])[0]
+        if league_code < 0:
+            return []
+        members, win, lose, draw = self._league_results(league, season)
+        points = 3 * win + draw
+        ranking = _rank(points)
+        order = np.lexsort((self.team_ids[members], -draw, -win, -points))
+        leaguename = self.league_names[league_code]
+        return [{"team_id": int(self.team_ids[members[i]]), "teamname": self.team_names[members[i]],
+                 "leaguename": leaguename, "win": int(win[i]), "lose": int(lose[i]), "draw": int(draw[i]),
+                 "points": int(points[i]), "ranking": int(ranking[i])} for i in order]
+
+    def leaderboard(self, league, season=None):
+        """Rows of /teams/leaderboard: point = 3 * win - lose + draw."""
+        league_code = _code(self.league_ids, [league])[0]
+        leaguename = self.league_names[league_code] if league_code >= 0 else None
+        members, win, lose, draw = self._league_results(league, season)
+        point = 3 * win - lose + draw
+        order = np.lexsort((self.team_ids[members], -point))
+        return [{"team_id": int(self.team_ids[members[i]]), "teamname": self.team_names[members[i]],
+                 "league_id": league, "leaguename": leaguename, "game": int(win[i] + lose[i] + draw[i]),
+                 "win": int(win[i]), "lose": int(lose[i]), "draw": int(draw[i]), "point": int(point[i])}
+                for i in order]
+
+    ##### Per-team match index: each team's matches sorted by (date, match_id)
+    def _build_adjacency(self, matches):
+        team = np.concatenate([matches["home"], matches["away"]])
+        day = np.concatenate([matches["day"], matches["day"]])
+        match_id = np.concatenate([matches["match_id"], matches["match_id"]])
+        order = np.lexsort((match_id, day, team))
+        self.side_team = team[order]
+        self.side_day, self.side_match = day[order], match_id[order]
+        self.side_opponent = np.concatenate([matches["away"], matches["home"]])[order]
+        self.side_scored = np.concatenate([matches["home_score"], matches["away_score"]])[order]
+        self.side_conceded = np.concatenate([matches["away_score"], matches["home_score"]])[order]
+        self.side_home = (order < len(matches["match_id"]))
+
+    def team_matches(self, team_id, season=None):
+        """Positions of the team's matches in the side arrays, oldest first."""
+        first, last = np.searchsorted(self.side_team, [team_id, team_id + 1])
+        if season is None:
+            return np.arange(first, last)
+        start, end = season_days(season)
+        days = self.side_day[first:last]
+        return np.arange(first + np.searchsorted(days, start), first + np.searchsorted(days, end))
+
+    def head_to_head(self, team_id, season=None):
+        """The team's record against every opponent, most played first."""
+        sides = self.team_matches(team_id, season)
+        opponents, inverse = np.unique(self.side_opponent[sides], return_inverse=True)
+        scored, conceded = self.side_scored[sides], self.side_conceded[sides]
+
+        def count(flags=None, weights=None):
+            return np.bincount(inverse, weights=weights if weights is not None else flags,
+                               minlength=len(opponents)).astype(np.int64)
+
+        played = count()
+        win, draw, lose = count(scored > conceded), count(scored == conceded), count(scored < conceded)
+        goals_for, goals_against = count(weights=scored), count(weights=conceded)
+        codes = _code(self.team_ids, opponents)
+        return [{"opponent_id": int(opponents[i]), "opponent": self.team_names[codes[i]] if codes[i] >= 0 else None,
+                 "played": int(played[i]), "win": int(win[i]), "draw": int(draw[i]), "lose": int(lose[i]),
+                 "goals_for": int(goals_for[i]), "goals_against": int(goals_against[i])}
+                for i in np.lexsort((opponents, -played))]
+
+    ##### Player totals (player x season) and per-player appearance lists
+    def _build_player_totals(self, stats):
+        player = _code(self.player_ids, stats["key"] & 0xFFFFFFFF)
+        season = seasons_of(stats["day"])
+        self.seasons = np.unique(season)
+        cell = np.where(player >= 0, player.astype(np.int64) * len(self.seasons)
+                        + np.searchsorted(self.seasons, season), -1)
+        valid = cell >= 0
+        size = len(self.player_ids) * len(self.seasons)
+        shape = (len(self.player_ids), len(self.seasons))
+        self.player_goals = np.bincount(cell[valid], weights=stats["goal"][valid], minlength=size)\
+            .astype(np.int64).reshape(shape)
+        self.player_appearances = np.bincount(cell[valid], minlength=size).astype(np.int64).reshape(shape)
+
+        # Rows of each player together (stable: within a player they stay in (match_id) order)
+        self.stat_order = np.argsort(np.where(player >= 0, player, len(self.player_ids)), kind="stable")
+        self.stat_offsets = np.concatenate([[0], np.cumsum(np.bincount(player[valid], minlength=len(self.player_ids)))])
+        self.stat_match = (stats["key"] >> 32)[self.stat_order]
+        self.stat_columns = {name: stats[name][self.stat_order] for name in ("day", "goal", "assist", "pass_acc", "playtime")}
+
+    def top_scorers(self, league_ids=None, team_ids=None, nationality_ids=None, season=None, limit=10):
+        """Rows of /top-scorers-ranked. Filters use each player's current team, league and nationality."""
+        if season is None:
+            goals, appeared = self.player_goals.sum(axis=1), self.player_appearances.sum(axis=1) > 0
+        else:
+            column = np.searchsorted(self.seasons, season)
+            if column == len(self.seasons) or self.seasons[column] != season:
+                return []
+            goals, appeared = self.player_goals[:, column], self.player_appearances[:, column] > 0
+
+        if not len(self.team_ids):
+            return []
+        # INNER JOIN Teams and Leagues: the player's team and its league must exist
+        team = self.player_team
+        league = np.where(team >= 0, self.team_league_code[np.maximum(team, 0)], -1)
+        selected = appeared & (league >= 0)
+        if league_ids is not None:
+            selected &= np.isin(self.team_league[np.maximum(team, 0)], league_ids)
+        if team_ids is not None:
+            selected &= np.isin(self.team_ids[np.maximum(team, 0)], team_ids)
+        if nationality_ids is not None:
+            nationality = self.player_nationality
+            selected &= (nationality >= 0) & np.isin(self.country_ids[np.maximum(nationality, 0)], nationality_ids)
+
+        candidates = np.flatnonzero(selected)
+        if len(candidates) > limit:
+            # Only players scoring at least the limit-th best total can make the cut
+            threshold = np.partition(goals[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[goals[candidates] >= threshold]
+        top = candidates[np.lexsort((self.player_name_rank[candidates], -goals[candidates]))][:limit]
+        ranks = _rank(goals[top])
+        return [{"player_id": int(self.player_ids[p]), "playername": self.player_names[p],
+                 "teamname": self.team_names[team[p]], "leaguename": self.league_names[league[p]],
+                 "nationality": self.country_names[self.player_nationality[p]] if self.player_nationality[p] >= 0 else None,
+                 "total_goals": int(goals[p]), "score_rank": int(rank)} for p, rank in zip(top, ranks)]
+
+    def rolling_form(self, player_id, window=5):
+        """The player's appearances by (date, match_id) with rolling averages over `window` matches."""
+        code = _code(self.player_ids, [player_id])[0]
+        if code < 0:
+            return []
+        rows = np.arange(self.stat_offsets[code], self.stat_offsets[code + 1])
+        rows = rows[np.lexsort((self.stat_match[rows], self.stat_columns["day"][rows]))]
+        number = np.arange(1, len(rows) + 1)
+        previous = np.maximum(number - window, 0)
+        divisor = np.minimum(number, window)
+        averages = {}
+        for name, scale in (("goal", 1), ("assist", 1), ("pass_acc", 100), ("playtime", 1)):
+            running = np.concatenate([[0], np.cumsum(self.stat_columns[name][rows], dtype=np.int64)])
+            averages[name] = np.round((running[number] - running[previous]) / divisor / scale, 4)
+        days = self.stat_columns["day"][rows].astype("datetime64[D]").tolist()
+        return [{"match_id": int(self.stat_match[r]), "date": days[i], "goal": int(self.stat_columns["goal"][r]),
+                 "pass_acc": int(self.stat_columns["pass_acc"][r]) / 100, "assist": int(self.stat_columns["assist"][r]),
+                 "playtime": int(self.stat_columns["playtime"][r]),
+                 "rolling_goal_avg": float(averages["goal"][i]), "rolling_assist_avg": float(averages["assist"][i]),
+                 "rolling_pass_acc_avg": float(averages["pass_acc"][i]),
+                 "rolling_playtime_avg": float(averages["playtime"][i])} for i, r in enumerate(rows)]
+
+
+########## Engine lifecycle #################
+class AnalyticsEngine:
+    def __init__(self, enabled=False, refresh_seconds=30, reload_seconds=3600, recent_days=14):
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+        self.recent_days = recent_days
+        self.snapshot = None
+        self._matches = None
+        self._stats = None
+        self._dims = None
+        self._fact_generations = None
+        self._dimension_generations = None
+        self._serving = False
+        self._loaded_at = 0.0
+        self._task = None
+        self._build_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "builds": 0,
+            "full_loads": 0,
+            "incremental_loads": 0,
+            "rows_applied": 0,
+            "errors": 0,
+            "last_build_seconds": 0.0,
+        }
+
+    def _generations(self, tables):
+        # Only called from build(), which runs in an executor: the backend may block
+        return cache.backend.generations(tables)
+
+    async def get(self):
+        """The current snapshot, or None when disabled, not built yet or older than a known write."""
+        snapshot = self.snapshot
+        if not self.enabled or snapshot is None:
+            return None
+        self._serving = snapshot.generations == await cache.generations(FACT_TABLES + DIMENSION_TABLES)
+        return snapshot if self._serving else None
+
+    def _load_delta(self):
+        since = (date.today() - timedelta(days=self.recent_days)).isoformat()
+        newest_match = int(self._matches["match_id"][-1]) if len(self._matches["match_id"]) else 0
+        newest_stat = int(self._stats["key"][-1] >> 32) if len(self._stats["key"]) else 0
+        matches = _load_matches(" WHERE date >= %s OR match_id > %s", (since, newest_match))
+        stats = _load_statistics(" WHERE match_date >= %s OR match_id > %s", (since, newest_stat))
+        return matches, stats
+
+    def build(self):
+        """Bring the facts up to date and swap in a new snapshot. Blocking: run it in an executor."""
+        with self._build_lock:
+            started = time.perf_counter()
+            # Read before loading: a write during the load makes the next build start over
+            fact_generations = self._generations(FACT_TABLES)
+            dimension_generations = self._generations(DIMENSION_TABLES)
+            full = (self._matches is None or fact_generations != self._fact_generations
+                    or time.monotonic() - self._loaded_at > self.reload_seconds)
+            dims = self._dims
+            if dims is None or dimension_generations != self._dimension_generations:
+                dims = _load_dimensions()
+
+            if full:
+                matches, stats = _load_matches(), _load_statistics()
+                applied = len(matches["match_id"]) + len(stats["key"])
+            else:
+                delta_matches, delta_stats = self._load_delta()
+                matches, changed_matches = _upsert(self._matches, delta_matches, "match_id")
+                stats, changed_stats = _upsert(self._stats, delta_stats, "key")
+                applied = changed_matches + changed_stats
+                # Rows naming players or teams inserted since the dimensions were read
+                if dims is self._dims and applied and not (
+                        np.isin(delta_stats["key"] & 0xFFFFFFFF, dims["players"][0]).all()
+                        and np.isin(np.concatenate([delta_matches["home"], delta_matches["away"]]),
+                                    dims["teams"][0]).all()):
+                    dims = _load_dimensions()
+                if not applied and dims is self._dims and self.snapshot is not None:
+                    self._record(full, 0, started)
+                    return self.snapshot
+
+            snapshot = AnalyticsSnapshot(matches, stats, dims, fact_generations + dimension_generations)
+            self._matches, self._stats, self._dims = matches, stats, dims
+            self._fact_generations, self._dimension_generations = fact_generations, dimension_generations
+            if full:
+                self._loaded_at = time.monotonic()
+            self.snapshot = snapshot
+            self._serving = True
+            self._record(full, applied, started)
+            return snapshot
+
+    def _record(self, full, applied, started):
+        with self._lock:
+            self._metrics["builds"] += 1
+            self._metrics["full_loads" if full else "incremental_loads"] += 1
+            self._metrics["rows_applied"] += applied
+            self._metrics["last_build_seconds"] = round(time.perf_counter() - started, 3)
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.build)
+            except asyncio.CancelledError:
+                raise
+            except (Error, PoolTimeout) as err:
+                with self._lock:
+                    self._metrics["errors"] += 1
+                logger.warning("analytics refresh failed: %s", err)
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self):
+        if not self.enabled:
+            return
+        if np is None:
+            logger.warning("ANALYTICS_ENGINE is set but numpy is not installed, serving from SQL")
+            self.enabled = False
+            return
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        snapshot = self.snapshot
+        stats.update({
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            # As of the last lookup
+            "serving": self.enabled and snapshot is not None and self._serving,
+            "matches": snapshot.match_count if snapshot else 0,
+            "statistics": snapshot.stat_count if snapshot else 0,
+            "fact_bytes": sum(column.nbytes for facts in (self._matches, self._stats) if facts
+                              for column in facts.values()),
+            "age_seconds": round(time.time() - snapshot.built_at, 1) if snapshot else None,
+        })
+        return stats
+
+
+analytics = AnalyticsEngine(
+    enabled=os.getenv('ANALYTICS_ENGINE', '0') == '1',
+    refresh_seconds=float(os.getenv('ANALYTICS_REFRESH_SECONDS', 30)),
+    reload_seconds=float(os.getenv('ANALYTICS_RELOAD_SECONDS', 3600)),
+    recent_days=int(os.getenv('ANALYTICS_RECENT_DAYS', 14)),
+)
@@ -1,15 +1,66 @@
-from fastapi import FastAPI, HTTPException, Form, Query, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Form, Query, Request, Response, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-import mysql.connector
-from mysql.connector import Error
+from fastapi.concurrency import run_in_threadpool
+import asyncio
+import json
+import logging
 import os
+import secrets
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+import uvicorn
+from pydantic import BaseModel
+from mysql.connector import Error, IntegrityError
 from dotenv import load_dotenv
 
+from db import pool, router, read_as, PoolTimeout, run_db, fetch_all, fetch_one
+from broker import broker
+from cache import cache
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, keyset_filter, set_next_cursor
+from export import stream_export
+from jobs import job_runner
+from analytics import analytics
+from favorites import (FAVORITE_TABLES, MAX_FAVORITE_IDS, add_favorites, favorite_writes, remove_favorites,
+                       set_favorites)
+from snapshots import snapshots
+from notifications import notification_worker
+from search_index import fold, player_search
+from coalesce import CoalescingMiddleware, coalesce_settings, coalesce_stats
+from responses import CompressionMiddleware, compression_settings, compression_stats
+from profiling import RequestProfile, TimedJSONResponse, current_profile, record_request, render_metrics
+
 load_dotenv()
 
-app = FastAPI()
+# The notification worker runs inside the API process unless NOTIFY_WORKER=0
+# (e.g. when a single dedicated process should do the fan-out)
+@asynccontextmanager
+async def lifespan(app):
+    if os.getenv('NOTIFY_WORKER', '1') != '0':
+        notification_worker.start()
+    try:
+        await player_search.refresh()
+    except (Error, PoolTimeout) as e:
+        # Not fatal: /player falls back to SQL and the index is built on first use
+        logging.getLogger("soccer.search").warning("player search index not loaded: %s", e)
+    # Off unless ANALYTICS_ENGINE=1; until its first build the endpoints use SQL
+    analytics.start()
+    snapshots.start()
+    # Off unless FAVORITES_FLUSH_SECONDS > 0; stopping writes out what is still queued
+    favorite_writes.start()
+    yield
+    await favorite_writes.stop()
+    await snapshots.stop()
+    await analytics.stop()
+    await notification_worker.stop()
+    await job_runner.stop()
+
+app = FastAPI(default_response_class=TimedJSONResponse, lifespan=lifespan)
+
+# Identical concurrent GETs share one handler run (see coalesce.py); innermost, so CORS,
+# ETag/304 and compression still apply per request
+app.add_middleware(CoalescingMiddleware, **coalesce_settings())
 
 app.add_middleware(
     CORSMiddleware,
@@ -17,61 +68,205 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
 
 
-def get_db_connection():
+# gzip/brotli and ETag/304 handling for complete responses (see responses.py)
+app.add_middleware(CompressionMiddleware, **compression_settings())
+
+
+# Per-request profile: pool wait, SQL statements and JSON rendering are recorded by
+# db.db_cursor / TimedJSONResponse, reported in a Server-Timing header and in /metrics
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    profile = RequestProfile()
+    token = current_profile.set(profile)
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            database=os.getenv('DB_NAME'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD')
-        )
-        if connection.is_connected():
-            return connection
-    except Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
+        response = await call_next(request)
+    finally:
+        current_profile.reset(token)
+    total = time.perf_counter() - profile.started
+    route = request.scope.get("route")
+    record_request(request.method, route.path if route else "unmatched", response.status_code, profile, total)
+    response.headers["Server-Timing"] = profile.server_timing(total)
+    return response
+
+
+# Pool exhausted: tell the client to back off instead of failing with a 500
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(content={"detail": str(exc)}, status_code=503)
 
 
 @app.get("/")
 async def home():
-    connection = get_db_connection()
-    if connection and connection.is_connected():
+    try:
+        await fetch_one("SELECT 1")
         return {"message": "Welcome to CS348~~ Connected to Database."}
-    else:
+    except (Error, PoolTimeout) as e:
+        print(f"Error connecting to MySQL: {e}")
         return {"message": "Welcome to CS348~~"}
 
+##### Connection pool utilization
+@app.get("/metrics/pool")
+async def pool_metrics():
+    return pool.stats()
+
+##### Primary/replica routing: checkouts, statements, errors and health per backend
+@app.get("/metrics/db")
+async def db_metrics():
+    return router.stats()
+
+##### Prometheus metrics: request, pool wait, per-statement and serialization latency histograms
+@app.get("/metrics")
+async def prometheus_metrics():
+    stats = pool.stats()
+    gauges = {
+        "db_pool_in_use": stats["in_use"],
+        "db_pool_idle": stats["idle"],
+        "db_pool_open": stats["open"],
+        "db_pool_timeouts_total": stats["timeouts"],
+    }
+    backends = router.stats()["backends"]
+    gauges.update({f'db_backend_queries_total{{backend="{name}"}}': b["queries"] for name, b in backends.items()})
+    gauges.update({f'db_backend_healthy{{backend="{name}"}}': int(b["healthy"]) for name, b in backends.items()})
+    notify = notification_worker.stats()
+    gauges.update({
+        "notification_events_total": notify["events"],
+        "notifications_sent_total": notify["notifications"],
+        "notification_errors_total": notify["errors"],
+        "notification_lag_seconds": notify["last_lag_seconds"],
+    })
+    compression = compression_stats.snapshot().values()
+    gauges.update({
+        "http_response_raw_bytes_total": sum(r["raw_bytes"] for r in compression),
+        "http_response_sent_bytes_total": sum(r["sent_bytes"] for r in compression),
+        "http_not_modified_total": sum(r["not_modified"] for r in compression),
+    })
+    coalesced = coalesce_stats.snapshot().values()
+    gauges.update({
+        "http_coalesce_executed_total": sum(r["executed"] for r in coalesced),
+        "http_coalesce_collapsed_total": sum(r["collapsed"] for r in coalesced),
+        "http_coalesce_reused_total": sum(r["reused"] for r in coalesced),
+    })
+    favorites = favorite_writes.stats()
+    gauges.update({
+        "favorites_changes_queued_total": favorites["queued"],
+        "favorites_changes_written_total": favorites["written"],
+        "favorites_changes_pending": favorites["pending"],
+        "favorites_flushes_total": favorites["flushes"],
+    })
+    stored = snapshots.stats()
+    gauges.update({
+        "snapshot_served_total": stored["served"],
+        "snapshot_not_modified_total": stored["not_modified"],
+        "snapshot_misses_total": stored["misses"],
+        "snapshot_version": stored["version"],
+    })
+    engine = analytics.stats()
+    gauges.update({
+        "analytics_serving": int(engine["serving"]),
+        "analytics_builds_total": engine["builds"],
+        "analytics_rows_applied_total": engine["rows_applied"],
+        "analytics_last_build_seconds": engine["last_build_seconds"],
+    })
+    return PlainTextResponse(render_metrics(gauges), media_type="text/plain; version=0.0.4")
+
+##### Requests answered by another identical in-flight request, per path
+@app.get("/metrics/coalesce")
+async def coalesce_metrics():
+    return coalesce_stats.snapshot()
+
+##### Favorites write-behind buffer: queued, coalesced and written changes
+@app.get("/metrics/favorites")
+async def favorite_metrics():
+    return favorite_writes.stats()
+
+##### Standings/leaderboard snapshots: hits, rebuilds and size
+@app.get("/metrics/snapshots")
+async def snapshot_metrics():
+    return snapshots.stats()
+
+##### In-memory analytics engine: snapshot size, age and refreshes
+@app.get("/metrics/analytics")
+async def analytics_metrics():
+    return analytics.stats()
+
+##### Notification fan-out throughput and lag
+@app.get("/metrics/notifications")
+async def notification_metrics():
+    return notification_worker.stats()
+
+##### Player search index size and reloads
+@app.get("/metrics/search")
+async def search_metrics():
+    return player_search.stats()
+
+##### Response size per route: bytes before/after compression and 304s
+@app.get("/metrics/compression")
+async def compression_metrics():
+    return compression_stats.snapshot()
+
+##### Background job queue depth and outcomes
+@app.get("/metrics/jobs")
+async def job_metrics():
+    return job_runner.stats()
+
+##### Live push broker: open subscriptions and message counts
+@app.get("/metrics/push")
+async def push_metrics():
+    return broker.stats()
+
+##### Reference data cache hit/miss counters
+@app.get("/metrics/cache")
+async def cache_metrics():
+    return await run_in_threadpool(cache.stats)
+
+##### Maintenance endpoints: with ADMIN_TOKEN set the request must send it in X-Admin-Token,
+# otherwise only clients on this machine are allowed
+LOCAL_CLIENTS = ("127.0.0.1", "::1", "localhost")
+
+def require_admin(request: Request):
+    token = os.getenv('ADMIN_TOKEN')
+    if token:
+        if not secrets.compare_digest(request.headers.get("x-admin-token", ""), token):
+            raise HTTPException(status_code=403, detail="Invalid admin token.")
+    elif request.client is None or request.client.host not in LOCAL_CLIENTS:
+        raise HTTPException(status_code=403, detail="Only allowed from localhost (or set ADMIN_TOKEN).")
+
+##### Cache invalidation hook for out-of-band writes (e.g. the bulk loader scripts)
+# table: drop everything read from that table, omit to clear the whole cache
+@app.post("/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_cache(table: str = None):
+    if table:
+        await cache.invalidate_tables(table)
+    else:
+        await cache.clear()
+    return {"message": "Cache invalidated.", "table": table}
+
 ########## User Authentication Feature #################
 ##### Sign Up endpoint
 @app.post("/signup")
 async def signup(username: str = Form(...), password: str = Form(...), email: str = Form(...)):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Users WHERE username = %s", (username,))
-    user_exist = cursor.fetchone() is not None
+    def _signup(cursor):
+        cursor.execute("SELECT * FROM Users WHERE username = %s", (username,))
+        if cursor.fetchone() is not None:
+            return False
 
-    if user_exist:
-        raise HTTPException(status_code=401, detail="Username already exists.")
+        cursor.execute("INSERT INTO Users(username, password, email, role_id)  \
+                       VALUES (%s, %s, %s, 2);", (username, password, email))
+        return True
 
-    cursor.execute("INSERT INTO Users(username, password, email, role_id)  \
-                   VALUES (%s, %s, %s, 2);", (username, password, email))
-    db.commit()
+    if not await run_db(_signup, commit=True):
+        raise HTTPException(status_code=401, detail="Username already exists.")
 
-    cursor.close()
-    db.close()
     return JSONResponse(content={"message": "User registered successfully. Please log in."}, status_code=201)
 
 ##### Log In endpoint
 @app.post("/login")
 async def login(username: str = Form(...), password: str = Form(...)):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Users WHERE username = %s AND password = %s", (username, password))
-    account = cursor.fetchone()
-    cursor.close()
-    db.close()
+    account = await fetch_one("SELECT * FROM Users WHERE username = %s AND password = %s", (username, password))
 
     if account:
         return {"message": "Login successful!", "id": account['user_id']}
@@ -83,11 +278,11 @@ async def logout():
     return {"message": "Logout successful."}
 
 ##### Recent Games by league_id endpoints
+# Paging: either page/page_size, or pass the X-Next-Cursor header of the previous
+# response as `cursor` to continue right after its last row (no OFFSET scan).
 @app.get("/recentgames")
-async def recent_games(league: str = None, page: int = 1, page_size: int = 10):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
+async def recent_games(response: Response, league: str = None, page: int = 1, page_size: int = 10,
+                       cursor: str = None):
     query = ("""SELECT Matches.match_id, Matches.date, Matches.match_location,
                        Matches.league_id, Leagues.leaguename, 
                        Matches.hometeam_id, Matches.awayteam_id,
@@ -96,44 +291,49 @@ async def recent_games(league: str = None, page: int = 1, page_size: int = 10):
                 FROM Matches 
                 LEFT JOIN Leagues ON Matches.league_id = Leagues.league_id
                 LEFT JOIN Teams as home on Matches.hometeam_id = home.team_id 
-                LEFT JOIN Teams as away on Matches.awayteam_id = away.team_id """)
-    offset = (page - 1) * page_size
+                LEFT JOIN Teams as away on Matches.awayteam_id = away.team_id 
+                WHERE 1 = 1 """)
+    params = []
+    league_filter = ""
     if league and league != 'all':
-        query += "WHERE Leagues.league_id = %s "
-        query += "ORDER BY Matches.date DESC LIMIT %s OFFSET %s"
-        cursor.execute(query, (league, page_size, offset))
-    else:
-        query += "ORDER BY Matches.date DESC LIMIT %s OFFSET %s"
-        cursor.execute(query, (page_size, offset))
+        league_filter = "AND Matches.league_id = %s "
+        query += league_filter
+        params.append(league)
 
-    games = cursor.fetchall()
-    cursor.close()
-    db.close()
+    if cursor:
+        condition, cursor_params = keyset_filter("Matches.date", "Matches.match_id", cursor, descending=True)
+        query += f"AND {condition} "
+        params.extend(cursor_params)
+        offset = 0
+        anchor = parse_date(decode_cursor(cursor)[0])
+    else:
+        offset = (page - 1) * page_size
+        anchor = date.today()
+
+    # The page almost always lies in the anchor's season or the one before: read only those
+    # partitions first. When that window runs out, the rest of the page comes from the older
+    # partitions only, skipping the part of the offset the window's rows already covered
+    order = "ORDER BY Matches.date DESC, Matches.match_id DESC LIMIT %s OFFSET %s"
+    window_start = season_range(season_of(anchor) - 1)[0]
+    games = await fetch_all(query + "AND Matches.date >= %s " + order, params + [window_start, page_size, offset])
+    if len(games) < page_size:
+        if games or offset == 0:
+            in_window = offset + len(games)
+        else:
+            # The offset is past the window's last row (no cursor here: cursors use offset 0)
+            in_window = (await fetch_one("SELECT COUNT(*) AS length FROM Matches WHERE Matches.date >= %s "
+                                         + league_filter, [window_start] + params))["length"]
+        games += await fetch_all(query + "AND Matches.date < %s " + order,
+                                 params + [window_start, page_size - len(games), max(offset - in_window, 0)])
+    set_next_cursor(response, games, page_size, "date", "match_id")
     return games
 
 ########## Search Feature #################
-##### Search player endpoint
-# Search for player by name, team, position & nationality
-@app.get("/player")
-async def search_player(
-    name: str = None, 
-    team: str = None, 
-    position: str = None, 
-    nationality: int = None,
-    page: int = 1,
-    page_size: int = 10
-):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
-    query = """SELECT player_id, playername, teamname, position, countryname as nationality, age
-               FROM Players 
-               LEFT JOIN Teams ON Players.team_id = Teams.team_id
-               LEFT JOIN Country ON Players.player_nationality_id = Country.country_id
-               WHERE 1 = 1
-            """
+# Filters shared by the search endpoints and the matching exports
+def player_filters(name=None, team=None, position=None, nationality=None):
+    query = ""
     params = []
-    
+
     if name:
         # If search term is short, fallback to LIKE search
         if len(name) < 4:
@@ -142,7 +342,7 @@ async def search_player(
         else:
             query += " AND MATCH(playername) AGAINST(%s IN NATURAL LANGUAGE MODE)"
             params.append(name)
-    
+
     if team:
         query += " AND Players.team_id = %s"
         params.append(team)
@@ -154,31 +354,139 @@ async def search_player(
     if nationality is not None:
         query += " AND Players.player_nationality_id = %s"
         params.append(nationality)
-    
-    offset = (page - 1) * page_size
-    query += " ORDER BY playername LIMIT %s OFFSET %s"
+
+    return query, params
+
+
+# Matches and Statistics are partitioned by season (July to June, migration 0009). A bound
+# on a table's own date column lets MySQL skip the partitions outside it; a bound reaching
+# a table only through a join does not, hence `date_columns`.
+def season_of(day):
+    return day.year - (day.month < 7)
+
+
+def season_range(season):
+    return date(season, 7, 1), date(season + 1, 7, 1)
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date.")
+
+
+def match_filters(start_date=None, end_date=None, league=None, season=None, date_columns=("Matches.date",)):
+    query = ""
+    params = []
+    for column in date_columns:
+        if start_date:
+            query += f" AND {column} >= %s"
+            params.append(start_date)
+
+        if end_date:
+            query += f" AND {column} <= %s"
+            params.append(end_date)
+
+        if season is not None:
+            query += f" AND {column} >= %s AND {column} < %s"
+            params.extend(season_range(season))
+
+    if league:
+        query += " AND Matches.league_id = %s"
+        params.append(league)
+
+    return query, params
+
+##### Search player endpoint
+# Search for player by name, team, position & nationality
+@app.get("/player")
+async def search_player(
+    response: Response,
+    name: str = None, 
+    team: str = None, 
+    position: str = None, 
+    nationality: int = None,
+    page: int = 1,
+    page_size: int = 10,
+    cursor: str = None
+):
+    query = """SELECT player_id, playername, teamname, position, countryname as nationality, age
+               FROM Players 
+               LEFT JOIN Teams ON Players.team_id = Teams.team_id
+               LEFT JOIN Country ON Players.player_nationality_id = Country.country_id
+               WHERE 1 = 1
+            """
+    if name:
+        # Name searches are served from the in-memory index, same filters, order and paging
+        index = await player_search.get()
+        ids = index.filter_sorted(name, int(team) if team and team.isdigit() else team, position, nationality)
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor)
+            after = (fold(sort_value), last_id)
+            ids = [pid for pid in ids if index.sort_key(pid) > after]
+            offset = 0
+        else:
+            offset = (page - 1) * page_size
+        results = [player_row(index.players[pid]) for pid in ids[offset:offset + page_size]]
+        set_next_cursor(response, results, page_size, "playername", "player_id")
+        if not results:
+            return JSONResponse(content={"message": "No players found", "results": []}, status_code=200)
+        return results
+
+    conditions, params = player_filters(name, team, position, nationality)
+    query += conditions
+
+    if cursor:
+        condition, cursor_params = keyset_filter("playername", "player_id", cursor)
+        query += f" AND {condition}"
+        params.extend(cursor_params)
+        offset = 0
+    else:
+        offset = (page - 1) * page_size
+
+    query += " ORDER BY playername, player_id LIMIT %s OFFSET %s"
     params.append(page_size)
     params.append(offset)
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-
-    cursor.close()
-    db.close()
+    results = await fetch_all(query, params)
+    set_next_cursor(response, results, page_size, "playername", "player_id")
 
     if not results:
         return JSONResponse(content={"message": "No players found", "results": []}, status_code=200)
 
     return results
 
+# Index records carry the ids as well, /player responses keep their original fields
+def player_row(player):
+    return {key: player[key] for key in ("player_id", "playername", "teamname", "position", "nationality", "age")}
+
+##### Player name autocomplete
+# Best matches for a partially typed name (prefix, substring, then typo tolerant)
+@app.get("/player/autocomplete")
+async def autocomplete_player(q: str, limit: int = 10):
+    index = await player_search.get()
+    return [{"player_id": player["player_id"], "playername": player["playername"], "teamname": player["teamname"]}
+            for player, _ in index.search(q, limit=limit)]
+
+##### Ranked player search
+# Relevance ordered: exact name, name prefix, word prefix, substring, then typo matches
+@app.get("/player/search")
+async def ranked_player_search(q: str, team: int = None, position: str = None, nationality: int = None,
+                               limit: int = 20, offset: int = 0):
+    index = await player_search.get()
+    results = [dict(player_row(player), score=score)
+               for player, score in index.search(q, team, position, nationality, limit, offset)]
+    if not results:
+        return JSONResponse(content={"message": "No players found", "results": []}, status_code=200)
+    return results
+
 ##### Search game endpoint
 # Search game between start_date and end_date by league
-# start_date and end_date in form "yyyy-mm-dd"
+# start_date and end_date in form "yyyy-mm-dd", season (starting year) narrows to one season
 @app.get("/game")
-async def search_game(start_date: str = None, end_date: str = None, league: int = None, page: int = 1, page_size: int = 10):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
+async def search_game(response: Response, start_date: str = None, end_date: str = None, league: int = None,
+                      season: int = None, page: int = 1, page_size: int = 10, cursor: str = None):
     query = """SELECT Matches.match_id, Matches.date, Matches.match_location,
                 Matches.league_id, Leagues.leaguename, 
                 Matches.hometeam_id, Matches.awayteam_id,
@@ -190,31 +498,24 @@ async def search_game(start_date: str = None, end_date: str = None, league: int
                 LEFT JOIN Teams as away on Matches.awayteam_id = away.team_id
                 WHERE 1 = 1
             """
-    params = []
-    print(start_date, end_date, league)
-    if start_date:
-        query += " AND date >=  %s"
-        params.append(start_date)
-    
-    if end_date:
-        query += " AND date <=  %s"
-        params.append(end_date)
-    
-    if league:
-        query += " AND Matches.league_id = %s"
-        params.append(league)
+    conditions, params = match_filters(start_date, end_date, league, season)
+    query += conditions
+
+    if cursor:
+        condition, cursor_params = keyset_filter("Matches.date", "Matches.match_id", cursor)
+        query += f" AND {condition}"
+        params.extend(cursor_params)
+        offset = 0
+    else:
+        offset = (page - 1) * page_size
 
-    query += " ORDER BY date"
-    offset = (page - 1) * page_size
+    query += " ORDER BY date, Matches.match_id"
     query += " LIMIT %s OFFSET %s"
     params.append(page_size)
     params.append(offset)
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-
-    cursor.close()
-    db.close()
+    results = await fetch_all(query, params)
+    set_next_cursor(response, results, page_size, "date", "match_id")
 
     if not results:
         raise HTTPException(status_code=404, detail="Game not found.")
@@ -222,39 +523,73 @@ async def search_game(start_date: str = None, end_date: str = None, league: int
     return results
 
 ########## Favorities Feature #################
-##### Add Favorite Player endpoint
-# If (user_id, player_id) do not exists in FavoritePlayers, add Favorites
-# If (user_id, player_id)  exists in FavoritePlayers, delete Favorites
-@app.get("/favorite/player/add")
-async def modify_fav_player(userid: str, playerid: str): 
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM FavoritePlayers WHERE user_id = %s and player_id = %s ", (userid, playerid))
-    favorite_exist = cursor.fetchone() is not None
-
-    message = ""
-    
-    # If favorite exist, delete favorite
-    if favorite_exist:
-        cursor.execute("DELETE FROM FavoritePlayers  \
-                        WHERE user_id = %s and player_id = %s;", (userid, playerid))
-        message = "Favorite Player removed successfully"
-    else: 
-        cursor.execute("INSERT INTO FavoritePlayers(user_id, player_id)  \
-                        VALUES (%s, %s);", (userid, playerid))
-        message = "Favorite Player added successfully"
-    db.commit()
-
-    cursor.close()
-    db.close()
-    return JSONResponse(content={"message": message}, status_code=201)
+# Writes are set operations, one statement per batch of ids (see favorites.py). With
+# FAVORITES_FLUSH_SECONDS > 0 they are queued per user and written in the background (202).
+FAVORITE_NAMES = {"player": "Favorite Player", "team": "Favorite Team"}
+
+class FavoriteIds(BaseModel):
+    ids: list[int]
+
+def favorite_kind(kind):
+    if kind not in FAVORITE_TABLES:
+        raise HTTPException(status_code=404, detail="Favorites are players or teams.")
+    return kind
+
+def favorite_ids(batch):
+    ids = sorted(set(batch.ids))
+    if len(ids) > MAX_FAVORITE_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FAVORITE_IDS} ids per request.")
+    return ids
+
+async def write_favorites(kind, userid, fn, *args):
+    read_as(userid)
+    try:
+        result = await run_db(fn, kind, *args, commit=True)
+    except IntegrityError:
+        # Foreign key: the user or one of the ids does not exist; nothing was written
+        raise HTTPException(status_code=404, detail=f"User or {kind} not found.")
+    # Open push connections of this user re-read their subscriptions
+    await broker.publish(f"user:{userid}", {"type": "favorites_changed"})
+    return result
+
+def queued_favorites(kind, userid, ids, action):
+    favorite_writes.queue(kind, userid, ids, action)
+    return JSONResponse(content={"message": f"{FAVORITE_NAMES[kind]} changes queued", "ids": ids},
+                        status_code=202)
+
+##### Add favorites: PUT /favorite/player?userid=1 {"ids": [..]} (ids already added are kept)
+@app.put("/favorite/{kind}")
+async def add_favorite_ids(batch: FavoriteIds, userid: int, kind: str = Depends(favorite_kind)):
+    ids = favorite_ids(batch)
+    if favorite_writes.enabled:
+        return queued_favorites(kind, userid, ids, "add")
+    await write_favorites(kind, userid, add_favorites, [(userid, item_id) for item_id in ids])
+    return {"message": f"{FAVORITE_NAMES[kind]}s added successfully", "ids": ids}
+
+##### Remove favorites: DELETE /favorite/player?userid=1 {"ids": [..]} (unknown ids are ignored)
+@app.delete("/favorite/{kind}")
+async def remove_favorite_ids(batch: FavoriteIds, userid: int, kind: str = Depends(favorite_kind)):
+    ids = favorite_ids(batch)
+    if favorite_writes.enabled:
+        return queued_favorites(kind, userid, ids, "remove")
+    removed = await write_favorites(kind, userid, remove_favorites, [(userid, item_id) for item_id in ids])
+    return {"message": f"{FAVORITE_NAMES[kind]}s removed successfully", "ids": ids, "removed": removed}
+
+##### Replace the whole list: PUT /favorite/player/set?userid=1 {"ids": [..]}
+# Always written right away, in one transaction; queued changes of that kind are superseded
+@app.put("/favorite/{kind}/set")
+async def set_favorite_ids(batch: FavoriteIds, userid: int, kind: str = Depends(favorite_kind)):
+    ids = favorite_ids(batch)
+    favorite_writes.discard(kind, userid)
+    await write_favorites(kind, userid, set_favorites, userid, ids)
+    return {"message": f"{FAVORITE_NAMES[kind]}s updated successfully", "ids": ids}
 
 ##### View Favorite Player endpoint
 @app.get("/favorite/player/view")
-async def view_fav_player(userid: str): 
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
+async def view_fav_player(userid: int): 
+    read_as(userid)
+    # Pending write-behind changes of this user first, so the list shows them
+    await favorite_writes.flush(userid)
     query = ("""SELECT f.user_id, f.player_id, p.playername, t.teamname, p.position, f.dateAdded 
              FROM FavoritePlayers f
              LEFT JOIN Players p 
@@ -263,47 +598,14 @@ async def view_fav_player(userid: str):
              ON p.team_id = t.team_id
              WHERE user_id = %s 
              ORDER BY dateAdded DESC""")
-    
-    cursor.execute(query, (userid,))
-
-    favorites = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return favorites
-
-##### Add Favorite Team endpoint
-# If (user_id, team_id) do not exists in FavoriteTeams, add Favorites
-# If (user_id, team_id)  exists in FavoriteTeams, delete Favorites
-@app.get("/favorite/team/add")
-async def modify_fav_team(userid: str, teamid: str): 
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM FavoriteTeams WHERE user_id = %s and team_id = %s ", (userid, teamid))
-    favorite_exist = cursor.fetchone() is not None
-
-    message = ""
-    
-    # If favorite exist, delete favorite
-    if favorite_exist:
-        cursor.execute("DELETE FROM FavoriteTeams \
-                        WHERE user_id = %s and team_id = %s;", (userid, teamid))
-        message = "Favorite Team removed successfully"
-    else: 
-        cursor.execute("INSERT INTO FavoriteTeams(user_id, team_id)  \
-                        VALUES (%s, %s);", (userid, teamid))
-        message = "Favorite Team added successfully"
-    db.commit()
-
-    cursor.close()
-    db.close()
-    return JSONResponse(content={"message": message}, status_code=201)
+
+    return await fetch_all(query, (userid,))
 
 ##### View Favorite Team endpoint
 @app.get("/favorite/team/view")
-async def view_fav_team(userid: str): 
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
+async def view_fav_team(userid: int): 
+    read_as(userid)
+    await favorite_writes.flush(userid)
     query = ("""SELECT f.user_id, f.team_id, t.teamname, l.leaguename, c.countryname, f.dateAdded
              FROM FavoriteTeams f
              LEFT JOIN Teams t
@@ -314,86 +616,37 @@ async def view_fav_team(userid: str):
              on l.league_nationality_id = c.country_id
              WHERE user_id = %s 
              ORDER BY dateAdded DESC""")
-    
-    cursor.execute(query, (userid,))
 
-    favorites = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return favorites
+    return await fetch_all(query, (userid,))
 
 ############ TEAM Statistics ###############
 ##### Players by team_id
 @app.get("/teams/players")
 async def get_team_player(team: str = None):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
     query = ("SELECT * FROM Players ")
+    params = ()
     if team and team != 'all':
         query += "WHERE team_id = %s"
-        cursor.execute(query, (team,))
-    else:
-        cursor.execute(query)
-
-    players = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return players
+        params = (team,)
+    players = await cache.get_or_load("teams_players", params, ["Players"],
+                                      lambda: fetch_all(query, params))
+    return TimedJSONResponse(players)
 
 ##### Number of match win/lose/draw by team
+# Reads the TeamStandings summary (kept current by the Matches triggers) instead of
+# aggregating the whole Matches table on every request.
 @app.get("/teams/stats")
 async def get_teams_stat(team: str = None):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
-    query = ("""WITH match_status as (
-            SELECT Matches.match_id, 
-                    CASE WHEN (hometeam_score = awayteam_score) THEN 1 
-                        ELSE 0 END AS draw, 
-                    CASE WHEN (hometeam_score > awayteam_score) THEN hometeam_id \
-                        WHEN (hometeam_score < awayteam_score) THEN awayteam_id \
-                        ELSE hometeam_id END AS win_team, \
-                    CASE WHEN (hometeam_score > awayteam_score) THEN awayteam_id \
-                        WHEN (hometeam_score < awayteam_score) THEN hometeam_id \
-                        ELSE awayteam_id END AS lose_team \
-            FROM Matches
-            ), 
-
-            team_win as (
-            SELECT Teams.team_id, count(match_status.match_id) as win
-            FROM Teams
-            LEFT JOIN match_status on Teams.team_id = match_status.win_team and match_status.draw = 0
-            GROUP BY Teams.team_id
-            ),
-
-            team_lose as (
-            SELECT Teams.team_id, count(match_status.match_id) as lose
-            FROM Teams
-            LEFT JOIN match_status on Teams.team_id = match_status.lose_team and match_status.draw = 0
-            GROUP BY Teams.team_id
-            ), 
-
-            team_draw as (
-            SELECT Teams.team_id, count(a.match_id) + count(b.match_id)  as draw
-            FROM Teams
-            LEFT JOIN match_status as a on Teams.team_id = a.win_team and a.draw = 1
-            LEFT JOIN match_status as b on Teams.team_id = b.lose_team and b.draw = 1
-            GROUP BY Teams.team_id
-            )
-             
-            SELECT Teams.team_id, Teams.teamname, Teams.league_id, team_win.win, team_lose.lose, team_draw.draw
-            FROM Teams
-            LEFT JOIN team_win on Teams.team_id = team_win.team_id
-            LEFT JOIN team_lose on Teams.team_id = team_lose.team_id
-            LEFT JOIN team_draw on Teams.team_id = team_draw.team_id
-            WHERE Teams.team_id = %s
+    query = ("""SELECT Teams.team_id, Teams.teamname, Teams.league_id,
+                       IFNULL(SUM(s.win), 0) as win,
+                       IFNULL(SUM(s.lose), 0) as lose,
+                       IFNULL(SUM(s.draw), 0) as draw
+                FROM Teams
+                LEFT JOIN TeamStandings s on Teams.team_id = s.team_id
+                WHERE Teams.team_id = %s
+                GROUP BY Teams.team_id, Teams.teamname, Teams.league_id
             """)
-    cursor.execute(query, (team, ))
-    stats = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return stats
+    return await fetch_all(query, (team, ))
 
 ##### Players & Number of match win/lose/draw by team
 @app.get("/teams/details")
@@ -401,74 +654,33 @@ async def get_team_details(team: str = None):
     if not team:
         raise HTTPException(status_code=400, detail="Team ID must be provided.")
 
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
     # Fetch team statistics with league name
-    stats_query = ("""WITH match_status as (
-            SELECT Matches.match_id, 
-                   CASE WHEN (hometeam_score = awayteam_score) THEN 1 
-                        ELSE 0 END AS draw, 
-                   CASE WHEN (hometeam_score > awayteam_score) THEN hometeam_id 
-                        WHEN (hometeam_score < awayteam_score) THEN awayteam_id 
-                        ELSE hometeam_id END AS win_team, 
-                   CASE WHEN (hometeam_score > awayteam_score) THEN awayteam_id 
-                        WHEN (hometeam_score < awayteam_score) THEN hometeam_id 
-                        ELSE awayteam_id END AS lose_team 
-            FROM Matches
-            ), 
-
-            team_win as (
-            SELECT Teams.team_id, count(match_status.match_id) as win
-            FROM Teams
-            LEFT JOIN match_status on Teams.team_id = match_status.win_team and match_status.draw = 0
-            WHERE Teams.team_id = %s
-            GROUP BY Teams.team_id
-            ),
-
-            team_lose as (
-            SELECT Teams.team_id, count(match_status.match_id) as lose
-            FROM Teams
-            LEFT JOIN match_status on Teams.team_id = match_status.lose_team and match_status.draw = 0
-            WHERE Teams.team_id = %s
-            GROUP BY Teams.team_id
-            ), 
-
-            team_draw as (
-            SELECT Teams.team_id, count(a.match_id) + count(b.match_id) as draw
-            FROM Teams
-            LEFT JOIN match_status as a on Teams.team_id = a.win_team and a.draw = 1
-            LEFT JOIN match_status as b on Teams.team_id = b.lose_team and b.draw = 1
-            WHERE Teams.team_id = %s
-            GROUP BY Teams.team_id
-            )
-
-            SELECT Teams.team_id, Teams.teamname, Leagues.leaguename, 
-                   IFNULL(team_win.win, 0) as win, 
-                   IFNULL(team_lose.lose, 0) as lose, 
-                   IFNULL(team_draw.draw, 0) as draw
-            FROM Teams
-            LEFT JOIN team_win on Teams.team_id = team_win.team_id
-            LEFT JOIN team_lose on Teams.team_id = team_lose.team_id
-            LEFT JOIN team_draw on Teams.team_id = team_draw.team_id
-            LEFT JOIN Leagues on Teams.league_id = Leagues.league_id
-            WHERE Teams.team_id = %s
-            """)
-    cursor.execute(stats_query, (team, team, team, team))
-    stats = cursor.fetchone()
+    stats_query = ("""SELECT Teams.team_id, Teams.teamname, Leagues.leaguename,
+                             IFNULL(SUM(s.win), 0) as win,
+                             IFNULL(SUM(s.lose), 0) as lose,
+                             IFNULL(SUM(s.draw), 0) as draw
+                      FROM Teams
+                      LEFT JOIN TeamStandings s on Teams.team_id = s.team_id
+                      LEFT JOIN Leagues on Teams.league_id = Leagues.league_id
+                      WHERE Teams.team_id = %s
+                      GROUP BY Teams.team_id, Teams.teamname, Leagues.leaguename
+                   """)
 
     # Fetch team players
     players_query = "SELECT * FROM Players WHERE team_id = %s"
-    cursor.execute(players_query, (team,))
-    players = cursor.fetchall()
 
-    cursor.close()
-    db.close()
+    def _details(cursor):
+        cursor.execute(stats_query, (team,))
+        stats = cursor.fetchone()
+        cursor.execute(players_query, (team,))
+        return stats, cursor.fetchall()
+
+    stats, players = await run_db(_details)
 
     if not stats:
         raise HTTPException(status_code=404, detail="Team not found.")
 
-    return {
+    return TimedJSONResponse({
         "team_id": stats["team_id"],
         "teamname": stats["teamname"],
         "league_name": stats["leaguename"],
@@ -478,74 +690,182 @@ async def get_team_details(team: str = None):
             "draw": stats["draw"]
         },
         "players": players
-    }
+    })
 
 ##### Team leaderboard by league
-@app.get("/teams/leaderboard")
-async def get_league_board(league: str = None):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
-    query = ("""WITH match_status as (
-            SELECT Matches.match_id, 
-                    CASE WHEN (hometeam_score = awayteam_score) THEN 1 
-                        ELSE 0 END AS draw, 
-                    CASE WHEN (hometeam_score > awayteam_score) THEN hometeam_id \
-                        WHEN (hometeam_score < awayteam_score) THEN awayteam_id \
-                        ELSE hometeam_id END AS win_team, \
-                    CASE WHEN (hometeam_score > awayteam_score) THEN awayteam_id \
-                        WHEN (hometeam_score < awayteam_score) THEN hometeam_id \
-                        ELSE awayteam_id END AS lose_team \
-            FROM Matches
-            Where league_id = %s
-            ), 
-            team_win as (
-            SELECT Teams.team_id, count(match_status.match_id) as win
-            FROM Teams
-            LEFT JOIN match_status on Teams.team_id = match_status.win_team and match_status.draw = 0
-            GROUP BY Teams.team_id
-            ),
-            team_lose as (
-            SELECT Teams.team_id, count(match_status.match_id) as lose
-            FROM Teams
-            LEFT JOIN match_status on Teams.team_id = match_status.lose_team and match_status.draw = 0
-            GROUP BY Teams.team_id
-            ), 
-            team_draw as (
-            SELECT Teams.team_id, count(a.match_id) + count(b.match_id)  as draw
-            FROM Teams
-            LEFT JOIN match_status as a on Teams.team_id = a.win_team and a.draw = 1
-            LEFT JOIN match_status as b on Teams.team_id = b.lose_team and b.draw = 1
-            GROUP BY Teams.team_id
-            ) 
-             
+# season (optional): only count matches of the season starting in that year
+async def league_board_rows(league, season=None):
+    snapshot = await analytics.get()
+    if snapshot is not None and str(league).isdigit():
+        return snapshot.leaderboard(int(league), season)
+
+    query = ("""WITH team_results as (
+            SELECT team_id, SUM(win) as win, SUM(lose) as lose, SUM(draw) as draw
+            FROM TeamStandings
+            WHERE league_id = %s""")
+    params = [league]
+    if season is not None:
+        query += " AND season = %s"
+        params.append(season)
+
+    query += ("""
+            GROUP BY team_id
+            )
+
             SELECT Teams.team_id, Teams.teamname, Teams.league_id, Leagues.leaguename, 
-            IFNULL(team_win.win, 0) + IFNULL(team_lose.lose, 0) + IFNULL(team_draw.draw, 0) as game, 
-            IFNULL(team_win.win, 0) as win, 
-            IFNULL(team_lose.lose, 0) as lose, 
-            IFNULL(team_draw.draw, 0) as draw, 
-            IFNULL(team_win.win, 0) * 3 + IFNULL(team_lose.lose, 0) * (-1) + IFNULL(team_draw.draw, 0) * 1 as point
+            IFNULL(tr.win, 0) + IFNULL(tr.lose, 0) + IFNULL(tr.draw, 0) as game, 
+            IFNULL(tr.win, 0) as win, 
+            IFNULL(tr.lose, 0) as lose, 
+            IFNULL(tr.draw, 0) as draw, 
+            IFNULL(tr.win, 0) * 3 + IFNULL(tr.lose, 0) * (-1) + IFNULL(tr.draw, 0) * 1 as point
             FROM Teams
-            LEFT JOIN team_win on Teams.team_id = team_win.team_id
-            LEFT JOIN team_lose on Teams.team_id = team_lose.team_id
-            LEFT JOIN team_draw on Teams.team_id = team_draw.team_id
+            LEFT JOIN team_results tr on Teams.team_id = tr.team_id
             LEFT JOIN Leagues on Teams.league_id = Leagues.league_id
             WHERE Teams.league_id = %s
             ORDER by point DESC
             """)
-    cursor.execute(query, (league, league))
-    stats = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return stats
+    params.append(league)
+    return await fetch_all(query, params)
+
+# Served from the pre-rendered snapshot when there is one (see snapshots.py)
+@app.get("/teams/leaderboard")
+async def get_league_board(request: Request, league: str = None, season: int = None):
+    if league is not None and league.isdigit():
+        stored = await snapshots.response(request, "leaderboard", int(league), season)
+        if stored is not None:
+            return stored
+    return await league_board_rows(league, season)
+
+##### Head-to-head records and recent form
+# Read from TeamMatches (migration 0010): each match once per side, ordered by (team_id, date,
+# match_id) and indexed by opponent and by venue, so every query is a range scan over the rows
+# it returns. Only matches on or before `before` (default today) count, so scheduled fixtures
+# stay out of the results.
+RESULT_NAMES = {"W": "win", "D": "draw", "L": "lose"}
+TEAM_MATCH_COLUMNS = """tm.match_id, tm.date, tm.league_id, tm.opponent_id, o.teamname AS opponent,
+                        tm.is_home, tm.goals_for, tm.goals_against, tm.result"""
+
+def team_record(matches):
+    record = {"played": len(matches), "win": 0, "draw": 0, "lose": 0, "goals_for": 0, "goals_against": 0}
+    for match in matches:
+        record[RESULT_NAMES[match["result"]]] += 1
+        record["goals_for"] += match["goals_for"]
+        record["goals_against"] += match["goals_against"]
+    record["points"] = record["win"] * 3 + record["draw"]
+    return record
+
+
+def team_names(cursor, team_ids):
+    cursor.execute(f"SELECT team_id, teamname FROM Teams WHERE team_id IN ({', '.join(['%s'] * len(team_ids))})",
+                   team_ids)
+    return {row["team_id"]: row["teamname"] for row in cursor.fetchall()}
+
+
+@app.get("/teams/h2h")
+async def get_head_to_head(team: int, opponent: int, last: int = Query(10, ge=1, le=100), before: str = None):
+    if team == opponent:
+        raise HTTPException(status_code=400, detail="team and opponent must be different teams.")
+    before = parse_date(before) if before else date.today()
+
+    def _h2h(cursor):
+        names = team_names(cursor, [team, opponent])
+        if len(names) < 2:
+            return names, [], []
+        cursor.execute("""SELECT is_home, COUNT(*) AS played, SUM(result = 'W') AS win, SUM(result = 'D') AS draw,
+                                 SUM(result = 'L') AS lose, SUM(goals_for) AS goals_for,
+                                 SUM(goals_against) AS goals_against
+                          FROM TeamMatches
+                          WHERE team_id = %s AND opponent_id = %s AND date <= %s
+                          GROUP BY is_home""", (team, opponent, before))
+        venues = cursor.fetchall()
+        cursor.execute(f"""SELECT {TEAM_MATCH_COLUMNS}
+                           FROM TeamMatches tm
+                           LEFT JOIN Teams o ON tm.opponent_id = o.team_id
+                           WHERE tm.team_id = %s AND tm.opponent_id = %s AND tm.date <= %s
+                           ORDER BY tm.date DESC, tm.match_id DESC
+                           LIMIT %s""", (team, opponent, before, last))
+        return names, venues, cursor.fetchall()
+
+    names, venues, matches = await run_db(_h2h)
+    if len(names) < 2:
+        raise HTTPException(status_code=404, detail="Team not found.")
+
+    fields = ("played", "win", "draw", "lose", "goals_for", "goals_against")
+    split = {}
+    for is_home in (1, 0):
+        row = next((venue for venue in venues if venue["is_home"] == is_home), {})
+        split["home" if is_home else "away"] = {field: int(row.get(field) or 0) for field in fields}
+    overall = {field: split["home"][field] + split["away"][field] for field in fields}
+    for record in (overall, split["home"], split["away"]):
+        record["points"] = record["win"] * 3 + record["draw"]
+
+    return TimedJSONResponse({
+        "team": {"team_id": team, "teamname": names[team]},
+        "opponent": {"team_id": opponent, "teamname": names[opponent]},
+        "overall": overall,
+        "home": split["home"],
+        "away": split["away"],
+        "matches": matches,
+    })
+
+
+# venue: home or away to only count those matches; form lists results newest first
+@app.get("/teams/form")
+async def get_team_form(team: int, last: int = Query(5, ge=1, le=100), venue: str = None, before: str = None):
+    if venue not in (None, "home", "away"):
+        raise HTTPException(status_code=400, detail="venue must be home or away.")
+    before = parse_date(before) if before else date.today()
+    condition, params = "tm.team_id = %s AND tm.date <= %s", [team, before]
+    if venue:
+        condition += " AND tm.is_home = %s"
+        params.append(int(venue == "home"))
+
+    def _form(cursor):
+        names = team_names(cursor, [team])
+        if not names:
+            return names, [], 0
+        cursor.execute(f"""SELECT {TEAM_MATCH_COLUMNS}
+                           FROM TeamMatches tm
+                           LEFT JOIN Teams o ON tm.opponent_id = o.team_id
+                           WHERE {condition}
+                           ORDER BY tm.date DESC, tm.match_id DESC
+                           LIMIT %s""", params + [last])
+        matches = cursor.fetchall()
+        streak = next((i for i, match in enumerate(matches) if match["result"] != matches[0]["result"]), None)
+        if matches and streak is None:
+            # The streak runs past the listed matches: find where it ends, then count up to there
+            cursor.execute(f"""SELECT tm.date, tm.match_id FROM TeamMatches tm
+                               WHERE {condition} AND tm.result <> %s
+                               ORDER BY tm.date DESC, tm.match_id DESC
+                               LIMIT 1""", params + [matches[0]["result"]])
+            end = cursor.fetchone()
+            query, count_params = f"SELECT COUNT(*) AS length FROM TeamMatches tm WHERE {condition}", list(params)
+            if end:
+                query += " AND (tm.date > %s OR (tm.date = %s AND tm.match_id > %s))"
+                count_params += [end["date"], end["date"], end["match_id"]]
+            cursor.execute(query, count_params)
+            streak = cursor.fetchone()["length"]
+        return names, matches, streak
+
+    names, matches, streak = await run_db(_form)
+    if not names:
+        raise HTTPException(status_code=404, detail="Team not found.")
+
+    return TimedJSONResponse({
+        "team_id": team,
+        "teamname": names[team],
+        "venue": venue,
+        "form": "".join(match["result"] for match in matches),
+        "record": team_record(matches),
+        "home": team_record([match for match in matches if match["is_home"]]),
+        "away": team_record([match for match in matches if not match["is_home"]]),
+        "streak": {"result": matches[0]["result"], "length": streak} if matches else None,
+        "matches": matches,
+    })
 
 ##### Players info
 @app.get("/players")
-async def get_all_players(page: int = 1, page_size: int = 10):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-
-    offset = (page - 1) * page_size
+async def get_all_players(response: Response, page: int = 1, page_size: int = 10, cursor: str = None):
     query = """SELECT 
                    p.player_id, 
                    p.playername, 
@@ -557,45 +877,126 @@ async def get_all_players(page: int = 1, page_size: int = 10):
                FROM Players p
                LEFT JOIN Teams t ON p.team_id = t.team_id
                LEFT JOIN Country c ON p.player_nationality_id = c.country_id
-               LIMIT %s OFFSET %s"""
-    cursor.execute(query, (page_size, offset))
-    players = cursor.fetchall()
+               WHERE 1 = 1"""
+    params = []
+    if cursor:
+        condition, cursor_params = keyset_filter("p.playername", "p.player_id", cursor)
+        query += f" AND {condition}"
+        params.extend(cursor_params)
+        offset = 0
+    else:
+        offset = (page - 1) * page_size
 
-    cursor.close()
-    db.close()
+    # Ordered by name so pages are stable and the (playername, player_id) index serves them
+    query += " ORDER BY p.playername, p.player_id LIMIT %s OFFSET %s"
+    params.extend([page_size, offset])
+
+    players = await cache.get_or_load("players", tuple(params), ["Players", "Teams", "Country"],
+                                      lambda: fetch_all(query, params))
 
     if not players:
         raise HTTPException(status_code=404, detail="No players found.")
 
+    set_next_cursor(response, players, page_size, "playername", "player_id")
+
     return players
 
+##### Transfer a player to another team (runs the TransferPlayer procedure)
+@app.post("/players/transfer", dependencies=[Depends(require_admin)])
+async def transfer_player(player_id: int = Form(...), team_id: int = Form(...)):
+    def _transfer(cursor):
+        cursor.execute("SELECT team_id FROM Players WHERE player_id = %s", (player_id,))
+        if cursor.fetchone() is None:
+            return False
+        cursor.callproc("TransferPlayer", (player_id, team_id))
+        return True
+
+    if not await run_db(_transfer, commit=True):
+        raise HTTPException(status_code=404, detail="Player not found.")
+
+    # Rosters and player listings are cached, drop everything read from Players
+    await cache.invalidate_tables("Players")
+    return {"message": "Player transferred successfully."}
+
+########## Admin Jobs #################
+# Bulk transfers and score corrections run in the background in grouped transactions
+# (see jobs.py). Submitting returns 202 with a job_id; poll /admin/jobs/{job_id} for progress.
+class Transfer(BaseModel):
+    player_id: int
+    team_id: int
+
+class TransferBatch(BaseModel):
+    transfers: list[Transfer]
+
+class ScoreCorrection(BaseModel):
+    match_id: int
+    hometeam_score: int
+    awayteam_score: int
+
+class ScoreBatch(BaseModel):
+    scores: list[ScoreCorrection]
+
+def submit_job(kind, operations):
+    if not operations:
+        raise HTTPException(status_code=400, detail="No operations given.")
+    job = job_runner.submit(kind, operations)
+    return JSONResponse(content={"job_id": job.job_id, "status": job.status, "total": len(operations)},
+                        status_code=202)
+
+@app.post("/admin/jobs/transfers", dependencies=[Depends(require_admin)])
+async def submit_transfers(batch: TransferBatch):
+    return submit_job("transfers", [transfer.model_dump() for transfer in batch.transfers])
+
+@app.post("/admin/jobs/scores", dependencies=[Depends(require_admin)])
+async def submit_score_corrections(batch: ScoreBatch):
+    return submit_job("scores", [score.model_dump() for score in batch.scores])
+
+@app.get("/admin/jobs", dependencies=[Depends(require_admin)])
+async def list_jobs(limit: int = 20):
+    return job_runner.recent(limit)
+
+@app.get("/admin/jobs/{job_id}", dependencies=[Depends(require_admin)])
+async def get_job(job_id: str):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
 ##### Country info
 @app.get("/nationality")
 async def get_nationality():
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Country;")
-    nationality = cursor.fetchall()
-    return nationality
+    return await cache.get_or_load("nationality", (), ["Country"],
+                                   lambda: fetch_all("SELECT * FROM Country;"))
 
 ##### Leagues info 
 @app.get("/leagues")
 async def get_all_leagues():
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM Leagues;")
-    leagues = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return leagues
+    return await cache.get_or_load("leagues", (), ["Leagues"],
+                                   lambda: fetch_all("SELECT * FROM Leagues;"))
 
 ############ Top Scorers Ranked ###############
-##### Players by team_id
+# Name filters are matched against the small reference tables once and cached as ids,
+# so the ranking itself only filters PlayerSeasonTotals on indexed id columns.
+NAME_FILTERS = {
+    "league": ("Leagues", "league_id", "leaguename"),
+    "team": ("Teams", "team_id", "teamname"),
+    "nationality": ("Country", "country_id", "countryname"),
+}
+
+async def resolve_name_filter(kind, name):
+    table, id_column, name_column = NAME_FILTERS[kind]
+    pattern = f"%{name.lower()}%"
+    rows = await cache.get_or_load(f"{kind}_ids", (pattern,), [table], lambda: fetch_all(
+        f"SELECT {id_column} AS id FROM {table} WHERE LOWER({name_column}) LIKE %s", (pattern,)))
+    return [row["id"] for row in rows]
+
+##### Players ranked by goals
 @app.get("/top-scorers-ranked")
 async def get_top_scorers_ranked(
     league: str = Query(None, description="League name to filter by"),
     team: str = Query(None, description="Team name to filter by"),
     nationality: str = Query(None, description="Nationality to filter by"),
+    season: int = Query(None, description="Season (starting year) to rank, all seasons if omitted"),
     limit: int = Query(10, description="Number of top scorers to retrieve")
 ):
     if sum(param is not None for param in [league, team, nationality]) > 1:
@@ -604,53 +1005,61 @@ async def get_top_scorers_ranked(
             detail="Only one of league, team, or nationality filters can be used at a time."
         )
 
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    totals_query = """
+                SELECT player_id, SUM(goals) AS total_goals
+                FROM PlayerSeasonTotals
+                WHERE 1=1
+    """
+    params = []
 
-    base_query = """
+    # Adding filters dynamically based on user input
+    filters = {}
+    for kind, name, column in [("league", league, "league_id"), ("team", team, "team_id"),
+                               ("nationality", nationality, "nationality_id")]:
+        if name:
+            ids = await resolve_name_filter(kind, name)
+            if not ids:
+                return JSONResponse(content={"message": "No top scorers found."}, status_code=200)
+            filters[kind] = ids
+            totals_query += f" AND {column} IN ({', '.join(['%s'] * len(ids))})"
+            params.extend(ids)
+
+    if season is not None:
+        totals_query += " AND season = %s"
+        params.append(season)
+
+    # Only the top `limit` rows are joined for names; RANK() over that prefix equals the
+    # rank over all players because every higher-scoring player is inside it.
+    base_query = f"""
         SELECT 
             player_id, playername, teamname, leaguename, nationality, total_goals,
             RANK() OVER (ORDER BY total_goals DESC) AS score_rank
         FROM (
             SELECT 
                 p.player_id, p.playername, t.teamname, l.leaguename, c.countryname AS nationality,
-                SUM(s.goal) AS total_goals
-            FROM Statistics s
-            INNER JOIN Players p ON s.player_id = p.player_id
+                totals.total_goals
+            FROM ({totals_query}
+                GROUP BY player_id
+            ) AS totals
+            INNER JOIN Players p ON totals.player_id = p.player_id
             INNER JOIN Teams t ON p.team_id = t.team_id
             INNER JOIN Leagues l ON t.league_id = l.league_id
             LEFT JOIN Country c ON p.player_nationality_id = c.country_id
-            WHERE 1=1
-    """
-
-    params = []
-    # Adding filters dynamizcally based on user input
-    if league:
-        base_query += " AND LOWER(l.leaguename) LIKE %s"
-        params.append(f"%{league.lower()}%")
-    elif team:
-        base_query += " AND LOWER(t.teamname) LIKE %s"
-        params.append(f"%{team.lower()}%")
-    elif nationality:
-        base_query += " AND LOWER(c.countryname) LIKE %s"
-        params.append(f"%{nationality.lower()}%")
-    
-    # Complete the query: group by the same columns used in SELECT
-    base_query += """
-            GROUP BY p.player_id, p.playername, t.teamname, l.leaguename, nationality
+            ORDER BY totals.total_goals DESC, p.playername ASC
+            LIMIT %s
         ) AS GoalsSubquery
         ORDER BY score_rank ASC, playername ASC
-        LIMIT %s
     """
 
     # Finally, add the limit
     params.append(limit)
 
-    cursor.execute(base_query, params)
-    ranked_scorers = cursor.fetchall()
-    
-    cursor.close()
-    db.close()
+    snapshot = await analytics.get()
+    if snapshot is not None:
+        ranked_scorers = snapshot.top_scorers(filters.get("league"), filters.get("team"), filters.get("nationality"),
+                                              season, limit)
+    else:
+        ranked_scorers = await fetch_all(base_query, params)
 
     if not ranked_scorers:
         return JSONResponse(content={"message": "No top scorers found."}, status_code=200)
@@ -660,141 +1069,139 @@ async def get_top_scorers_ranked(
 ############ Notifications ###############
 @app.get("/notifications/{user_id}")
 async def get_notifications(user_id: int):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("""
+    read_as(user_id)
+    return await fetch_all("""
         SELECT notification_id, message, created_at
         FROM Notifications
         WHERE user_id = %s
         ORDER BY created_at DESC
         LIMIT 20
     """, (user_id,))
-    notifications = cursor.fetchall()
-    cursor.close()
-    db.close()
 
-    return notifications
+############ Dashboard ###############
+##### A user's home screen in one round trip
+# fields: comma separated subset of DASHBOARD_SECTIONS, all sections if omitted.
+# Sections run concurrently, each on its own pooled connection.
+DASHBOARD_SECTIONS = ("favorite_players", "favorite_teams", "notifications", "recent_games")
+
+@app.get("/dashboard/{user_id}")
+async def get_dashboard(user_id: int, fields: str = None, league: str = None, page_size: int = 10):
+    read_as(user_id)
+    sections = list(DASHBOARD_SECTIONS)
+    if fields:
+        sections = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in sections if field not in DASHBOARD_SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown dashboard fields: {', '.join(unknown)}")
+
+    loaders = {
+        "favorite_players": lambda: view_fav_player(user_id),
+        "favorite_teams": lambda: view_fav_team(user_id),
+        "notifications": lambda: get_notifications(user_id),
+        "recent_games": lambda: recent_games(Response(), league=league, page=1, page_size=page_size, cursor=None),
+    }
+    results = await asyncio.gather(*(loaders[section]() for section in sections))
+    return dict(zip(sections, results))
 
 ## advanced feature R11, player form tracker
 # Player form tracker endpoint
 @app.get("/players/form_tracker")
-async def player_form_tracker(player_id: int):
+async def player_form_tracker(
+    player_id: int,
+    window: int = Query(5, ge=1, description="Number of matches in the rolling averages"),
+    start_date: str = None,
+    end_date: str = None,
+    limit: int = Query(None, ge=1, description="Only the player's latest N matches")
+):
     """
     Endpoint to track a player's recent performance.
     Returns two JSON lists:
-      - form_tracker: Contains the rolling average of goals over the last 5 matches along with goals,
-                      pass accuracy, assists, and playtime.
+      - form_tracker: Contains the rolling averages over the last `window` matches (goals, assists,
+                      pass accuracy and playtime) along with goals, pass accuracy, assists, and playtime.
       - games: List of all games that this player played in along with goals, pass accuracy, assists, and playtime.
+    Both are read in one query from PlayerForm, whose running totals turn each rolling
+    average into a lookup of the appearance `window` matches earlier.
     """
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    
-    # Query 1: Get rolling average performance data with additional stats
-    form_tracker_query = """
-    SELECT 
-        s.player_id, 
-        p.playername, 
-        m.date, 
-        s.goal,
-        s.pass_acc,
-        s.assist,
-        s.playtime,
-        AVG(s.goal) OVER (
-            PARTITION BY s.player_id 
-            ORDER BY m.date 
-            ROWS BETWEEN 4 PRECEDING AND CURRENT ROW
-        ) AS rolling_goal_avg
-    FROM Statistics s
-    JOIN Matches m ON s.match_id = m.match_id
-    JOIN Players p ON s.player_id = p.player_id
-    WHERE s.player_id = %s
-    ORDER BY m.date ASC;
-    """
-    cursor.execute(form_tracker_query, (player_id,))
-    form_tracker_data = cursor.fetchall()
-    
-    # Query 2: Get details for all games the player participated in including performance stats
-    all_games_query = """
+    query = """
     SELECT 
-        m.match_id,
-        m.date,
+        cur.player_id,
+        p.playername,
+        cur.match_id,
+        cur.date,
         m.match_location,
         m.league_id,
         home.teamname AS home_team,
         away.teamname AS away_team,
         m.hometeam_score,
         m.awayteam_score,
-        s.goal,
-        s.pass_acc,
-        s.assist,
-        s.playtime
-    FROM Matches m
-    JOIN Statistics s ON m.match_id = s.match_id
+        cur.goal,
+        cur.pass_acc,
+        cur.assist,
+        cur.playtime,
+        (cur.cum_goals - IFNULL(prev.cum_goals, 0)) / LEAST(cur.appearance_no, %s) AS rolling_goal_avg,
+        (cur.cum_assists - IFNULL(prev.cum_assists, 0)) / LEAST(cur.appearance_no, %s) AS rolling_assist_avg,
+        (cur.cum_pass_acc - IFNULL(prev.cum_pass_acc, 0)) / LEAST(cur.appearance_no, %s) AS rolling_pass_acc_avg,
+        (cur.cum_playtime - IFNULL(prev.cum_playtime, 0)) / LEAST(cur.appearance_no, %s) AS rolling_playtime_avg
+    FROM PlayerForm cur
+    LEFT JOIN PlayerForm prev
+        ON prev.player_id = cur.player_id AND prev.appearance_no = cur.appearance_no - %s
+    JOIN Players p ON cur.player_id = p.player_id
+    JOIN Matches m ON cur.match_id = m.match_id AND cur.date = m.date
     LEFT JOIN Teams home ON m.hometeam_id = home.team_id
     LEFT JOIN Teams away ON m.awayteam_id = away.team_id
-    WHERE s.player_id = %s
-    ORDER BY m.date ASC;
+    WHERE cur.player_id = %s
     """
-    cursor.execute(all_games_query, (player_id,))
-    all_games_data = cursor.fetchall()
-    
-    cursor.close()
-    db.close()
-    
-    if not form_tracker_data:
+    params = [window] * 5 + [player_id]
+
+    if start_date:
+        query += " AND cur.date >= %s"
+        params.append(start_date)
+
+    if end_date:
+        query += " AND cur.date <= %s"
+        params.append(end_date)
+
+    # Newest first so LIMIT keeps the latest matches, flipped back to date order below
+    query += " ORDER BY cur.appearance_no DESC"
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    rows = await fetch_all(query, params)
+    rows.reverse()
+
+    if not rows:
         raise HTTPException(status_code=404, detail="No data found for player performance.")
-    
-    return {
-        "form_tracker": form_tracker_data,
-        "games": all_games_data
-    }
 
-@app.get("/league/standings")
-async def get_league_standings(league: int):
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    form_tracker_fields = ("player_id", "playername", "date", "goal", "pass_acc", "assist", "playtime",
+                           "rolling_goal_avg", "rolling_assist_avg", "rolling_pass_acc_avg", "rolling_playtime_avg")
+    games_fields = ("match_id", "date", "match_location", "league_id", "home_team", "away_team",
+                    "hometeam_score", "awayteam_score", "goal", "pass_acc", "assist", "playtime")
+
+    return TimedJSONResponse({
+        "form_tracker": [{field: row[field] for field in form_tracker_fields} for row in rows],
+        "games": [{field: row[field] for field in games_fields} for row in rows]
+    })
+
+async def league_standings_rows(league, season=None):
+    snapshot = await analytics.get()
+    if snapshot is not None:
+        return snapshot.league_standings(league, season)
+
     query = """
-    WITH match_status AS (
-        SELECT 
-            match_id,
-            hometeam_id,
-            awayteam_id,
-            CASE 
-                WHEN hometeam_score = awayteam_score THEN 'draw'
-                WHEN hometeam_score > awayteam_score THEN 'home_win'
-                ELSE 'away_win' 
-            END AS result
-        FROM Matches
-        WHERE league_id = %s
-    ),
-    home_results AS (
-        SELECT hometeam_id AS team_id,
-               COUNT(CASE WHEN hometeam_score > awayteam_score THEN 1 END) AS win,
-               COUNT(CASE WHEN hometeam_score < awayteam_score THEN 1 END) AS lose,
-               COUNT(CASE WHEN hometeam_score = awayteam_score THEN 1 END) AS draw
-        FROM Matches
-        WHERE league_id = %s
-        GROUP BY hometeam_id
-    ),
-    away_results AS (
-        SELECT awayteam_id AS team_id,
-               COUNT(CASE WHEN awayteam_score > hometeam_score THEN 1 END) AS win,
-               COUNT(CASE WHEN awayteam_score < hometeam_score THEN 1 END) AS lose,
-               COUNT(CASE WHEN awayteam_score = hometeam_score THEN 1 END) AS draw
-        FROM Matches
-        WHERE league_id = %s
-        GROUP BY awayteam_id
-    ),
-    team_results AS (
+    WITH team_results AS (
         SELECT team_id,
                SUM(win) AS win,
                SUM(lose) AS lose,
                SUM(draw) AS draw
-        FROM (
-            SELECT * FROM home_results
-            UNION ALL
-            SELECT * FROM away_results
-        ) AS combined
+        FROM TeamStandings
+        WHERE league_id = %s"""
+    params = [league]
+    if season is not None:
+        query += " AND season = %s"
+        params.append(season)
+
+    query += """
         GROUP BY team_id
     )
     SELECT 
@@ -812,12 +1219,189 @@ async def get_league_standings(league: int):
     WHERE t.league_id = %s
     ORDER BY points DESC, win DESC, draw DESC;
     """
-    # We need to supply 'league' four times for the placeholders above.
-    cursor.execute(query, (league, league, league, league))
-    standings = cursor.fetchall()
-    cursor.close()
-    db.close()
-    return standings
+    params.append(league)
+    return await fetch_all(query, params)
+
+@app.get("/league/standings")
+async def get_league_standings(request: Request, league: int, season: int = None):
+    stored = await snapshots.response(request, "standings", league, season)
+    if stored is not None:
+        return stored
+    return await league_standings_rows(league, season)
+
+snapshots.register("standings", league_standings_rows)
+snapshots.register("leaderboard", league_board_rows)
+
+########## Live Updates #################
+# Server push instead of polling /notifications and /recentgames. A connection for a user
+# subscribes to "user:<id>" (their notifications) plus "team:<id>" / "player:<id>" for each
+# favorite, and follows favorite changes as they happen. Extra channels such as "league:1"
+# can be passed with `channels` (comma separated) or, over WebSocket, with
+# {"action": "subscribe" | "unsubscribe", "channels": [...]}.
+# Messages are JSON objects with "channel" and "type" (notification, match_scheduled,
+# score, goal_milestone, favorites_changed).
+PUSH_CHANNEL_KINDS = ("user", "team", "player", "league")
+PUSH_KEEPALIVE_SECONDS = 15
+
+def push_channels(channels):
+    if not channels:
+        return []
+    if isinstance(channels, str):
+        channels = channels.split(",")
+    valid = []
+    for channel in channels:
+        kind, _, entity = channel.strip().partition(":")
+        if kind not in PUSH_CHANNEL_KINDS or not entity.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid channel: {channel}")
+        valid.append(f"{kind}:{entity}")
+    return valid
+
+async def favorite_channels(user_id):
+    read_as(user_id)
+    def _channels(cursor):
+        cursor.execute("SELECT team_id FROM FavoriteTeams WHERE user_id = %s", (user_id,))
+        channels = [f"team:{row['team_id']}" for row in cursor.fetchall()]
+        cursor.execute("SELECT player_id FROM FavoritePlayers WHERE user_id = %s", (user_id,))
+        channels.extend(f"player:{row['player_id']}" for row in cursor.fetchall())
+        return channels
+
+    return [f"user:{user_id}"] + await run_db(_channels)
+
+async def refresh_favorites(subscription, user_id, favorites):
+    current = set(await favorite_channels(user_id))
+    subscription.remove(favorites - current)
+    subscription.add(current - favorites)
+    return current
+
+def push_json(message):
+    return json.dumps(message, default=str)
+
+##### WebSocket
+@app.websocket("/ws/{user_id}")
+async def live_updates_ws(websocket: WebSocket, user_id: int, channels: str = None):
+    try:
+        extra = push_channels(channels)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    favorites = set(await favorite_channels(user_id))
+    subscription = broker.subscribe(favorites | set(extra))
+
+    async def receive():
+        while True:
+            try:
+                request = json.loads(await websocket.receive_text())
+                requested = push_channels(request.get("channels", []))
+            except (ValueError, AttributeError, HTTPException):
+                await websocket.send_text(push_json({"type": "error", "detail": "Invalid subscription request."}))
+                continue
+            if request.get("action") == "unsubscribe":
+                subscription.remove(requested)
+            else:
+                subscription.add(requested)
+
+    async def send():
+        nonlocal favorites
+        while True:
+            message = await subscription.get()
+            if message["type"] == "favorites_changed":
+                favorites = await refresh_favorites(subscription, user_id, favorites)
+            await websocket.send_text(push_json(message))
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+    # Surface unexpected errors from the finished task (a disconnect is the normal way out)
+    for task in tasks:
+        if task.done() and not task.cancelled() and not isinstance(task.exception(), WebSocketDisconnect):
+            raise task.exception()
+
+##### Server-Sent Events
+@app.get("/events/{user_id}")
+async def live_updates_sse(request: Request, user_id: int, channels: str = None):
+    extra = push_channels(channels)
+    favorites = set(await favorite_channels(user_id))
+    subscription = broker.subscribe(favorites | set(extra))
+
+    async def events():
+        nonlocal favorites
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                message = await subscription.get(timeout=PUSH_KEEPALIVE_SECONDS)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                if message["type"] == "favorites_changed":
+                    favorites = await refresh_favorites(subscription, user_id, favorites)
+                yield f"event: {message['type']}\ndata: {push_json(message)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+########## Export Feature #################
+# Bulk exports streamed as NDJSON (default) or CSV with `format=csv`. Filters are the
+# same as the search endpoints; rows come from an unbuffered cursor in batches, so
+# the API server's memory use does not grow with the size of the export.
+@app.get("/export/matches")
+async def export_matches(start_date: str = None, end_date: str = None, league: int = None,
+                         season: int = None, format: str = "ndjson"):
+    query = """SELECT Matches.match_id, Matches.date, Matches.match_location,
+                      Matches.league_id, Leagues.leaguename,
+                      Matches.hometeam_id, Matches.awayteam_id,
+                      home.teamname as home_team, away.teamname as away_team,
+                      Matches.hometeam_score, Matches.awayteam_score
+               FROM Matches
+               LEFT JOIN Leagues ON Matches.league_id = Leagues.league_id
+               LEFT JOIN Teams as home on Matches.hometeam_id = home.team_id
+               LEFT JOIN Teams as away on Matches.awayteam_id = away.team_id
+               WHERE 1 = 1"""
+    conditions, params = match_filters(start_date, end_date, league, season)
+    query += conditions + " ORDER BY Matches.date, Matches.match_id"
+    return stream_export(query, params, format, "matches")
+
+@app.get("/export/statistics")
+async def export_statistics(start_date: str = None, end_date: str = None, league: int = None,
+                            season: int = None, player_id: int = None, team: str = None,
+                            format: str = "ndjson"):
+    query = """SELECT Statistics.match_id, Matches.date, Matches.league_id,
+                      Statistics.player_id, Players.playername, Players.team_id,
+                      Statistics.goal, Statistics.assist, Statistics.pass_acc, Statistics.playtime
+               FROM Statistics
+               JOIN Matches ON Statistics.match_id = Matches.match_id AND Statistics.match_date = Matches.date
+               JOIN Players ON Statistics.player_id = Players.player_id
+               WHERE 1 = 1"""
+    conditions, params = match_filters(start_date, end_date, league, season,
+                                       date_columns=("Matches.date", "Statistics.match_date"))
+    query += conditions
+    if player_id is not None:
+        query += " AND Statistics.player_id = %s"
+        params.append(player_id)
+    if team:
+        query += " AND Players.team_id = %s"
+        params.append(team)
+    query += " ORDER BY Statistics.match_id, Statistics.player_id"
+    return stream_export(query, params, format, "statistics")
+
+@app.get("/export/players")
+async def export_players(name: str = None, team: str = None, position: str = None, nationality: int = None,
+                         format: str = "ndjson"):
+    query = """SELECT player_id, playername, Players.team_id, teamname, position,
+                      player_nationality_id, countryname as nationality, age
+               FROM Players
+               LEFT JOIN Teams ON Players.team_id = Teams.team_id
+               LEFT JOIN Country ON Players.player_nationality_id = Country.country_id
+               WHERE 1 = 1"""
+    conditions, params = player_filters(name, team, position, nationality)
+    query += conditions + " ORDER BY player_id"
+    return stream_export(query, params, format, "players")
 
 if __name__ == '__main__':
     uvicorn.run(app, port=5001)
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+
+from dotenv import load_dotenv
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+load_dotenv()
+
+
+########## Pub/Sub Brokers #################
+# Channels are plain strings: "user:<id>", "team:<id>", "player:<id>", "league:<id>".
+# Both brokers expose: await publish(channel, message), subscribe(channels) -> Subscription,
+# and stats(). Messages are JSON-serializable dicts.
+
+##### A subscriber's mailbox
+# Bounded so one slow client cannot grow memory without limit: when the queue is full the
+# oldest message is dropped (and counted) rather than blocking the publisher.
+class Subscription:
+    def __init__(self, broker, channels, maxsize=100):
+        self._broker = broker
+        self.channels = set()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.add(channels)
+
+    def add(self, channels):
+        for channel in set(channels) - self.channels:
+            self.channels.add(channel)
+            self._broker._attach(channel, self)
+
+    def remove(self, channels):
+        for channel in set(channels) & self.channels:
+            self.channels.discard(channel)
+            self._broker._detach(channel, self)
+
+    def deliver(self, channel, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait({"channel": channel, **message})
+
+    async def get(self, timeout=None):
+        """Next message, or None when nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.remove(list(self.channels))
+
+
+##### In-process broker: publishers and subscribers share one event loop
+class LocalBroker:
+    def __init__(self):
+        self._subscribers = {}
+        self._metrics = {"published": 0, "delivered": 0}
+
+    def _attach(self, channel, subscription):
+        self._subscribers.setdefault(channel, set()).add(subscription)
+
+    def _detach(self, channel, subscription):
+        subscribers = self._subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[channel]
+
+    def _deliver(self, channel, message):
+        subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(channel, message)
+        self._metrics["delivered"] += len(subscribers)
+
+    async def publish(self, channel, message):
+        self._metrics["published"] += 1
+        self._deliver(channel, message)
+
+    def subscribe(self, channels, maxsize=100):
+        return Subscription(self, channels, maxsize)
+
+    def stats(self):
+        stats = dict(self._metrics)
+        stats["channels"] = len(self._subscribers)
+        stats["subscriptions"] = len({s for subs in self._subscribers.values() for s in subs})
+        stats["backend"] = type(self).__name__
+        return stats
+
+
+##### Redis pub/sub: fans messages out across several API processes
+# Publishes go to Redis; one pattern subscription per process feeds the local subscribers.
+class RedisBroker(LocalBroker):
+    def __init__(self, client, prefix="soccer:push:"):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+        self._listener = None
+
+    async def publish(self, channel, message):
+        self._metrics["published"] += 1
+        await self.client.publish(self.prefix + channel, json.dumps(message, default=str))
+
+    def subscribe(self, channels, maxsize=100):
+        if self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(channels, maxsize)
+
+    async def _listen(self):
+        pubsub = self.client.pubsub()
+        await pubsub.psubscribe(self.prefix + "*")
+        async for item in pubsub.listen():
+            if item["type"] != "pmessage":
+                continue
+            channel = item["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            self._deliver(channel[len(self.prefix):], json.loads(item["data"]))
+
+
+def _make_broker():
+    backend = os.getenv('BROKER_BACKEND', 'local')
+    if backend == 'redis':
+        if aioredis is None:
+            raise RuntimeError("BROKER_BACKEND=redis requires the redis package")
+        return RedisBroker(aioredis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0')))
+    return LocalBroker()
+
+
+broker = _make_broker()
@@ -0,0 +1,242 @@
+import fnmatch
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+load_dotenv()
+
+
+########## Cache Backends #################
+# Both backends expose the same small, synchronous interface: get(key) -> (hit, value),
+# set(key, value, ttl), delete(key), clear(), plus per-table generation counters
+# (generations(tables) / bump(table)) that are never evicted. `blocking` backends do
+# network I/O, so QueryCache calls them from the threadpool, never on the event loop.
+
+##### Local bounded LRU with per-entry TTL
+class LRUCache:
+    blocking = False
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def generations(self, tables):
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def bump(self, table):
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+##### Redis (or any redis-py compatible client)
+# Values are pickled so Decimal/date rows survive the round trip.
+class RedisCache:
+    blocking = True
+
+    def __init__(self, client, prefix="soccer:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def generations(self, tables):
+        # One round trip for all the counters of a lookup
+        if not tables:
+            return ()
+        values = self.client.mget([self.prefix + "gen:" + table for table in tables])
+        return tuple(int(value) if value is not None else 0 for value in values)
+
+    def bump(self, table):
+        self.client.incr(self.prefix + "gen:" + table)
+
+    def clear(self):
+        # Generation counters are kept so other processes never see a counter go backwards
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            name = key.decode() if isinstance(key, bytes) else key
+            if name.startswith(self.prefix + "gen:"):
+                continue
+            self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + "*"))
+
+
+##### In-memory stand-in for a redis client, used when no server is available
+class FakeRedis:
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, name):
+        entry = self._data.get(name)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[name]
+            return None
+        return entry
+
+    def get(self, name):
+        with self._lock:
+            entry = self._alive(name)
+            return entry[0] if entry else None
+
+    def mget(self, names):
+        with self._lock:
+            return [entry[0] if entry else None for entry in map(self._alive, names)]
+
+    def set(self, name, value, ex=None):
+        with self._lock:
+            self._data[name] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def incr(self, name):
+        with self._lock:
+            entry = self._alive(name)
+            value = int(entry[0]) + 1 if entry else 1
+            self._data[name] = (str(value).encode(), entry[1] if entry else None)
+            return value
+
+    def scan_iter(self, match="*"):
+        with self._lock:
+            names = list(self._data)
+        return iter([name for name in names if fnmatch.fnmatchcase(name, match)])
+
+
+########## Read-through Cache #################
+# Entries are tagged with the tables they were read from. Each table has a
+# generation counter that is part of every key, so invalidating a table is a
+# single increment and its stale entries simply age out of the LRU / TTL.
+class QueryCache:
+    def __init__(self, backend, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    def _key(self, name, params, tables):
+        tables = sorted(tables)
+        generations = ",".join(f"{table}={generation}"
+                               for table, generation in zip(tables, self.backend.generations(tables)))
+        return f"{name}:{params!r}:[{generations}]"
+
+    def _lookup(self, name, params, tables):
+        key = self._key(name, params, tables)
+        return key, self.backend.get(key)
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    async def generations(self, tables):
+        """Current generation of each table, in order (changes whenever one is invalidated)."""
+        return await self._call(self.backend.generations, tuple(tables))
+
+    async def get_or_load(self, name, params, tables, loader, ttl=None):
+        """Return the cached result for (name, params), calling `await loader()` on a miss."""
+        key, (hit, value) = await self._call(self._lookup, name, params, tables)
+        if hit:
+            self._count("hits")
+            return value
+
+        self._count("misses")
+        value = await loader()
+        await self._call(self.backend.set, key, value, ttl or self.ttl)
+        return value
+
+    async def invalidate(self, name, params, tables):
+        await self._call(lambda: self.backend.delete(self._key(name, params, tables)))
+        self._count("invalidations")
+
+    async def invalidate_tables(self, *tables):
+        for table in tables:
+            await self._call(self.backend.bump, table)
+            self._count("invalidations")
+
+    async def clear(self):
+        await self._call(self.backend.clear)
+        self._count("invalidations")
+
+    def stats(self):
+        """Counters and entry count; counting entries scans a redis backend, call it from a thread."""
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["backend"] = type(self.backend).__name__
+        stats["entries"] = len(self.backend)
+        return stats
+
+
+def _make_backend():
+    backend = os.getenv('CACHE_BACKEND', 'local')
+    if backend == 'redis':
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        return RedisCache(redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0')))
+    if backend == 'fakeredis':
+        return RedisCache(FakeRedis())
+    return LRUCache(maxsize=int(os.getenv('CACHE_MAX_ENTRIES', 1024)))
+
+
+cache = QueryCache(_make_backend(), ttl=int(os.getenv('CACHE_TTL', 300)))
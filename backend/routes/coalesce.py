@@ -0,0 +1,128 @@
+import asyncio
+import os
+import threading
+from urllib.parse import parse_qsl, urlencode
+
+########## Request coalescing (single-flight) #################
+# Pure ASGI middleware for public GET endpoints. Requests for the same path and the same query
+# parameters (in any order) that arrive while one of them is being answered wait for it and
+# receive a copy of its response instead of running the handler and its queries again.
+# With `reuse_seconds` > 0 a 200 response is also replayed to identical requests for that many
+# seconds after it finished. Client errors (4xx, e.g. a 404 for an unknown id) are shared like
+# any other answer; streaming responses and server errors (5xx, e.g. a 503 pool timeout) are
+# not: the waiting requests then run on their own.
+# It sits inside CORSMiddleware and CompressionMiddleware, so CORS headers, ETag/304 and the
+# encoding are still decided per request.
+COALESCE_PATHS = ("/recentgames", "/game", "/teams/players", "/teams/stats", "/teams/details",
+                  "/teams/leaderboard", "/teams/h2h", "/teams/form", "/league/standings",
+                  "/top-scorers-ranked", "/players", "/players/form_tracker")
+
+# Request headers a handler may answer differently to (pre-rendered snapshots negotiate these)
+KEY_HEADERS = (b"accept-encoding", b"if-none-match")
+
+
+def request_key(scope):
+    params = sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+    headers = dict(scope["headers"])
+    return (scope["path"] + "?" + urlencode(params),) + tuple(headers.get(name) for name in KEY_HEADERS)
+
+
+def copy_start(message):
+    return {**message, "headers": list(message.get("headers", []))}
+
+
+class Flight:
+    __slots__ = ("done", "start", "body", "shareable")
+
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.start = None
+        self.body = []
+        self.shareable = False
+
+
+class CoalesceStats:
+    def __init__(self):
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def record(self, path, outcome):
+        with self._lock:
+            stats = self._paths.setdefault(path, {"executed": 0, "collapsed": 0, "reused": 0, "fallbacks": 0})
+            stats[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            paths = {path: dict(stats) for path, stats in self._paths.items()}
+        for stats in paths.values():
+            served = stats["executed"] + stats["collapsed"] + stats["reused"]
+            stats["saved_ratio"] = round((stats["collapsed"] + stats["reused"]) / served, 3) if served else 0.0
+        return paths
+
+
+coalesce_stats = CoalesceStats()
+
+
+class CoalescingMiddleware:
+    def __init__(self, app, paths=COALESCE_PATHS, reuse_seconds=0.0):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.reuse_seconds = reuse_seconds
+        self._flights = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = request_key(scope)
+        flight = self._flights.get(key)
+        if flight is not None:
+            reused = flight.done.is_set()
+            await flight.done.wait()
+            if flight.shareable:
+                coalesce_stats.record(scope["path"], "reused" if reused else "collapsed")
+                await send(copy_start(flight.start))
+                await send({"type": "http.response.body", "body": b"".join(flight.body)})
+                return
+            coalesce_stats.record(scope["path"], "fallbacks")
+            await self.app(scope, receive, send)
+            return
+
+        flight = self._flights[key] = Flight()
+        complete = False
+
+        async def capturing_send(message):
+            nonlocal complete
+            if message["type"] == "http.response.start":
+                # Outer middleware (CORS) edits the headers of the message it is sent in place
+                flight.start = copy_start(message)
+            elif message["type"] == "http.response.body":
+                flight.body.append(message.get("body", b""))
+                # A body sent in several parts is a stream: left unshared
+                complete = not message.get("more_body", False) and len(flight.body) == 1
+            await send(message)
+
+        coalesce_stats.record(scope["path"], "executed")
+        try:
+            await self.app(scope, receive, capturing_send)
+        finally:
+            flight.shareable = complete and flight.start is not None and flight.start["status"] < 500
+            flight.done.set()
+            reuse = flight.shareable and self.reuse_seconds > 0 and flight.start["status"] == 200
+            if reuse:
+                asyncio.get_running_loop().call_later(self.reuse_seconds, self._expire, key, flight)
+            else:
+                self._expire(key, flight)
+
+    def _expire(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+def coalesce_settings():
+    paths = os.getenv('COALESCE_PATHS')
+    return {
+        "paths": [path.strip() for path in paths.split(",") if path.strip()] if paths is not None else COALESCE_PATHS,
+        "reuse_seconds": float(os.getenv('COALESCE_REUSE_SECONDS', 0)),
+    }
@@ -0,0 +1,396 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import mysql.connector
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+
+from profiling import TimedCursor, current_profile
+
+load_dotenv()
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within the pool timeout."""
+
+
+########## Connection Pool #################
+# A small bounded pool around mysql.connector connections.
+#   - `size` connections are kept open and reused between requests
+#   - up to `max_overflow` extra connections are opened under burst load and
+#     closed again as soon as they are returned
+#   - callers wait at most `timeout` seconds for a free connection
+#   - connections older than `recycle` seconds are replaced, and connections
+#     idle for more than `ping_interval` seconds are pinged before reuse
+class ConnectionPool:
+    def __init__(self, size=5, max_overflow=10, timeout=30.0, recycle=3600,
+                 ping_interval=30.0, **connect_args):
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.ping_interval = ping_interval
+        self._connect_args = connect_args
+
+        # Idle entries are (connection, last_used); creation times live in _created
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+
+        self._metrics = {
+            "checkouts": 0,
+            "connects": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+            "discarded": 0,
+            "health_check_failures": 0,
+            "peak_in_use": 0,
+        }
+        self._created = {}
+
+    def _connect(self):
+        connection = mysql.connector.connect(**self._connect_args)
+        with self._lock:
+            self._metrics["connects"] += 1
+            self._created[id(connection)] = time.monotonic()
+        return connection
+
+    def _discard(self, connection):
+        with self._lock:
+            self._opened -= 1
+            self._metrics["discarded"] += 1
+            self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
+
+    def _is_healthy(self, connection, last_used):
+        now = time.monotonic()
+        created_at = self._created.get(id(connection), now)
+        if self.recycle and now - created_at > self.recycle:
+            return False
+        if now - last_used > self.ping_interval:
+            try:
+                connection.ping(reconnect=False)
+            except mysql.connector.Error:
+                with self._lock:
+                    self._metrics["health_check_failures"] += 1
+                return False
+        return True
+
+    def acquire(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        waited = False
+
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = self._opened < self.size + self.max_overflow
+                    if can_open:
+                        self._opened += 1
+                if can_open:
+                    try:
+                        connection = self._connect()
+                    except Exception:
+                        with self._lock:
+                            self._opened -= 1
+                        raise
+                    last_used = time.monotonic()
+                else:
+                    # Pool exhausted, block until someone returns a connection
+                    waited = True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        with self._lock:
+                            self._metrics["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {self.timeout}s waiting for a database connection")
+                    try:
+                        connection, last_used = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        continue
+
+            if not self._is_healthy(connection, last_used):
+                self._discard(connection)
+                continue
+
+            with self._lock:
+                self._in_use += 1
+                self._metrics["checkouts"] += 1
+                self._metrics["peak_in_use"] = max(self._metrics["peak_in_use"], self._in_use)
+                if waited:
+                    self._metrics["waits"] += 1
+                    self._metrics["wait_seconds"] += time.monotonic() - started
+            return connection
+
+    def release(self, connection):
+        with self._lock:
+            self._in_use -= 1
+
+        try:
+            # Never hand a half-finished transaction to the next request
+            if connection.in_transaction:
+                connection.rollback()
+            healthy = connection.is_connected()
+        except mysql.connector.Error:
+            healthy = False
+
+        with self._lock:
+            overflow = self._opened > self.size
+        if not healthy or overflow:
+            self._discard(connection)
+        else:
+            self._idle.put((connection, time.monotonic()))
+
+    def invalidate(self, connection):
+        # For connections left mid-result (e.g. an abandoned streaming cursor): drop the
+        # socket without the QUIT round trip, which would first try to drain the rows
+        with self._lock:
+            self._in_use -= 1
+        try:
+            connection.shutdown()
+        except Exception:
+            pass
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(connection)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats.update({
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+            })
+        stats["utilization"] = round(stats["in_use"] / (self.size + self.max_overflow), 3)
+        stats["avg_wait_ms"] = round(1000 * stats["wait_seconds"] / stats["waits"], 3) if stats["waits"] else 0.0
+        return stats
+
+
+def _make_pool(host):
+    host, _, port = host.strip().partition(":")
+    return ConnectionPool(
+        size=int(os.getenv('DB_POOL_SIZE', 5)),
+        max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+        timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        recycle=int(os.getenv('DB_POOL_RECYCLE', 3600)),
+        host=host,
+        port=int(port or 3306),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+class ReplicaUnavailable(Exception):
+    """A read replica failed at the connection level; the read is retried on the primary."""
+
+
+########## Read Replica Routing #################
+# Writes (and anything run with commit=True) go to the primary. Reads go to the healthy
+# replica with the fewest connections in use. A replica whose connection fails is ejected
+# for `eject_seconds`, then tried again. After a user's own write, that user's reads stay
+# on the primary for `pin_seconds` so they never see replication lag (read-your-writes).
+class ReplicaRouter:
+    def __init__(self, primary, replicas=(), eject_seconds=30.0, pin_seconds=5.0):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.eject_seconds = eject_seconds
+        self.pin_seconds = pin_seconds
+        self._ejected_until = {}
+        self._pins = {}
+        self._turn = 0
+        self._lock = threading.Lock()
+        self._metrics = {name: {"checkouts": 0, "queries": 0, "errors": 0, "ejections": 0}
+                         for name in ["primary"] + [name for name, _ in self.replicas]}
+
+    def _healthy_replicas(self):
+        now = time.monotonic()
+        return [(name, replica) for name, replica in self.replicas if self._ejected_until.get(name, 0) <= now]
+
+    def choose(self, read_only, user=None):
+        with self._lock:
+            replicas = self._healthy_replicas() if read_only and not self._is_pinned(user) else []
+            if replicas:
+                # Least busy replica; the rotating start spreads ties evenly
+                self._turn += 1
+                rotated = replicas[self._turn % len(replicas):] + replicas[:self._turn % len(replicas)]
+                name, selected = min(rotated, key=lambda item: item[1]._in_use)
+            else:
+                name, selected = "primary", self.primary
+            self._metrics[name]["checkouts"] += 1
+        return name, selected
+
+    def eject(self, name):
+        with self._lock:
+            self._ejected_until[name] = time.monotonic() + self.eject_seconds
+            self._metrics[name]["errors"] += 1
+            self._metrics[name]["ejections"] += 1
+
+    def count_query(self, name):
+        with self._lock:
+            self._metrics[name]["queries"] += 1
+
+    def pin(self, user):
+        if user is None or not self.replicas:
+            return
+        with self._lock:
+            self._pins[user] = time.monotonic() + self.pin_seconds
+            # Drop expired pins so the table stays small
+            if len(self._pins) > 10000:
+                now = time.monotonic()
+                self._pins = {key: until for key, until in self._pins.items() if until > now}
+
+    def _is_pinned(self, user):
+        return user is not None and self._pins.get(user, 0) > time.monotonic()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            backends = {name: dict(metrics) for name, metrics in self._metrics.items()}
+            for name, metrics in backends.items():
+                metrics["healthy"] = self._ejected_until.get(name, 0) <= now
+            pinned = sum(1 for until in self._pins.values() if until > now)
+        return {"backends": backends, "pinned_users": pinned}
+
+
+# DB_REPLICA_HOSTS: comma separated host[:port] list of read replicas (same credentials)
+pool = _make_pool(os.getenv('DB_HOST', 'localhost'))
+router = ReplicaRouter(
+    pool,
+    [(f"replica:{host.strip()}", _make_pool(host)) for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()],
+    eject_seconds=float(os.getenv('DB_REPLICA_EJECT_SECONDS', 30)),
+    pin_seconds=float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5)),
+)
+
+# The user a request acts for, set by handlers with `read_as`; used for read-your-writes pinning
+read_user = ContextVar("read_user", default=None)
+
+
+def read_as(user_id):
+    read_user.set(str(user_id) if user_id is not None else None)
+
+
+##### Cursor helpers
+# `db_cursor` checks a connection out of the pool and always returns it,
+# committing on success when asked to and rolling back on any error.
+# Connection wait time and every statement are recorded on the request's profile.
+# read_only=True lets the router send it to a replica.
+@contextmanager
+def db_cursor(commit=False, read_only=False):
+    name, selected = router.choose(read_only and not commit, read_user.get())
+    started = time.perf_counter()
+    try:
+        with selected.connection() as connection:
+            profile = current_profile.get()
+            if profile is not None:
+                profile.add_connect(time.perf_counter() - started)
+            # Buffered so a partially read result never leaks into the next checkout
+            cursor = connection.cursor(dictionary=True, buffered=True)
+            try:
+                yield TimedCursor(cursor, connection, on_execute=lambda: router.count_query(name))
+                if commit:
+                    connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+    except (mysql.connector.OperationalError, mysql.connector.InterfaceError, PoolTimeout) as err:
+        if name == "primary":
+            raise
+        if not isinstance(err, PoolTimeout):
+            router.eject(name)
+        raise ReplicaUnavailable(str(err)) from err
+
+
+# The mysql driver is blocking, so every database call made from an
+# `async def` handler is pushed onto the threadpool instead of the event loop.
+# Calls without commit are reads and may be served by a replica (read_only=False forces
+# the primary); a failing replica is retried on the primary. A committed write pins the
+# current user's reads to the primary.
+async def run_db(fn, *args, commit=False, read_only=None):
+    if read_only is None:
+        read_only = not commit
+    user = read_user.get()
+
+    def _run():
+        try:
+            with db_cursor(commit=commit, read_only=read_only) as cursor:
+                result = fn(cursor, *args)
+        except ReplicaUnavailable:
+            with db_cursor(commit=commit) as cursor:
+                result = fn(cursor, *args)
+        if commit:
+            router.pin(user)
+        return result
+    return await run_in_threadpool(_run)
+
+
+async def fetch_all(query, params=()):
+    def _fetch(cursor):
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    return await run_db(_fetch)
+
+
+async def fetch_one(query, params=()):
+    def _fetch(cursor):
+        cursor.execute(query, params)
+        return cursor.fetchone()
+    return await run_db(_fetch)
+
+
+# Server-side (unbuffered) cursor for exports: rows are pulled from MySQL `batch_size`
+# at a time, so memory stays constant however large the result is. This is a plain
+# generator meant to be iterated from a worker thread (StreamingResponse does that for
+# sync iterators). The connection is held until the generator finishes; if the consumer
+# stops early (client disconnect) the half-read connection is thrown away. Exports are
+# reads, so they are served by a replica when one is configured.
+def stream_rows(query, params=(), batch_size=1000, dictionary=True):
+    name, selected = router.choose(True, read_user.get())
+    connection = selected.acquire()
+    finished = False
+    try:
+        cursor = TimedCursor(connection.cursor(dictionary=dictionary), connection,
+                             on_execute=lambda: router.count_query(name))
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+        cursor.close()
+        finished = True
+    finally:
+        if finished:
+            selected.release(connection)
+        else:
+            selected.invalidate(connection)
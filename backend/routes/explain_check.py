@@ -0,0 +1,127 @@
+import argparse
+import sys
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+import db
+from app import app
+from cache import cache
+
+########## EXPLAIN index checker #################
+# Calls every read endpoint of app.py against the configured database, captures the
+# SQL each one runs and EXPLAINs it. A statement fails the check when it full-scans
+# (type=ALL) a table that is not in SMALL_TABLES; filesorts are reported as warnings.
+#
+#   python explain_check.py            # exits 1 if any endpoint query scans
+#   python explain_check.py --verbose  # also print every plan row
+
+# (method, path, params or form data)
+ENDPOINTS = [
+    ("post", "/login", {"username": "Derron", "password": "x"}),
+    ("get", "/recentgames", {}),
+    ("get", "/recentgames", {"league": 1}),
+    ("get", "/player", {"name": "Kane"}),
+    ("get", "/player", {"team": 1, "position": "FWD"}),
+    ("get", "/game", {"start_date": "2025-01-01", "end_date": "2025-12-31", "league": 1}),
+    ("get", "/favorite/player/view", {"userid": 1}),
+    ("get", "/favorite/team/view", {"userid": 1}),
+    ("get", "/teams/players", {"team": 1}),
+    ("get", "/teams/stats", {"team": 1}),
+    ("get", "/teams/details", {"team": 1}),
+    ("get", "/teams/leaderboard", {"league": 1}),
+    ("get", "/teams/h2h", {"team": 1, "opponent": 2}),
+    ("get", "/teams/form", {"team": 1, "last": 1}),
+    ("get", "/teams/form", {"team": 1, "venue": "home"}),
+    ("get", "/players", {}),
+    ("get", "/nationality", {}),
+    ("get", "/leagues", {}),
+    ("get", "/top-scorers-ranked", {"league": "Premier"}),
+    ("get", "/notifications/1", {}),
+    ("get", "/players/form_tracker", {"player_id": 1}),
+    ("get", "/league/standings", {"league": 1}),
+]
+
+# Reference tables small enough that a scan is cheaper than an index lookup
+SMALL_TABLES = {"Roles", "Country", "Leagues"}
+
+
+class RecordingCursor:
+    def __init__(self, cursor, statements):
+        self._cursor = cursor
+        self._statements = statements
+
+    def execute(self, operation, params=()):
+        self._statements.append((operation, params))
+        return self._cursor.execute(operation, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def explain(statement, params):
+    with db.pool.connection() as connection:
+        cursor = connection.cursor(dictionary=True, buffered=True)
+        cursor.execute("EXPLAIN " + statement, params)
+        plan = cursor.fetchall()
+        cursor.close()
+    return plan
+
+
+def check(verbose=False):
+    captured = []
+    original_db_cursor = db.db_cursor
+
+    @contextmanager
+    def recording_db_cursor(commit=False, read_only=False):
+        # Always the primary, so the EXPLAINs below see the same server
+        with original_db_cursor(commit=commit) as cursor:
+            yield RecordingCursor(cursor, captured)
+
+    db.db_cursor = recording_db_cursor
+    client = TestClient(app)
+    failures = 0
+    try:
+        for method, path, params in ENDPOINTS:
+            cache.backend.clear()
+            captured.clear()
+            if method == "post":
+                client.post(path, data=params)
+            else:
+                client.get(path, params=params)
+
+            for statement, statement_params in captured:
+                if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                    continue
+                scans, filesorts = [], []
+                for row in explain(statement, statement_params):
+                    table = row.get("table") or ""
+                    if verbose:
+                        print(f"    {table:<20} type={row.get('type')} key={row.get('key')} "
+                              f"rows={row.get('rows')} {row.get('Extra') or ''}")
+                    if row.get("type") == "ALL" and not table.startswith("<") and table not in SMALL_TABLES:
+                        scans.append(table)
+                    if "filesort" in (row.get("Extra") or ""):
+                        filesorts.append(table)
+
+                label = f"{method.upper()} {path} {params or ''}"
+                first_line = " ".join(statement.split())[:80]
+                if scans:
+                    failures += 1
+                    print(f"FAIL  {label}: full scan of {', '.join(scans)}\n      {first_line}")
+                elif filesorts:
+                    print(f"WARN  {label}: filesort on {', '.join(filesorts)}\n      {first_line}")
+                else:
+                    print(f"OK    {label}")
+    finally:
+        db.db_cursor = original_db_cursor
+
+    print(f"\n{failures} statement(s) without a usable index.")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="EXPLAIN every endpoint query in app.py.")
+    parser.add_argument("--verbose", action="store_true", help="print each plan row")
+    args = parser.parse_args()
+    sys.exit(1 if check(verbose=args.verbose) else 0)
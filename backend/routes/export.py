@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from db import stream_rows
+
+########## Streaming exports #################
+# Bulk exports are written out batch by batch as the unbuffered cursor yields rows, so
+# neither the result set nor the response body is ever held in memory as a whole.
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson_lines(batches):
+    for rows in batches:
+        yield "".join(json.dumps(row, default=_json_default) + "\n" for row in rows)
+
+
+def csv_lines(batches):
+    buffer = io.StringIO()
+    writer = None
+    for rows in batches:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def stream_export(query, params, fmt, filename, batch_size=1000):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}.")
+
+    batches = stream_rows(query, params, batch_size)
+    body = ndjson_lines(batches) if fmt == "ndjson" else csv_lines(batches)
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[fmt],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'})
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from mysql.connector import Error, IntegrityError
+
+from broker import broker
+from db import PoolTimeout, router, run_db
+
+logger = logging.getLogger("soccer.favorites")
+
+########## Favorites writes #################
+# Every favorites change is a set operation on (user_id, item_id) pairs done in one statement
+# per table, whatever the number of ids:
+#   - add:    multi-row INSERT ... ON DUPLICATE KEY UPDATE (re-adding keeps dateAdded, never a
+#             duplicate-key error, even for two concurrent clicks)
+#   - remove: DELETE ... WHERE (user_id, item_id) IN (...)
+# Clients say which state they want (PUT adds, DELETE removes) instead of toggling, so a
+# click never needs to read the current state first.
+# With FAVORITES_FLUSH_SECONDS > 0 changes go through a write-behind buffer instead: only the
+# latest state of each pair is kept per user (add, remove, add is one add) and everything is
+# flushed every FAVORITES_FLUSH_SECONDS in one transaction, so writes grow with the number of
+# users changing favorites rather than with clicks. A user's pending changes are
+# flushed before their favorites are read.
+
+FAVORITE_TABLES = {
+    "player": ("FavoritePlayers", "player_id"),
+    "team": ("FavoriteTeams", "team_id"),
+}
+MAX_FAVORITE_IDS = 1000
+
+
+def _pairs_in(column, pairs):
+    return f"(user_id, {column}) IN ({', '.join(['(%s, %s)'] * len(pairs))})", [v for pair in pairs for v in pair]
+
+
+def add_favorites(cursor, kind, pairs):
+    if not pairs:
+        return
+    table, column = FAVORITE_TABLES[kind]
+    cursor.execute(f"INSERT INTO {table}(user_id, {column}) VALUES {', '.join(['(%s, %s)'] * len(pairs))} "
+                   "ON DUPLICATE KEY UPDATE dateAdded = dateAdded", [v for pair in pairs for v in pair])
+
+
+def remove_favorites(cursor, kind, pairs):
+    if not pairs:
+        return 0
+    table, column = FAVORITE_TABLES[kind]
+    condition, params = _pairs_in(column, pairs)
+    cursor.execute(f"DELETE FROM {table} WHERE {condition}", params)
+    return cursor.rowcount
+
+
+def set_favorites(cursor, kind, user_id, ids):
+    """Make `ids` the user's whole favorites list of this kind."""
+    table, column = FAVORITE_TABLES[kind]
+    if ids:
+        cursor.execute(f"DELETE FROM {table} WHERE user_id = %s AND {column} NOT IN ({', '.join(['%s'] * len(ids))})",
+                       [user_id, *ids])
+    else:
+        cursor.execute(f"DELETE FROM {table} WHERE user_id = %s", (user_id,))
+    add_favorites(cursor, kind, [(user_id, item_id) for item_id in ids])
+
+
+##### Write-behind buffer
+# Pending state per user: {(kind, item_id): "add" | "remove"}, the latest request wins
+def _apply(cursor, pending):
+    """Write `pending` ({user_id: changes}) with at most two statements per table."""
+    for kind in FAVORITE_TABLES:
+        grouped = {"add": [], "remove": []}
+        for user_id, changes in pending.items():
+            for (change_kind, item_id), action in changes.items():
+                if change_kind == kind:
+                    grouped[action].append((user_id, item_id))
+        remove_favorites(cursor, kind, sorted(grouped["remove"]))
+        add_favorites(cursor, kind, sorted(grouped["add"]))
+
+
+class FavoriteWriteBuffer:
+    def __init__(self, flush_seconds=0.0, max_pending=10000):
+        self.flush_seconds = flush_seconds
+        self.enabled = flush_seconds > 0
+        self.max_pending = max_pending
+        self._pending = {}
+        self._wake = None
+        self._task = None
+        # One flush at a time: a read waiting on its user's flush also waits for a flush in progress
+        self._flush_lock = asyncio.Lock()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "queued": 0,
+            "written": 0,
+            "rejected": 0,
+            "flushes": 0,
+            "errors": 0,
+            "last_flush_seconds": 0.0,
+        }
+
+    def pending_count(self):
+        return sum(len(changes) for changes in self._pending.values())
+
+    def queue(self, kind, user_id, ids, action):
+        changes = self._pending.setdefault(user_id, {})
+        for item_id in ids:
+            changes[(kind, item_id)] = action
+        with self._lock:
+            self._metrics["queued"] += len(ids)
+        if self._wake is not None and self.pending_count() >= self.max_pending:
+            self._wake.set()
+
+    def discard(self, kind, user_id):
+        changes = self._pending.get(user_id, {})
+        for key in [key for key in changes if key[0] == kind]:
+            del changes[key]
+
+    async def flush(self, user_id=None):
+        """Write the pending changes (of one user when `user_id` is given). Returns how many."""
+        if user_id is not None and user_id not in self._pending and not self._flush_lock.locked():
+            return 0
+        async with self._flush_lock:
+            if user_id is None:
+                pending, self._pending = self._pending, {}
+            else:
+                pending = {user_id: self._pending.pop(user_id)} if user_id in self._pending else {}
+            pending = {user: changes for user, changes in pending.items() if changes}
+            if not pending:
+                return 0
+            started = time.perf_counter()
+            try:
+                await run_db(_apply, pending, commit=True)
+                written = pending
+            except IntegrityError:
+                written = await self._apply_per_user(pending)
+            except (Error, PoolTimeout):
+                self._restore(pending)
+                raise
+
+            for user in written:
+                # Reads of these users go to the primary, open push connections re-read their subscriptions
+                router.pin(str(user))
+                await broker.publish(f"user:{user}", {"type": "favorites_changed"})
+            count = sum(len(changes) for changes in written.values())
+            with self._lock:
+                self._metrics["written"] += count
+                self._metrics["flushes"] += 1
+                self._metrics["last_flush_seconds"] = round(time.perf_counter() - started, 3)
+            return count
+
+    async def _apply_per_user(self, pending):
+        # An unknown (or deleted) player/team: write user by user, dropping the users that fail
+        written = {}
+        for user, changes in pending.items():
+            try:
+                await run_db(_apply, {user: changes}, commit=True)
+                written[user] = changes
+            except IntegrityError as err:
+                logger.warning("favorites of user %s rejected: %s", user, err)
+                with self._lock:
+                    self._metrics["rejected"] += len(changes)
+            except (Error, PoolTimeout):
+                self._restore({u: c for u, c in pending.items() if u not in written})
+                raise
+        return written
+
+    def _restore(self, pending):
+        # Changes queued while the flush ran happened after the failed ones
+        for user, changes in pending.items():
+            changes.update(self._pending.get(user, {}))
+            self._pending[user] = changes
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except (Error, PoolTimeout) as err:
+                with self._lock:
+                    self._metrics["errors"] += 1
+                logger.warning("favorites flush failed: %s", err)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Write what is left before the process exits
+        try:
+            await self.flush()
+        except (Error, PoolTimeout) as err:
+            logger.warning("favorites lost at shutdown (%d changes): %s", self.pending_count(), err)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        pending = self.pending_count()
+        stats.update({
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "pending": pending,
+            "pending_users": len(self._pending),
+            # Clicks that never needed a write of their own
+            "coalesced": stats["queued"] - stats["written"] - stats["rejected"] - pending,
+        })
+        return stats
+
+
+favorite_writes = FavoriteWriteBuffer(
+    flush_seconds=float(os.getenv('FAVORITES_FLUSH_SECONDS', 0)),
+    max_pending=int(os.getenv('FAVORITES_MAX_PENDING', 10000)),
+)
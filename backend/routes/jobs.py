@@ -0,0 +1,277 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from mysql.connector import Error
+
+from cache import cache
+from db import PoolTimeout, run_db
+
+logger = logging.getLogger("soccer.jobs")
+
+########## Background job runner #################
+# Administrative bulk writes (transfers, score corrections) are queued as jobs and applied
+# by a small pool of worker tasks. A job is cut into chunks of `batch_size` operations and
+# every chunk is one transaction:
+#   - the affected rows are locked together (SELECT ... FOR UPDATE on the chunk's ids)
+#   - the changes are applied with a single UPDATE ... JOIN over a derived table of the moves
+#   - one multi-row INSERT writes the chunk's AuditLogs entries
+# Invalid operations (unknown player/team/match) are skipped and the rest of the chunk still
+# applies. A chunk handler returns its skips with the applied count and they are added to the
+# job only once the chunk has committed, so a chunk that rolls back reports nothing.
+# Dependent cached data is invalidated when a job ends.
+
+MAX_REPORTED_ERRORS = 100
+
+
+class Job:
+    def __init__(self, kind, operations):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.operations = operations
+        self.status = "queued"
+        self.applied = 0
+        self.skipped = 0
+        self.chunks_done = 0
+        self.errors = []
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def skip(self, index, reason):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"index": index, "error": reason})
+
+    def to_dict(self):
+        duration = None
+        if self.started_at:
+            duration = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": len(self.operations),
+            "applied": self.applied,
+            "skipped": self.skipped,
+            "chunks_done": self.chunks_done,
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": duration,
+        }
+
+
+def _values_table(rows, columns):
+    """Derived table `(SELECT %s AS a, %s AS b UNION ALL SELECT %s, %s ...)` plus its params."""
+    first = "SELECT " + ", ".join(f"%s AS {column}" for column in columns)
+    rest = " UNION ALL SELECT " + ", ".join(["%s"] * len(columns))
+    sql = "(" + first + rest * (len(rows) - 1) + ")"
+    return sql, [value for row in rows for value in row]
+
+
+def _write_audit_logs(cursor, table, details):
+    if not details:
+        return
+    values = ", ".join(["('UPDATE', %s, %s, CURRENT_USER())"] * len(details))
+    params = [value for detail in details for value in (table, detail)]
+    cursor.execute(f"INSERT INTO AuditLogs(action_type, table_name, action_details, performed_by) VALUES {values}",
+                   params)
+
+
+def _latest_per_key(chunk, key):
+    """Keep the last operation per key (a later move supersedes an earlier one in the same chunk)."""
+    latest = OrderedDict()
+    superseded = []
+    for index, operation in chunk:
+        if operation[key] in latest:
+            superseded.append(latest.pop(operation[key])[0])
+        latest[operation[key]] = (index, operation)
+    return list(latest.values()), superseded
+
+
+##### Transfers: [{"player_id": .., "team_id": ..}, ...]
+def apply_transfers(cursor, chunk):
+    moves, superseded = _latest_per_key(chunk, "player_id")
+    skips = [(index, "superseded by a later transfer of the same player") for index in superseded]
+
+    player_ids = [operation["player_id"] for _, operation in moves]
+    team_ids = sorted({operation["team_id"] for _, operation in moves})
+    cursor.execute(f"SELECT player_id, team_id FROM Players WHERE player_id IN ({', '.join(['%s'] * len(player_ids))}) "
+                   "FOR UPDATE", player_ids)
+    current = {row["player_id"]: row["team_id"] for row in cursor.fetchall()}
+    cursor.execute(f"SELECT team_id FROM Teams WHERE team_id IN ({', '.join(['%s'] * len(team_ids))})", team_ids)
+    teams = {row["team_id"] for row in cursor.fetchall()}
+
+    valid, details = [], []
+    for index, operation in moves:
+        player_id, team_id = operation["player_id"], operation["team_id"]
+        if player_id not in current:
+            skips.append((index, f"player {player_id} not found"))
+        elif team_id not in teams:
+            skips.append((index, f"team {team_id} not found"))
+        elif current[player_id] == team_id:
+            skips.append((index, f"player {player_id} already plays for team {team_id}"))
+        else:
+            valid.append((player_id, team_id))
+            # Same wording as the TransferPlayer procedure
+            details.append(f"Player ID {player_id} transferred from team {current[player_id]} to team {team_id}")
+
+    if valid:
+        moves_table, params = _values_table(valid, ("player_id", "team_id"))
+        cursor.execute(f"""UPDATE Players JOIN {moves_table} AS moves ON Players.player_id = moves.player_id
+                           SET Players.team_id = moves.team_id""", params)
+        _write_audit_logs(cursor, "Players", details)
+    return len(valid), skips
+
+
+##### Score corrections: [{"match_id": .., "hometeam_score": .., "awayteam_score": ..}, ...]
+def apply_scores(cursor, chunk):
+    updates, superseded = _latest_per_key(chunk, "match_id")
+    skips = [(index, "superseded by a later correction of the same match") for index in superseded]
+
+    match_ids = [operation["match_id"] for _, operation in updates]
+    cursor.execute(f"""SELECT match_id, hometeam_score, awayteam_score FROM Matches
+                       WHERE match_id IN ({', '.join(['%s'] * len(match_ids))}) FOR UPDATE""", match_ids)
+    current = {row["match_id"]: (row["hometeam_score"], row["awayteam_score"]) for row in cursor.fetchall()}
+
+    valid, details = [], []
+    for index, operation in updates:
+        match_id = operation["match_id"]
+        score = (operation["hometeam_score"], operation["awayteam_score"])
+        if match_id not in current:
+            skips.append((index, f"match {match_id} not found"))
+        elif min(score) < 0:
+            skips.append((index, "scores must not be negative"))
+        elif current[match_id] == score:
+            skips.append((index, f"match {match_id} already has score {score[0]}-{score[1]}"))
+        else:
+            valid.append((match_id,) + score)
+            old = current[match_id]
+            details.append(f"Match ID {match_id} score corrected from {old[0]}-{old[1]} to {score[0]}-{score[1]}")
+
+    if valid:
+        scores_table, params = _values_table(valid, ("match_id", "hometeam_score", "awayteam_score"))
+        # The Matches update triggers keep TeamStandings in step and queue live score pushes
+        cursor.execute(f"""UPDATE Matches JOIN {scores_table} AS scores ON Matches.match_id = scores.match_id
+                           SET Matches.hometeam_score = scores.hometeam_score,
+                               Matches.awayteam_score = scores.awayteam_score""", params)
+        _write_audit_logs(cursor, "Matches", details)
+    return len(valid), skips
+
+
+# kind -> (chunk handler, tables whose cached reads become stale)
+JOB_KINDS = {
+    "transfers": (apply_transfers, ("Players", "PlayerSeasonTotals")),
+    "scores": (apply_scores, ("Matches", "TeamStandings")),
+}
+
+
+class JobRunner:
+    def __init__(self, workers=2, batch_size=500, history=200):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.history = history
+        self._jobs = OrderedDict()
+        self._queue = None
+        self._tasks = []
+        self._lock = threading.Lock()
+
+    def submit(self, kind, operations):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(kind, operations)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            # Forget the oldest finished jobs beyond `history`
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.status in ("queued", "running"):
+                    break
+                self._jobs.popitem(last=False)
+        self._ensure_started()
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def recent(self, limit=20):
+        with self._lock:
+            jobs = list(self._jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(jobs)]
+
+    async def run_job(self, job):
+        handler, tables = JOB_KINDS[job.kind]
+        job.status = "running"
+        job.started_at = time.time()
+        indexed = list(enumerate(job.operations))
+        try:
+            for start in range(0, len(indexed), self.batch_size):
+                chunk = indexed[start:start + self.batch_size]
+                applied, skips = await run_db(handler, chunk, commit=True)
+                job.applied += applied
+                for index, reason in skips:
+                    job.skip(index, reason)
+                job.chunks_done += 1
+            job.status = "succeeded"
+        except (Error, PoolTimeout) as err:
+            # Chunks already committed stay applied; the failing one was rolled back
+            job.status = "failed"
+            job.errors.append({"error": str(err)})
+            logger.warning("job %s failed: %s", job.job_id, err)
+        except Exception as err:
+            # A bug in a handler: report it on the job and keep the worker alive
+            job.status = "failed"
+            job.errors.append({"error": f"{type(err).__name__}: {err}"})
+            logger.exception("job %s failed", job.job_id)
+        finally:
+            job.finished_at = time.time()
+            if job.applied:
+                await cache.invalidate_tables(*tables)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self.run_job(job)
+            finally:
+                self._queue.task_done()
+
+    def _ensure_started(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        by_status = {}
+        for job in jobs:
+            by_status[job.status] = by_status.get(job.status, 0) + 1
+        return {
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": by_status,
+            "operations_applied": sum(job.applied for job in jobs),
+        }
+
+
+job_runner = JobRunner(
+    workers=int(os.getenv('JOB_WORKERS', 2)),
+    batch_size=int(os.getenv('JOB_BATCH_SIZE', 500)),
+)
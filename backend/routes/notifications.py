@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from mysql.connector import Error
+
+from broker import broker
+from db import PoolTimeout, run_db
+
+logger = logging.getLogger("soccer.notifications")
+
+########## Notification worker #################
+# Drains NotificationOutbox (filled by the Matches / PlayerSeasonTotals triggers) and fans
+# each event out to the followers of the team or player. Every batch is one transaction:
+#   1. claim up to `batch_size` pending outbox rows (FOR UPDATE SKIP LOCKED, so several
+#      API processes can run workers side by side)
+#   2. one set-based INSERT per event kind for all claimed rows; the dedupe unique key turns
+#      repeats into no-ops
+#   3. mark the rows processed
+# After the commit, new notifications, fixtures, score changes and milestones are published
+# to the live push broker. Writers to Matches therefore pay for one outbox row, however many fans a team has.
+
+# One INSERT ... SELECT per kind; `{ids}` is filled with the claimed outbox ids
+FAN_OUT = {
+    "match": """
+        INSERT INTO Notifications(user_id, message, kind, entity_id, season, milestone)
+        SELECT ft.user_id, CONCAT('🔔 ', t.teamname, ' has an upcoming match on ', m.date),
+               o.kind, o.entity_id, o.season, o.milestone
+        FROM NotificationOutbox o
+        JOIN Matches m ON m.match_id = o.entity_id
+        JOIN Teams t ON t.team_id IN (m.hometeam_id, m.awayteam_id)
+        JOIN FavoriteTeams ft ON ft.team_id = t.team_id
+        WHERE o.kind = 'match' AND o.outbox_id IN ({ids})
+        ON DUPLICATE KEY UPDATE notification_id = notification_id
+    """,
+    "goal_milestone": """
+        INSERT INTO Notifications(user_id, message, kind, entity_id, season, milestone)
+        SELECT fp.user_id, CONCAT('🏅 ', p.playername, ' reached ', o.milestone, ' goals this season!'),
+               o.kind, o.entity_id, o.season, o.milestone
+        FROM NotificationOutbox o
+        JOIN Players p ON p.player_id = o.entity_id
+        JOIN FavoritePlayers fp ON fp.player_id = o.entity_id
+        WHERE o.kind = 'goal_milestone' AND o.outbox_id IN ({ids})
+        ON DUPLICATE KEY UPDATE notification_id = notification_id
+    """,
+}
+
+
+def process_batch(cursor, batch_size):
+    """Fan out one batch of pending outbox rows.
+
+    Returns (events, notifications inserted, lag_seconds, push messages) where the push
+    messages are (channel, message) pairs to publish once the transaction has committed.
+    """
+    cursor.execute("""SELECT outbox_id, kind, entity_id, season, milestone,
+                             TIMESTAMPDIFF(MICROSECOND, created_at, NOW(3)) / 1000000 AS lag
+                      FROM NotificationOutbox
+                      WHERE processed_at IS NULL
+                      ORDER BY outbox_id
+                      LIMIT %s
+                      FOR UPDATE SKIP LOCKED""", (batch_size,))
+    claimed = cursor.fetchall()
+    if not claimed:
+        return 0, 0, 0.0, []
+
+    ids = [row["outbox_id"] for row in claimed]
+    placeholders = ", ".join(["%s"] * len(ids))
+
+    cursor.execute("SELECT COALESCE(MAX(notification_id), 0) AS last_id FROM Notifications")
+    last_id = cursor.fetchone()["last_id"]
+
+    inserted = 0
+    for statement in FAN_OUT.values():
+        cursor.execute(statement.format(ids=placeholders), ids)
+        inserted += max(cursor.rowcount, 0)
+
+    messages = push_messages(cursor, claimed, ids, placeholders, last_id)
+
+    cursor.execute(f"UPDATE NotificationOutbox SET processed_at = NOW(3) WHERE outbox_id IN ({placeholders})", ids)
+    return len(ids), inserted, float(max(row["lag"] or 0 for row in claimed)), messages
+
+
+##### Live push payloads (see broker.py for the channel names)
+def push_messages(cursor, claimed, ids, placeholders, last_id):
+    messages = []
+
+    # Notifications created by this batch go to their user
+    cursor.execute(f"""SELECT n.notification_id, n.user_id, n.message, n.created_at, n.kind, n.entity_id
+                       FROM Notifications n
+                       JOIN NotificationOutbox o ON n.kind = o.kind AND n.entity_id = o.entity_id
+                                                AND n.season = o.season AND n.milestone = o.milestone
+                       WHERE n.notification_id > %s AND o.outbox_id IN ({placeholders})""", [last_id] + ids)
+    for row in cursor.fetchall():
+        messages.append((f"user:{row['user_id']}", {"type": "notification", **row}))
+
+    # New fixtures and score changes go to both teams and the league
+    match_ids = sorted({row["entity_id"] for row in claimed if row["kind"] in ("match", "score")})
+    if match_ids:
+        cursor.execute(f"""SELECT match_id, date, league_id, hometeam_id, awayteam_id,
+                                  hometeam_score, awayteam_score
+                           FROM Matches
+                           WHERE match_id IN ({", ".join(["%s"] * len(match_ids))})""", match_ids)
+        matches = {row["match_id"]: row for row in cursor.fetchall()}
+        for row in claimed:
+            match = matches.get(row["entity_id"])
+            if row["kind"] not in ("match", "score") or match is None:
+                continue
+            message = {"type": "match_scheduled" if row["kind"] == "match" else "score", **match}
+            for channel in (f"team:{match['hometeam_id']}", f"team:{match['awayteam_id']}",
+                            f"league:{match['league_id']}"):
+                messages.append((channel, message))
+
+    for row in claimed:
+        if row["kind"] == "goal_milestone":
+            messages.append((f"player:{row['entity_id']}", {"type": "goal_milestone", "player_id": row["entity_id"],
+                                                             "season": row["season"], "milestone": row["milestone"]}))
+    return messages
+
+
+class NotificationWorker:
+    def __init__(self, batch_size=500, poll_interval=1.0):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._task = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            "batches": 0,
+            "events": 0,
+            "notifications": 0,
+            "errors": 0,
+            "busy_seconds": 0.0,
+            "last_lag_seconds": 0.0,
+            "last_batch_at": None,
+        }
+
+    async def run_once(self):
+        started = time.perf_counter()
+        events, inserted, lag, messages = await run_db(process_batch, self.batch_size, commit=True)
+        for channel, message in messages:
+            await broker.publish(channel, message)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if events:
+                self._metrics["batches"] += 1
+                self._metrics["events"] += events
+                self._metrics["notifications"] += inserted
+                self._metrics["last_lag_seconds"] = round(lag, 3)
+                self._metrics["last_batch_at"] = time.time()
+                self._metrics["busy_seconds"] += elapsed
+        return events
+
+    async def _loop(self):
+        while True:
+            try:
+                # Keep draining while full batches come back, otherwise wait for the next poll
+                if await self.run_once() >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except (Error, PoolTimeout) as err:
+                with self._lock:
+                    self._metrics["errors"] += 1
+                logger.warning("notification batch failed: %s", err)
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        stats["running"] = self._task is not None and not self._task.done()
+        stats["events_per_second"] = round(stats["events"] / stats["busy_seconds"], 1) if stats["busy_seconds"] else 0.0
+        return stats
+
+
+notification_worker = NotificationWorker(
+    batch_size=int(os.getenv('NOTIFY_BATCH_SIZE', 500)),
+    poll_interval=float(os.getenv('NOTIFY_POLL_INTERVAL', 1.0)),
+)
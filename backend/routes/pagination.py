@@ -0,0 +1,41 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+########## Keyset Pagination #################
+# Continuation tokens are opaque to clients: base64url(JSON [sort_value, id]) of the
+# last row of a page. The next page starts strictly after that row, so MySQL can seek
+# straight to it through a (sort_column, id) index instead of scanning past an OFFSET.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value, last_id):
+    raw = json.dumps([sort_value, last_id], default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return sort_value, last_id
+
+
+# SQL condition selecting rows after the cursor position, ties on sort_column broken by id_column
+def keyset_filter(sort_column, id_column, token, descending=False):
+    sort_value, last_id = decode_cursor(token)
+    op = "<" if descending else ">"
+    condition = f"({sort_column} {op} %s OR ({sort_column} = %s AND {id_column} {op} %s))"
+    return condition, [sort_value, sort_value, last_id]
+
+
+# A full page means there may be more rows, hand the client a token for the next one
+def set_next_cursor(response, rows, page_size, sort_key, id_key):
+    if rows and len(rows) == page_size:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[sort_key], last[id_key])
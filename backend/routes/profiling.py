@@ -0,0 +1,206 @@
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+
+from responses import json_dumps
+
+logger = logging.getLogger("soccer.slow_query")
+
+# Statements slower than this are logged together with their EXPLAIN plan
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+
+# Latency buckets (seconds) of the Prometheus histograms
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+########## Request profile #################
+# One RequestProfile per HTTP request, reachable from any code running for that request
+# through the `current_profile` context variable (starlette's threadpool copies the
+# context, so database work in run_db records into the same profile).
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.connect_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def add_connect(self, seconds):
+        with self._lock:
+            self.connect_seconds += seconds
+
+    def add_query(self, statement, seconds, rows):
+        with self._lock:
+            self.queries.append((statement, seconds, rows))
+
+    def add_serialize(self, seconds):
+        with self._lock:
+            self.serialize_seconds += seconds
+
+    @property
+    def query_seconds(self):
+        return sum(seconds for _, seconds, _ in self.queries)
+
+    def server_timing(self, total_seconds):
+        return ", ".join([
+            f"db-connect;dur={self.connect_seconds * 1000:.2f}",
+            f'db;dur={self.query_seconds * 1000:.2f};desc="{len(self.queries)} queries"',
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}",
+            f"total;dur={total_seconds * 1000:.2f}",
+        ])
+
+
+current_profile = ContextVar("current_profile", default=None)
+
+
+##### SQL normalization
+# Literals and IN lists are replaced so the same statement always maps to one metric series
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+
+
+def normalize_sql(statement):
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = statement.replace("%s", "?")
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return " ".join(statement.split())
+
+
+##### Timing cursor
+# Wraps a mysql cursor; every execute is timed and recorded on the current profile and
+# in the query histogram. Cursors are buffered, so execute already includes the fetch.
+class TimedCursor:
+    def __init__(self, cursor, connection, on_execute=None):
+        self._cursor = cursor
+        self._connection = connection
+        self._on_execute = on_execute
+
+    def execute(self, operation, params=(), **kwargs):
+        if self._on_execute is not None:
+            self._on_execute()
+        started = time.perf_counter()
+        result = self._cursor.execute(operation, params, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        statement = normalize_sql(operation)
+        rows = self._cursor.rowcount
+        query_duration.observe(elapsed, statement=statement)
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add_query(statement, elapsed, rows)
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            log_slow_query(self._connection, operation, params, elapsed, rows)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+def log_slow_query(connection, operation, params, elapsed, rows):
+    plan = []
+    if operation.lstrip().upper().startswith(("SELECT", "WITH")):
+        # A second cursor on the same connection: the caller's rows are already buffered
+        try:
+            cursor = connection.cursor(dictionary=True, buffered=True)
+            cursor.execute("EXPLAIN " + operation, params)
+            plan = cursor.fetchall()
+            cursor.close()
+        except Exception as err:
+            plan = [{"error": str(err)}]
+    logger.warning("slow query %.1f ms, %s rows: %s\n%s", elapsed * 1000, rows, normalize_sql(operation),
+                   "\n".join(f"  {row}" for row in plan))
+
+
+##### Serialization timing
+# Default response class of the app; rendering the body (orjson when available) is the
+# serialization step. Handlers with large results return it directly, which also skips
+# FastAPI's jsonable_encoder pass over every row.
+class TimedJSONResponse(JSONResponse):
+    def render(self, content):
+        started = time.perf_counter()
+        body = json_dumps(content)
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add_serialize(time.perf_counter() - started)
+        return body
+
+
+########## Prometheus metrics #################
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["count"] += 1
+            series["sum"] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: {"buckets": list(s["buckets"]), "count": s["count"], "sum": s["sum"]}
+                      for key, s in self._series.items()}
+        for key, s in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key))
+            for bound, count in zip(self.buckets, s["buckets"]):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {s["count"]}')
+            lines.append(f"{self.name}_count{{{labels}}} {s['count']}")
+            lines.append(f"{self.name}_sum{{{labels}}} {s['sum']:.6f}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+request_duration = Histogram("http_request_duration_seconds", "Total time spent handling the request.",
+                             ("method", "route", "status"))
+connect_duration = Histogram("db_connection_acquire_seconds", "Time spent checking connections out of the pool.",
+                             ("route",))
+query_duration = Histogram("db_query_duration_seconds", "Time spent executing a normalized SQL statement.",
+                           ("statement",))
+serialize_duration = Histogram("http_response_serialize_seconds", "Time spent rendering the JSON response body.",
+                               ("route",))
+
+
+def record_request(method, route, status, profile, total_seconds):
+    request_duration.observe(total_seconds, method=method, route=route, status=status)
+    connect_duration.observe(profile.connect_seconds, route=route)
+    serialize_duration.observe(profile.serialize_seconds, route=route)
+
+
+def render_metrics(gauges=None):
+    """Histograms plus gauges; gauge names may carry labels, e.g. 'name{backend="primary"}'."""
+    sections = [request_duration.render(), connect_duration.render(),
+                query_duration.render(), serialize_duration.render()]
+    declared = set()
+    for name, value in (gauges or {}).items():
+        base = name.split("{", 1)[0]
+        if base not in declared:
+            declared.add(base)
+            sections.append(f"# TYPE {base} gauge")
+        sections.append(f"{name} {value}")
+    return "\n".join(sections) + "\n"
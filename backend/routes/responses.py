@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+########## JSON rendering #################
+# orjson (when installed) serializes dates natively and is several times faster than the
+# stdlib encoder; Decimal and timedelta go through `_default`. Output matches what
+# FastAPI's jsonable_encoder + json.dumps produce for the same rows.
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (date, datetime, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+########## Compression and ETags #################
+# Pure ASGI middleware around the whole app. For complete (non-streaming) responses it:
+#   - adds a weak ETag over the uncompressed body of GET 200 responses and answers a
+#     matching If-None-Match with 304 and no body
+#   - compresses bodies of at least `minimum_size` bytes with brotli or gzip, whichever the
+#     client prefers (brotli first when the q-values tie and the package is installed)
+# Streaming responses (exports, SSE) pass through untouched.
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson", "application/javascript")
+
+
+def negotiate_encoding(accept_encoding):
+    preferences = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            preferences[coding] = q
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = None
+    for coding in candidates:
+        q = preferences.get(coding, preferences.get("*", 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (coding, q)
+    return best[0] if best else None
+
+
+def compress(body, encoding, level):
+    if encoding == "br":
+        return brotli.compress(body, quality=level["br"])
+    return gzip.compress(body, compresslevel=level["gzip"], mtime=0)
+
+
+def etag_for(body):
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:]
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class CompressionStats:
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, raw_bytes, sent_bytes, compress_seconds, not_modified):
+        with self._lock:
+            stats = self._routes.setdefault(route, {"responses": 0, "raw_bytes": 0, "sent_bytes": 0,
+                                                    "compress_seconds": 0.0, "not_modified": 0})
+            stats["responses"] += 1
+            stats["raw_bytes"] += raw_bytes
+            stats["sent_bytes"] += sent_bytes
+            stats["compress_seconds"] += compress_seconds
+            stats["not_modified"] += not_modified
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: dict(stats) for route, stats in self._routes.items()}
+        for stats in routes.values():
+            stats["bytes_saved"] = stats["raw_bytes"] - stats["sent_bytes"]
+            stats["ratio"] = round(stats["sent_bytes"] / stats["raw_bytes"], 3) if stats["raw_bytes"] else 1.0
+            stats["compress_seconds"] = round(stats["compress_seconds"], 6)
+        return routes
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if_none_match = headers.get("if-none-match") if scope["method"] in ("GET", "HEAD") else None
+        start = None
+        passthrough = False
+
+        async def wrapped_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            if message.get("more_body", False):
+                # Streaming body: forward as is
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            await self._finish(scope, start, message.get("body", b""), encoding, if_none_match, send)
+
+        await self.app(scope, receive, wrapped_send)
+
+    async def _finish(self, scope, start, body, encoding, if_none_match, send):
+        response_headers = [(k, v) for k, v in start["headers"]]
+        names = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in response_headers}
+        status = start["status"]
+        route = scope.get("route")
+        route = route.path if route else "unmatched"
+        raw_size = len(body)
+        compress_seconds = 0.0
+
+        if status == 200 and scope["method"] in ("GET", "HEAD") and "etag" not in names:
+            etag = etag_for(body)
+            response_headers.append((b"etag", etag.encode("latin-1")))
+            if if_none_match and etag_matches(if_none_match, etag):
+                kept = [(k, v) for k, v in response_headers if k.lower() not in (b"content-length", b"content-type")]
+                await send({"type": "http.response.start", "status": 304, "headers": kept})
+                await send({"type": "http.response.body", "body": b""})
+                compression_stats.record(route, raw_size, 0, 0.0, 1)
+                return
+
+        content_type = names.get("content-type", "")
+        if (encoding and raw_size >= self.minimum_size and "content-encoding" not in names
+                and content_type.startswith(COMPRESSIBLE_TYPES)):
+            started = time.perf_counter()
+            body = compress(body, encoding, self.level)
+            compress_seconds = time.perf_counter() - started
+            response_headers = [(k, v) for k, v in response_headers if k.lower() != b"content-length"]
+            response_headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(body)).encode())]
+            vary = names.get("vary")
+            response_headers = [(k, v) for k, v in response_headers if k.lower() != b"vary"]
+            response_headers.append((b"vary", (vary + ", Accept-Encoding" if vary else "Accept-Encoding").encode()))
+
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+        compression_stats.record(route, raw_size, len(body), compress_seconds, 0)
+
+
+def compression_settings():
+    return {
+        "minimum_size": int(os.getenv('COMPRESS_MIN_SIZE', 1024)),
+        "gzip_level": int(os.getenv('COMPRESS_GZIP_LEVEL', 6)),
+        "brotli_quality": int(os.getenv('COMPRESS_BROTLI_QUALITY', 4)),
+    }
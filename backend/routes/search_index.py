@@ -0,0 +1,264 @@
+import asyncio
+import os
+import time
+import unicodedata
+
+from cache import cache
+from db import run_db
+
+########## Player Search Index #################
+# In-process index over Players for name autocomplete and ranked search. Names are
+# accent-folded and lower-cased ("Ødegaard" -> "odegaard") and indexed three ways:
+#   - every prefix of every name token (a flattened prefix trie) -> player ids
+#   - 2- and 3-grams of the whole folded name -> player ids, for substring matches (a
+#     one-character query is matched by scanning the names)
+#   - 3-grams of each token -> tokens, to find candidates for typo-tolerant matching
+# Team, nationality and position filters are sets intersected with the name matches.
+
+# Characters NFKD does not decompose into a base letter
+_FOLD_EXTRA = str.maketrans({"ø": "o", "ł": "l", "đ": "d", "ß": "ss", "æ": "ae", "œ": "oe", "ı": "i", "þ": "th"})
+
+# Match ranks, best first
+EXACT, NAME_PREFIX, TOKEN_PREFIX, SUBSTRING, FUZZY = 100, 80, 60, 40, 20
+
+
+def fold(text):
+    text = unicodedata.normalize("NFKD", text.casefold().translate(_FOLD_EXTRA))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join("".join(c if c.isalnum() else " " for c in text).split())
+
+
+def ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance, or limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(token):
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) <= 6 else 2
+
+
+class PlayerIndex:
+    def __init__(self, players):
+        self.players = {}
+        self._folded = {}
+        self._prefixes = {}
+        self._grams = {}
+        self._token_ids = {}
+        self._token_grams = {}
+        self._teams = {}
+        self._nationalities = {}
+        self._positions = {}
+
+        for player in players:
+            player_id = player["player_id"]
+            name = fold(player["playername"] or "")
+            self.players[player_id] = player
+            self._folded[player_id] = name
+            for token in name.split():
+                self._token_ids.setdefault(token, set()).add(player_id)
+                for end in range(1, len(token) + 1):
+                    self._prefixes.setdefault(token[:end], set()).add(player_id)
+                for gram in ngrams(f" {token} ", 3):
+                    self._token_grams.setdefault(gram, set()).add(token)
+            for n in (2, 3):
+                for gram in ngrams(name, n):
+                    self._grams.setdefault(gram, set()).add(player_id)
+            self._teams.setdefault(player.get("team_id"), set()).add(player_id)
+            self._nationalities.setdefault(player.get("player_nationality_id"), set()).add(player_id)
+            self._positions.setdefault((player.get("position") or "").upper(), set()).add(player_id)
+
+    def __len__(self):
+        return len(self.players)
+
+    # Same order as the SQL listing: ORDER BY playername, player_id (case/accent insensitive)
+    def sort_key(self, player_id):
+        return self._folded[player_id], player_id
+
+    ##### Name matching
+    def _prefix_matches(self, tokens):
+        matched = None
+        for token in tokens:
+            ids = self._prefixes.get(token, set())
+            matched = set(ids) if matched is None else matched & ids
+            if not matched:
+                return set()
+        return matched or set()
+
+    def _substring_matches(self, query):
+        n = 3 if len(query) >= 3 else 2
+        if len(query) < n:
+            # Shorter than any gram (one character): scan the names, like LIKE '%x%' did
+            return {pid for pid, name in self._folded.items() if query in name}
+        grams = ngrams(query, n)
+        matched = None
+        for gram in sorted(grams, key=lambda g: len(self._grams.get(g, ()))):
+            ids = self._grams.get(gram, set())
+            matched = set(ids) if matched is None else matched & ids
+            if not matched:
+                return set()
+        # Grams can all occur without the whole string occurring, verify
+        return {pid for pid in matched if query in self._folded[pid]}
+
+    def _fuzzy_matches(self, tokens):
+        """Players having, for every query token, a name token within max_typos edits."""
+        best = None
+        for token in tokens:
+            limit = max_typos(token)
+            # Each edit destroys at most 3 grams: skip tokens sharing too few to be within the limit
+            grams = ngrams(f" {token} ", 3)
+            shared = {}
+            for gram in grams:
+                for candidate in self._token_grams.get(gram, ()):
+                    shared[candidate] = shared.get(candidate, 0) + 1
+            needed = len(grams) - 3 * limit
+            distances = {}
+            for candidate in (c for c, count in shared.items() if count >= needed):
+                # Compare to the whole token and to its prefix of the same length (autocomplete typos)
+                distance = min(edit_distance(token, candidate, limit), edit_distance(token, candidate[:len(token)], limit))
+                if distance <= limit:
+                    for pid in self._token_ids[candidate]:
+                        distances[pid] = min(distances.get(pid, limit + 1), distance)
+            if best is None:
+                best = distances
+            else:
+                best = {pid: max(d, distances[pid]) for pid, d in best.items() if pid in distances}
+            if not best:
+                return {}
+        return best or {}
+
+    def match(self, query, allowed=None, fuzzy_below=1):
+        """Map player_id -> score for every player whose name matches `query`.
+
+        Typo matches (ranked below everything else) are only looked up when fewer than
+        `fuzzy_below` players matched directly and none exactly. `allowed` restricts the candidates.
+        """
+        query = fold(query)
+        tokens = query.split()
+        if not tokens:
+            return {}
+
+        scores = {}
+        for pid in self._substring_matches(query):
+            scores[pid] = SUBSTRING
+        for pid in self._prefix_matches(tokens):
+            name = self._folded[pid]
+            scores[pid] = EXACT if name == query else NAME_PREFIX if name.startswith(query) else TOKEN_PREFIX
+        if allowed is not None:
+            scores = {pid: score for pid, score in scores.items() if pid in allowed}
+
+        # An exact name hit means the query has no typo to tolerate
+        if len(scores) < fuzzy_below and EXACT not in scores.values():
+            for pid, distance in self._fuzzy_matches(tokens).items():
+                if allowed is None or pid in allowed:
+                    scores.setdefault(pid, FUZZY - distance)
+        return scores
+
+    ##### Filters
+    def filter_ids(self, team=None, position=None, nationality=None):
+        """Set of ids passing the filters, None when no filter is given."""
+        selected = None
+        if team is not None:
+            selected = set(self._teams.get(team, ()))
+        if nationality is not None:
+            ids = self._nationalities.get(nationality, set())
+            selected = set(ids) if selected is None else selected & ids
+        if position:
+            # Same semantics as the SQL path: case-insensitive substring of the position
+            ids = set()
+            for value, players in self._positions.items():
+                if position.upper() in value:
+                    ids |= players
+            selected = ids if selected is None else selected & ids
+        return selected
+
+    def search(self, query, team=None, position=None, nationality=None, limit=20, offset=0):
+        """Ranked matches: best score first, then name order. Typos fill pages direct matches cannot."""
+        scores = self.match(query, self.filter_ids(team, position, nationality), fuzzy_below=offset + limit)
+        ranked = sorted(scores, key=lambda pid: (-scores[pid],) + self.sort_key(pid))
+        return [(self.players[pid], scores[pid]) for pid in ranked[offset:offset + limit]]
+
+    def filter_sorted(self, query, team=None, position=None, nationality=None):
+        """Matches in listing order (playername, player_id), typos only when nothing else matched."""
+        return sorted(self.match(query, self.filter_ids(team, position, nationality)), key=self.sort_key)
+
+
+########## Index lifecycle #################
+# Built at startup and rebuilt on first use after Players/Teams/Country change (the same
+# table generations the query cache uses, bumped by /players/transfer and /cache/invalidate)
+# or after SEARCH_INDEX_TTL seconds, to pick up writes made directly in the database.
+PLAYER_INDEX_TABLES = ("Players", "Teams", "Country")
+
+
+def _load_players(cursor):
+    cursor.execute("""SELECT player_id, playername, Players.team_id, teamname, position,
+                             player_nationality_id, countryname as nationality, age
+                      FROM Players
+                      LEFT JOIN Teams ON Players.team_id = Teams.team_id
+                      LEFT JOIN Country ON Players.player_nationality_id = Country.country_id""")
+    return cursor.fetchall()
+
+
+class PlayerSearch:
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.index = None
+        self._generations = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self.loads = 0
+        self.load_seconds = 0.0
+
+    async def _current_generations(self):
+        return await cache.generations(PLAYER_INDEX_TABLES)
+
+    async def _stale(self):
+        return (self.index is None or self._generations != await self._current_generations()
+                or time.monotonic() - self._loaded_at > self.ttl)
+
+    async def refresh(self):
+        async with self._lock:
+            if not await self._stale():
+                return self.index
+            generations = await self._current_generations()
+            started = time.perf_counter()
+            players = await run_db(_load_players)
+            index = await asyncio.get_running_loop().run_in_executor(None, PlayerIndex, players)
+            self.index, self._generations, self._loaded_at = index, generations, time.monotonic()
+            self.loads += 1
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            return index
+
+    async def get(self):
+        if await self._stale():
+            return await self.refresh()
+        return self.index
+
+    def stats(self):
+        return {
+            "players": len(self.index) if self.index else 0,
+            "loads": self.loads,
+            "last_load_seconds": self.load_seconds,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self.index else None,
+        }
+
+
+player_search = PlayerSearch(ttl=int(os.getenv('SEARCH_INDEX_TTL', 300)))
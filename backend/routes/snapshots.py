@@ -0,0 +1,269 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import date
+
+from fastapi import Response
+from mysql.connector import Error
+
+from broker import broker
+from cache import cache
+from db import PoolTimeout, fetch_all
+from responses import brotli, compress, compression_settings, etag_for, etag_matches, json_dumps, negotiate_encoding
+
+logger = logging.getLogger("soccer.snapshots")
+
+########## Standings snapshots #################
+# /league/standings and /teams/leaderboard of every league, for all seasons and for the
+# current one, are rendered ahead of time by a scheduler in the API process:
+#   - at startup, then every SNAPSHOT_REFRESH_SECONDS for every league
+#   - after a Matches change in a league: new fixtures and score changes arrive on the
+#     "league:<id>" push channels (see notifications.py), and a burst of them is collected for
+#     SNAPSHOT_DEBOUNCE_SECONDS before the league is rebuilt once
+#   - after a write through the API bumps a cached-table generation (score correction jobs,
+#     /cache/invalidate): until the rebuild the snapshots are not served
+# A snapshot is an immutable JSON body with its ETag and pre-compressed variants. Rebuilding
+# an unchanged body keeps the old snapshot, so its version and ETag only move with the data.
+# Handlers fall back to live queries for other seasons and while a snapshot is missing.
+
+SNAPSHOT_TABLES = ("Matches", "TeamStandings", "Teams", "Leagues")
+VERSION_HEADER = "X-Snapshot-Version"
+RETRY_SECONDS = 10
+
+
+class Snapshot:
+    __slots__ = ("body", "etag", "version", "built_at", "encoded")
+
+    def __init__(self, body, version, settings):
+        self.body = body
+        self.etag = etag_for(body)
+        self.version = version
+        self.built_at = time.time()
+        self.encoded = {}
+        if len(body) >= settings["minimum_size"]:
+            level = {"gzip": settings["gzip_level"], "br": settings["brotli_quality"]}
+            for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+                self.encoded[encoding] = compress(body, encoding, level)
+
+
+class SnapshotScheduler:
+    def __init__(self, enabled=True, debounce_seconds=2.0, refresh_seconds=300, concurrency=4):
+        self.enabled = enabled
+        self.debounce_seconds = debounce_seconds
+        self.refresh_seconds = refresh_seconds
+        self.concurrency = concurrency
+        self._builders = {}
+        self._snapshots = {}
+        self._dirty = set()
+        self._all_dirty = True
+        self._generations = None
+        self._built_at = 0.0
+        self._version = 0
+        self._wake = None
+        self._task = None
+        self._listener = None
+        self._subscription = None
+        self._settings = compression_settings()
+        self._lock = threading.Lock()
+        self._metrics = {
+            "rebuilds": 0,
+            "snapshots_built": 0,
+            "snapshots_changed": 0,
+            "served": 0,
+            "not_modified": 0,
+            "misses": 0,
+            "events": 0,
+            "errors": 0,
+            "last_rebuild_seconds": 0.0,
+        }
+
+    def register(self, kind, builder):
+        """`builder(league, season)` returns the live rows of one snapshot."""
+        self._builders[kind] = builder
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._metrics[name] += amount
+
+    async def _current_generations(self):
+        return await cache.generations(SNAPSHOT_TABLES)
+
+    @staticmethod
+    def seasons():
+        # All seasons, and the current one (seasons start in July)
+        today = date.today()
+        return (None, today.year - (today.month < 7))
+
+    def mark_dirty(self, league=None):
+        """Queue a rebuild of one league, or of every league when `league` is None."""
+        if league is None:
+            self._all_dirty = True
+        else:
+            self._dirty.add(league)
+        if self._wake is not None:
+            self._wake.set()
+
+    ##### Serving
+    async def get(self, kind, league, season=None):
+        if not self.enabled:
+            return None
+        snapshot = self._snapshots.get((kind, league, season))
+        if snapshot is not None and self._generations != await self._current_generations():
+            self.mark_dirty()
+            snapshot = None
+        self._count("served" if snapshot is not None else "misses")
+        return snapshot
+
+    async def response(self, request, kind, league, season=None):
+        """The snapshot as a response (304 when the client has it), None to fall back to live data."""
+        snapshot = await self.get(kind, league, season)
+        if snapshot is None:
+            return None
+        # An ETag set here also tells CompressionMiddleware to leave the response alone
+        headers = {"ETag": snapshot.etag, VERSION_HEADER: str(snapshot.version), "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, snapshot.etag):
+            self._count("not_modified")
+            return Response(status_code=304, headers=headers)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        body = snapshot.encoded.get(encoding)
+        if body is None:
+            body = snapshot.body
+        else:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    ##### Building
+    async def _build(self, kind, league, season):
+        body = json_dumps(await self._builders[kind](league, season))
+        current = self._snapshots.get((kind, league, season))
+        if current is not None and current.body == body:
+            return False
+        with self._lock:
+            self._version += 1
+            version = self._version
+        self._snapshots[(kind, league, season)] = Snapshot(body, version, self._settings)
+        return True
+
+    async def rebuild(self, leagues=None):
+        """Rebuild every snapshot of `leagues` (all leagues when None). Returns how many changed."""
+        started = time.perf_counter()
+        generations = await self._current_generations()
+        full = leagues is None
+        if full:
+            leagues = [row["league_id"] for row in await fetch_all("SELECT league_id FROM Leagues")]
+            # Leagues deleted and seasons no longer current since the last full rebuild
+            for key in [key for key in self._snapshots if key[1] not in leagues or key[2] not in self.seasons()]:
+                del self._snapshots[key]
+            self._subscribe(leagues)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def build(key):
+            async with semaphore:
+                return await self._build(*key)
+
+        keys = [(kind, league, season) for league in leagues for season in self.seasons() for kind in self._builders]
+        changed = sum(await asyncio.gather(*(build(key) for key in keys)))
+        if full:
+            self._generations = generations
+            self._built_at = time.monotonic()
+        with self._lock:
+            self._metrics["rebuilds"] += 1
+            self._metrics["snapshots_built"] += len(keys)
+            self._metrics["snapshots_changed"] += changed
+            self._metrics["last_rebuild_seconds"] = round(time.perf_counter() - started, 3)
+        return changed
+
+    ##### Matches changes pushed by the notification worker
+    def _subscribe(self, leagues):
+        channels = [f"league:{league}" for league in leagues]
+        if self._subscription is None:
+            self._subscription = broker.subscribe(channels, maxsize=1000)
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        else:
+            self._subscription.remove(self._subscription.channels - set(channels))
+            self._subscription.add(channels)
+
+    async def _listen(self):
+        dropped = 0
+        while True:
+            message = await self._subscription.get()
+            if message is None:
+                continue
+            self._count("events")
+            if self._subscription.dropped != dropped:
+                # Lost messages could name any league
+                dropped = self._subscription.dropped
+                self.mark_dirty()
+            else:
+                self.mark_dirty(int(message["channel"].split(":", 1)[1]))
+
+    async def _loop(self):
+        while True:
+            full = self._all_dirty or time.monotonic() - self._built_at > self.refresh_seconds
+            leagues = None if full else sorted(self._dirty)
+            self._all_dirty = False
+            self._dirty = set()
+            self._wake.clear()
+            try:
+                if full or leagues:
+                    await self.rebuild(leagues)
+            except asyncio.CancelledError:
+                raise
+            except (Error, PoolTimeout) as err:
+                self._count("errors")
+                logger.warning("snapshot rebuild failed: %s", err)
+                if full:
+                    self.mark_dirty()
+                else:
+                    self._dirty.update(leagues)
+                await asyncio.sleep(RETRY_SECONDS)
+                continue
+
+            try:
+                remaining = self.refresh_seconds - (time.monotonic() - self._built_at)
+                await asyncio.wait_for(self._wake.wait(), max(remaining, 0))
+                # Let the rest of a burst of match updates arrive before rebuilding
+                await asyncio.sleep(self.debounce_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.enabled and self._task is None and self._builders:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        tasks = [task for task in (self._task, self._listener) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = self._listener = None
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        stats.update({
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "snapshots": len(self._snapshots),
+            "version": self._version,
+            "pending_leagues": len(self._dirty),
+            "bytes": sum(len(s.body) + sum(map(len, s.encoded.values())) for s in list(self._snapshots.values())),
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if self._built_at else None,
+        })
+        return stats
+
+
+snapshots = SnapshotScheduler(
+    enabled=os.getenv('SNAPSHOT_SCHEDULER', '1') != '0',
+    debounce_seconds=float(os.getenv('SNAPSHOT_DEBOUNCE_SECONDS', 2)),
+    refresh_seconds=float(os.getenv('SNAPSHOT_REFRESH_SECONDS', 300)),
+    concurrency=int(os.getenv('SNAPSHOT_CONCURRENCY', 4)),
+)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend modules import each other by name (python backend/routes/app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "routes"))
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+import cache as cache_module
+from cache import FakeRedis, LRUCache, QueryCache, RedisCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture(params=["local", "fakeredis"])
+def backend(request):
+    return LRUCache(maxsize=16) if request.param == "local" else RedisCache(FakeRedis())
+
+
+def load(value, calls):
+    async def loader():
+        calls.append(value)
+        return value
+    return loader
+
+
+##### LRU bound and TTL
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == (True, 1)  # "b" is now the oldest
+    lru.set("c", 3)
+    assert lru.get("b") == (False, None)
+    assert lru.get("a") == (True, 1)
+    assert lru.get("c") == (True, 3)
+    assert len(lru) == 2
+
+
+def test_entries_expire_after_ttl(backend, clock):
+    backend.set("key", {"rows": [1]}, ttl=10)
+    clock.now += 9
+    assert backend.get("key") == (True, {"rows": [1]})
+    clock.now += 2
+    assert backend.get("key") == (False, None)
+
+
+def test_clear_keeps_generations(backend):
+    backend.bump("Players")
+    backend.set("key", 1)
+    backend.clear()
+    assert backend.get("key") == (False, None)
+    assert backend.generations(("Players", "Teams")) == (1, 0)
+
+
+##### Read-through cache
+def test_hits_misses_and_table_invalidation(backend):
+    cache = QueryCache(backend, ttl=60)
+    calls = []
+
+    async def scenario():
+        assert await cache.get_or_load("players", (1,), ["Players", "Teams"], load("first", calls)) == "first"
+        assert await cache.get_or_load("players", (1,), ["Teams", "Players"], load("again", calls)) == "first"
+        assert await cache.get_or_load("players", (2,), ["Players"], load("other", calls)) == "other"
+        # Invalidating an unrelated table keeps the entry, a watched table drops it
+        await cache.invalidate_tables("Leagues")
+        assert await cache.get_or_load("players", (1,), ["Players", "Teams"], load("again", calls)) == "first"
+        await cache.invalidate_tables("Teams")
+        assert await cache.get_or_load("players", (1,), ["Players", "Teams"], load("fresh", calls)) == "fresh"
+        assert await cache.generations(["Teams", "Players", "Leagues"]) == (1, 0, 1)
+
+    asyncio.run(scenario())
+    assert calls == ["first", "other", "fresh"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (2, 3, 2)
+    assert stats["hit_ratio"] == 0.4
+
+
+def test_clear_and_invalidate_entry(backend):
+    cache = QueryCache(backend, ttl=60)
+    calls = []
+
+    async def scenario():
+        await cache.get_or_load("leagues", (), ["Leagues"], load("a", calls))
+        await cache.invalidate("leagues", (), ["Leagues"])
+        await cache.get_or_load("leagues", (), ["Leagues"], load("b", calls))
+        await cache.clear()
+        await cache.get_or_load("leagues", (), ["Leagues"], load("c", calls))
+
+    asyncio.run(scenario())
+    assert calls == ["a", "b", "c"]
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_redis_backend_runs_off_the_event_loop():
+    loop_thread = []
+
+    class RecordingRedis(FakeRedis):
+        def mget(self, names):
+            loop_thread.append(self._on_loop())
+            return super().mget(names)
+
+        @staticmethod
+        def _on_loop():
+            try:
+                asyncio.get_running_loop()
+                return True
+            except RuntimeError:
+                return False
+
+    cache = QueryCache(RedisCache(RecordingRedis()), ttl=60)
+    asyncio.run(cache.get_or_load("nationality", (), ["Country"], load([], [])))
+    # One MGET per lookup, made from a worker thread
+    assert loop_thread == [False]
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "backend", "routes"))
+# The bench builds the snapshot itself and switches between the engine and SQL per request;
+# pre-rendered standings snapshots would answer both
+os.environ.setdefault("NOTIFY_WORKER", "0")
+os.environ["ANALYTICS_ENGINE"] = "0"
+os.environ["SNAPSHOT_SCHEDULER"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from analytics import analytics  # noqa: E402
+from app import app  # noqa: E402
+from db import run_db  # noqa: E402
+
+########## Analytics engine parity and speed #################
+# Requests /league/standings, /teams/leaderboard and /top-scorers-ranked for every league and
+# season (plus team and nationality filters) once from SQL and once from the analytics engine,
+# and checks that both return the same rows. Rows tied on the sort columns may come back in
+# any order, and ties cut by `limit` may differ, so those are compared as sets. Rolling form
+# is checked against /players/form_tracker and head-to-head records against a GROUP BY on
+# Matches. Reports the average latency of each endpoint on both paths; exits 1 on a mismatch.
+#
+#   python benchmarks/analytics_bench.py --players 50 --repeat 3
+
+H2H_QUERY = """SELECT IF(hometeam_id = %s, awayteam_id, hometeam_id) AS opponent_id, COUNT(*) AS played,
+                      SUM(IF(hometeam_id = %s, IFNULL(hometeam_score, 0) > IFNULL(awayteam_score, 0),
+                             IFNULL(awayteam_score, 0) > IFNULL(hometeam_score, 0))) AS win,
+                      SUM(IFNULL(hometeam_score, 0) = IFNULL(awayteam_score, 0)) AS draw,
+                      SUM(IF(hometeam_id = %s, IFNULL(hometeam_score, 0), IFNULL(awayteam_score, 0))) AS goals_for
+               FROM Matches WHERE hometeam_id = %s OR awayteam_id = %s
+               GROUP BY opponent_id"""
+
+
+def normalized(rows):
+    # DECIMAL sums arrive as floats from SQL and as ints from the engine
+    if not isinstance(rows, list):
+        return rows
+    return [{key: int(value) if isinstance(value, float) and value.is_integer() else value
+             for key, value in row.items()} for row in rows]
+
+
+def same_rows(sql_rows, engine_rows, sort_key, limit=None):
+    """Same rows up to the order of rows tied on `sort_key` (and, with `limit`, the ties it cuts)."""
+    sql_rows, engine_rows = normalized(sql_rows), normalized(engine_rows)
+    if sql_rows == engine_rows:
+        return True
+    if not isinstance(sql_rows, list) or not isinstance(engine_rows, list) or len(sql_rows) != len(engine_rows):
+        return False
+    if [sort_key(row) for row in sql_rows] != [sort_key(row) for row in engine_rows]:
+        return False
+    if limit is not None and len(sql_rows) == limit:
+        last = sort_key(sql_rows[-1])
+        sql_rows = [row for row in sql_rows if sort_key(row) != last]
+        engine_rows = [row for row in engine_rows if sort_key(row) != last]
+
+    def key(row):
+        return json.dumps(row, sort_keys=True, default=str)
+    return sorted(map(key, sql_rows)) == sorted(map(key, engine_rows))
+
+
+class Timer:
+    def __init__(self):
+        self.seconds = {}
+
+    def get(self, client, engine, url):
+        analytics.enabled = engine
+        started = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - started
+        name = url.split("?")[0]
+        total, count = self.seconds.get((name, engine), (0.0, 0))
+        self.seconds[(name, engine)] = (total + elapsed, count + 1)
+        return response.json()
+
+    def average_ms(self, name, engine):
+        total, count = self.seconds.get((name, engine), (0.0, 0))
+        return total / count * 1000 if count else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the analytics engine with the SQL endpoints.")
+    parser.add_argument("--players", type=int, default=30, help="players whose rolling form is compared")
+    parser.add_argument("--teams", type=int, default=30, help="teams used as top scorer filters and for head-to-head")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=1, help="requests per case on each path")
+    args = parser.parse_args()
+    random.seed(348)
+
+    started = time.perf_counter()
+    snapshot = analytics.build()
+    print(f"snapshot: {snapshot.match_count} matches, {snapshot.stat_count} statistics, "
+          f"built in {time.perf_counter() - started:.2f}s\n")
+
+    timer = Timer()
+    mismatches = []
+    cases = []
+    seasons = [None] + [int(season) for season in snapshot.seasons]
+    for league in snapshot.league_ids.tolist():
+        for season in seasons:
+            query = f"league={league}" + (f"&season={season}" if season is not None else "")
+            cases.append((f"/league/standings?{query}", lambda row: (row["points"], row["win"], row["draw"]), None))
+            cases.append((f"/teams/leaderboard?{query}", lambda row: row["point"], None))
+    teams = random.sample(range(len(snapshot.team_ids)), min(args.teams, len(snapshot.team_ids)))
+    filters = ([{}] + [{"league": name} for name in snapshot.league_names]
+               + [{"team": snapshot.team_names[code]} for code in teams]
+               + [{"nationality": name} for name in random.sample(snapshot.country_names,
+                                                                   min(args.teams, len(snapshot.country_names)))])
+    for season in seasons:
+        for name_filter in filters:
+            params = dict(name_filter, limit=args.limit)
+            if season is not None:
+                params["season"] = season
+            cases.append((f"/top-scorers-ranked?{urlencode(params)}", lambda row: row["total_goals"], args.limit))
+
+    with TestClient(app) as client:
+        for url, sort_key, limit in cases:
+            for _ in range(args.repeat):
+                sql_rows = timer.get(client, False, url)
+                engine_rows = timer.get(client, True, url)
+            if not same_rows(sql_rows, engine_rows, sort_key, limit):
+                mismatches.append(url)
+
+        ##### Rolling form against /players/form_tracker
+        players = random.sample(snapshot.player_ids.tolist(), min(args.players, len(snapshot.player_ids)))
+        for player_id in players:
+            window = random.choice((3, 5, 10))
+            analytics.enabled = False
+            response = client.get(f"/players/form_tracker?player_id={player_id}&window={window}").json()
+            expected = list(zip(response.get("games", []), response.get("form_tracker", [])))
+            engine_rows = snapshot.rolling_form(player_id, window)
+            if len(expected) != len(engine_rows) or any(
+                    game["match_id"] != row["match_id"] or game["goal"] != row["goal"] or any(
+                        abs(float(form[name]) - row[name]) > 1e-3
+                        for name in ("rolling_goal_avg", "rolling_assist_avg", "rolling_pass_acc_avg",
+                                     "rolling_playtime_avg"))
+                    for (game, form), row in zip(expected, engine_rows)):
+                mismatches.append(f"rolling form of player {player_id} (window {window})")
+
+    ##### Head-to-head against GROUP BY on Matches
+    def _h2h(cursor, team_id):
+        cursor.execute(H2H_QUERY, (team_id,) * 5)
+        return cursor.fetchall()
+
+    for code in teams:
+        team_id = int(snapshot.team_ids[code])
+        expected = {row["opponent_id"]: (row["played"], int(row["win"]), int(row["draw"]), int(row["goals_for"]))
+                    for row in asyncio.run(run_db(_h2h, team_id))}
+        actual = {row["opponent_id"]: (row["played"], row["win"], row["draw"], row["goals_for"])
+                  for row in snapshot.head_to_head(team_id)}
+        if expected != actual:
+            mismatches.append(f"head-to-head of team {team_id}")
+
+    print(f"{'endpoint':<22}{'cases':>7}{'sql ms':>10}{'engine ms':>11}{'speedup':>9}")
+    for name in ("/league/standings", "/teams/leaderboard", "/top-scorers-ranked"):
+        count = sum(1 for url, _, _ in cases if url.split("?")[0] == name)
+        sql_ms, engine_ms = timer.average_ms(name, False), timer.average_ms(name, True)
+        print(f"{name:<22}{count:>7}{sql_ms:>10.2f}{engine_ms:>11.2f}{sql_ms / engine_ms if engine_ms else 0:>8.1f}x")
+    print(f"\nrolling form: {len(players)} players, head-to-head: {len(teams)} teams")
+
+    if mismatches:
+        print(f"\n{len(mismatches)} mismatches:")
+        for mismatch in mismatches[:50]:
+            print(f"  {mismatch}")
+        sys.exit(1)
+    print("\nall results match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+########## API latency benchmark #################
+# Drives every route of backend/routes/app.py with N concurrent clients and reports
+# throughput, p50/p95/p99 latency and the number of SQL statements the server ran
+# per request (from MySQL's global Questions counter, so run it on a quiet database).
+#
+#   python benchmarks/bench.py --start-server --concurrency 16 --requests 400
+#   python benchmarks/bench.py --save benchmarks/baselines/local.json
+#   python benchmarks/bench.py --compare benchmarks/baselines/local.json   # exits 1 on regressions
+#
+# Seed a scaled dataset first with database/production_data/generateGames.py --leagues ...
+# and database/bulk_load.py (see the README).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, method, path, query params or form data)
+ROUTES = [
+    ("home", "GET", "/", {}),
+    ("login", "POST", "/login", {"username": "Derron", "password": "wrong"}),
+    ("recentgames", "GET", "/recentgames", {}),
+    ("recentgames_league", "GET", "/recentgames", {"league": 1}),
+    ("recentgames_deep_page", "GET", "/recentgames", {"page": 50}),
+    ("player_search_short", "GET", "/player", {"name": "ka"}),
+    ("player_search_fulltext", "GET", "/player", {"name": "player"}),
+    ("player_search_team", "GET", "/player", {"team": 1, "position": "FWD"}),
+    ("game_search", "GET", "/game", {"start_date": "2020-01-01", "end_date": "2030-12-31", "league": 1}),
+    ("favorite_players", "GET", "/favorite/player/view", {"userid": 1}),
+    ("favorite_teams", "GET", "/favorite/team/view", {"userid": 1}),
+    ("team_players", "GET", "/teams/players", {"team": 1}),
+    ("team_players_all", "GET", "/teams/players", {"team": "all"}),
+    ("team_stats", "GET", "/teams/stats", {"team": 1}),
+    ("team_details", "GET", "/teams/details", {"team": 1}),
+    ("team_leaderboard", "GET", "/teams/leaderboard", {"league": 1}),
+    ("players", "GET", "/players", {}),
+    ("nationality", "GET", "/nationality", {}),
+    ("leagues", "GET", "/leagues", {}),
+    ("top_scorers", "GET", "/top-scorers-ranked", {}),
+    ("top_scorers_league", "GET", "/top-scorers-ranked", {"league": "league"}),
+    ("notifications", "GET", "/notifications/1", {}),
+    ("form_tracker", "GET", "/players/form_tracker", {"player_id": 1}),
+    ("league_standings", "GET", "/league/standings", {"league": 1}),
+    ("dashboard", "GET", "/dashboard/1", {}),
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def send(base_url, method, path, params, timeout):
+    if method == "GET":
+        url = base_url + path + ("?" + urllib.parse.urlencode(params) if params else "")
+        request = urllib.request.Request(url)
+    else:
+        request = urllib.request.Request(base_url + path, data=urllib.parse.urlencode(params).encode(),
+                                         method=method)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as err:
+        err.read()
+        status = err.code
+    except (urllib.error.URLError, TimeoutError):
+        status = 0
+    return time.perf_counter() - started, status
+
+
+def questions_counter(connection):
+    if connection is None:
+        return None
+    cursor = connection.cursor()
+    cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+    value = int(cursor.fetchone()[1])
+    cursor.close()
+    return value
+
+
+def run_route(base_url, route, requests, concurrency, timeout, connection):
+    name, method, path, params = route
+    # One warm-up request so connection setup and caches are not part of the numbers
+    send(base_url, method, path, params, timeout)
+
+    questions_before = questions_counter(connection)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: send(base_url, method, path, params, timeout), range(requests)))
+    elapsed = time.perf_counter() - started
+    questions_after = questions_counter(connection)
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    # 4xx answers (e.g. a deliberately wrong login) are valid responses, only 5xx/timeouts are errors
+    errors = sum(1 for _, status in results if status == 0 or status >= 500)
+    queries = None
+    if questions_before is not None:
+        # The two SHOW STATUS statements are counted as well
+        queries = round((questions_after - questions_before - 1) / requests, 2)
+
+    return {
+        "route": name,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": queries,
+    }
+
+
+def print_report(results):
+    print(f"{'route':<26}{'req':>6}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for r in results:
+        queries = "-" if r["queries_per_request"] is None else r["queries_per_request"]
+        print(f"{r['route']:<26}{r['requests']:>6}{r['errors']:>5}{r['throughput_rps']:>9}"
+              f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{queries:>9}")
+
+
+def compare(results, baseline, tolerance):
+    """Return the routes whose p95 or throughput got worse than the baseline by more than `tolerance`."""
+    previous = {r["route"]: r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get(r["route"])
+        if not old:
+            continue
+        if r["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{r['route']}: p95 {old['p95_ms']} ms -> {r['p95_ms']} ms")
+        if r["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{r['route']}: throughput {old['throughput_rps']} -> {r['throughput_rps']} rps")
+        if r["errors"] > old["errors"]:
+            regressions.append(f"{r['route']}: errors {old['errors']} -> {r['errors']}")
+    return regressions
+
+
+def start_server(base_url, timeout=30):
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "backend", "routes", "app.py")],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        _, status = send(base_url, "GET", "/", {}, 1)
+        if status == 200:
+            return server
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"Server did not come up on {base_url} within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API route.")
+    parser.add_argument("--base-url", default=os.getenv("BENCH_BASE_URL", "http://localhost:5001"))
+    parser.add_argument("--start-server", action="store_true", help="launch backend/routes/app.py for the run")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients per route")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--timeout", type=float, default=30, help="per request timeout in seconds")
+    parser.add_argument("--routes", nargs="*", help="only run these route names")
+    parser.add_argument("--no-db-counts", action="store_true", help="do not read MySQL's Questions counter")
+    parser.add_argument("--save", help="write the results to this baseline file")
+    parser.add_argument("--compare", help="baseline file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown vs the baseline")
+    args = parser.parse_args()
+
+    routes = [route for route in ROUTES if not args.routes or route[0] in args.routes]
+
+    connection = None
+    if not args.no_db_counts:
+        try:
+            connection = mysql.connector.connect(
+                host=os.getenv('DB_HOST', 'localhost'),
+                user=os.getenv('DB_USER'),
+                password=os.getenv('DB_PASSWORD')
+            )
+        except mysql.connector.Error as err:
+            print(f"Query counts disabled, could not connect to MySQL: {err}")
+
+    server = start_server(args.base_url) if args.start_server else None
+    try:
+        results = [run_route(args.base_url, route, args.requests, args.concurrency, args.timeout, connection)
+                   for route in routes]
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        if connection:
+            connection.close()
+
+    print_report(results)
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "results": results,
+    }
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("\nRegressions against", args.compare)
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "backend", "routes"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from responses import brotli, compress, json_dumps, orjson  # noqa: E402
+
+########## Response encoding benchmark #################
+# Renders payloads shaped like the large endpoints both ways the backend can:
+#   default: FastAPI's jsonable_encoder + json.dumps (what handlers returning plain dicts got)
+#   fast:    responses.json_dumps (orjson when installed) on the raw rows
+# and reports the CPU time per response plus the bytes on the wire with gzip/brotli.
+#
+#   python benchmarks/json_bench.py --rows 2000
+
+
+def roster(rows):
+    return [{"player_id": i, "playername": f"Player {i}", "player_nationality_id": i % 50, "team_id": i % 40,
+             "age": 18 + i % 20, "position": ("GK", "DEF", "MID", "FWD")[i % 4]} for i in range(rows)]
+
+
+def form_tracker(rows):
+    start = date(2024, 8, 1)
+    tracker = [{"player_id": 7, "playername": "Player 7", "date": start + timedelta(days=7 * i), "goal": i % 3,
+                "pass_acc": Decimal("78.50") + i % 10, "assist": i % 2, "playtime": 90,
+                "rolling_goal_avg": Decimal("0.6000"), "rolling_assist_avg": Decimal("0.4000"),
+                "rolling_pass_acc_avg": Decimal("81.2500"), "rolling_playtime_avg": Decimal("88.0000")}
+               for i in range(rows)]
+    games = [{"match_id": i, "date": start + timedelta(days=7 * i), "match_location": "Team 1 Stadium",
+              "league_id": 1, "home_team": "Team 1", "away_team": f"Team {i % 19 + 2}", "hometeam_score": i % 4,
+              "awayteam_score": i % 3, "goal": i % 3, "pass_acc": Decimal("78.50"), "assist": i % 2, "playtime": 90}
+             for i in range(rows)]
+    return {"form_tracker": tracker, "games": games}
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON rendering and compression of large payloads.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"renderer: {'orjson' if orjson else 'json (orjson not installed)'}, "
+          f"brotli: {'yes' if brotli else 'not installed'}\n")
+    print(f"{'payload':<14}{'default ms':>12}{'fast ms':>10}{'speedup':>9}{'raw KB':>9}{'gzip KB':>9}{'br KB':>8}")
+    for name, payload in (("roster", roster(args.rows)), ("form_tracker", form_tracker(args.rows))):
+        default_time, default_body = timed(lambda: json.dumps(jsonable_encoder(payload)).encode(), args.repeat)
+        fast_time, body = timed(lambda: json_dumps(payload), args.repeat)
+        assert json.loads(default_body) == json.loads(body)
+        level = {"gzip": 6, "br": 4}
+        gzip_size = len(compress(body, "gzip", level))
+        br_size = f"{len(compress(body, 'br', level)) / 1024:>8.1f}" if brotli else f"{'-':>8}"
+        print(f"{name:<14}{default_time * 1000:>12.2f}{fast_time * 1000:>10.2f}{default_time / fast_time:>8.1f}x"
+              f"{len(body) / 1024:>9.1f}{gzip_size / 1024:>9.1f}{br_size}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import mysql.connector
+import pandas as pd
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "backend", "routes"))
+
+from search_index import PlayerIndex, fold  # noqa: E402
+
+load_dotenv()
+
+########## Player search benchmark #################
+# Compares the in-memory PlayerIndex with the SQL name search /player used before
+# (LOWER(playername) LIKE for short terms, MATCH ... AGAINST otherwise) on the same terms:
+# prefixes, substrings, full names and names with typos drawn from the player table.
+#
+#   python benchmarks/search_bench.py                 # players from the database
+#   python benchmarks/search_bench.py --csv database/production_data/sample_player.csv --queries 2000
+# Without a reachable database (or with --csv) only the index side is measured.
+
+PLAYER_QUERY = """SELECT player_id, playername, Players.team_id, teamname, position,
+                         player_nationality_id, countryname as nationality, age
+                  FROM Players
+                  LEFT JOIN Teams ON Players.team_id = Teams.team_id
+                  LEFT JOIN Country ON Players.player_nationality_id = Country.country_id"""
+
+
+def sql_search(cursor, name):
+    query = """SELECT player_id, playername, teamname, position, countryname as nationality, age
+               FROM Players
+               LEFT JOIN Teams ON Players.team_id = Teams.team_id
+               LEFT JOIN Country ON Players.player_nationality_id = Country.country_id
+               WHERE 1 = 1"""
+    if len(name) < 4:
+        query += " AND LOWER(playername) LIKE %s"
+        params = [f"%{name.lower()}%"]
+    else:
+        query += " AND MATCH(playername) AGAINST(%s IN NATURAL LANGUAGE MODE)"
+        params = [name]
+    query += " ORDER BY playername, player_id LIMIT 10"
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+
+def typo(word):
+    if len(word) < 4:
+        return word
+    i = random.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def substring(name):
+    folded = fold(name)
+    start = random.randrange(max(1, len(folded) - 3))
+    return folded[start:start + 3]
+
+
+def make_terms(players, count):
+    names = [p["playername"] for p in players if p["playername"]]
+    kinds = {
+        "prefix": lambda name: name.split()[-1][:random.randint(2, 4)],
+        "substring": substring,
+        "full": lambda name: name,
+        "typo": lambda name: typo(name.split()[-1]),
+    }
+    return [(kind, make(random.choice(names))) for _ in range(count) for kind, make in kinds.items()]
+
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+    print(f"{label:<24}{len(timings):>8}{statistics.median(timings) * 1e6:>12.1f}{p95 * 1e6:>12.1f}"
+          f"{sum(timings) / len(timings) * 1e6:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the player search index against SQL.")
+    parser.add_argument("--csv", help="load players from a sample_player.csv instead of the database")
+    parser.add_argument("--queries", type=int, default=500, help="terms per kind")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    connection = None
+    if args.csv:
+        players = pd.read_csv(args.csv).assign(teamname=None, nationality=None).to_dict("records")
+    else:
+        connection = mysql.connector.connect(
+            host=os.getenv('DB_HOST', 'localhost'),
+            database=os.getenv('DB_NAME'),
+            user=os.getenv('DB_USER'),
+            password=os.getenv('DB_PASSWORD')
+        )
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(PLAYER_QUERY)
+        players = cursor.fetchall()
+
+    started = time.perf_counter()
+    index = PlayerIndex(players)
+    print(f"Indexed {len(index)} players in {(time.perf_counter() - started) * 1000:.1f} ms\n")
+
+    terms = make_terms(players, args.queries)
+    print(f"{'path / term kind':<24}{'queries':>8}{'p50 us':>12}{'p95 us':>12}{'mean us':>12}")
+    for kind in ("prefix", "substring", "full", "typo"):
+        kind_terms = [term for k, term in terms if k == kind]
+        timings = []
+        for term in kind_terms:
+            started = time.perf_counter()
+            index.search(term, limit=10)
+            timings.append(time.perf_counter() - started)
+        summarize(f"index {kind}", timings)
+
+        if connection is not None:
+            timings = []
+            for term in kind_terms:
+                started = time.perf_counter()
+                sql_search(cursor, term)
+                timings.append(time.perf_counter() - started)
+            summarize(f"sql {kind}", timings)
+
+    if connection is not None:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import argparse
+import csv
+import glob
+import os
+import tempfile
+import time
+
+import mysql.connector
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Tables in foreign-key dependency order: every table only references tables above it.
+#   csv:     file name inside the data directory
+#   key:     primary key columns (not touched by the ON DUPLICATE KEY UPDATE)
+#   columns: column name -> type used for the vectorized CSV conversion
+TABLES = [
+    {"table": "Roles", "csv": "sample_role.csv", "key": ["role_id"],
+     "columns": {"role_id": "int", "rolename": "str"}},
+    {"table": "Users", "csv": "sample_app_user.csv", "key": ["user_id"],
+     "columns": {"user_id": "int", "username": "str", "password": "str", "email": "str", "role_id": "int"}},
+    {"table": "Country", "csv": "sample_country.csv", "key": ["country_id"],
+     "columns": {"country_id": "int", "countryname": "str"}},
+    {"table": "Leagues", "csv": "sample_league.csv", "key": ["league_id"],
+     "columns": {"league_id": "int", "leaguename": "str", "league_nationality_id": "int"}},
+    {"table": "Teams", "csv": "sample_team.csv", "key": ["team_id"],
+     "columns": {"team_id": "int", "teamname": "str", "league_id": "int"}},
+    {"table": "Players", "csv": "sample_player.csv", "key": ["player_id"],
+     "columns": {"player_id": "int", "playername": "str", "team_id": "int", "position": "str",
+                 "player_nationality_id": "int", "age": "int"}},
+    {"table": "Matches", "csv": "sample_game.csv", "key": ["match_id"],
+     "columns": {"match_id": "int", "league_id": "int", "hometeam_id": "int", "awayteam_id": "int",
+                 "hometeam_score": "int", "awayteam_score": "int", "date": "date", "match_location": "str"}},
+    {"table": "Statistics", "csv": "sample_statistics.csv", "key": ["match_id", "player_id"],
+     "columns": {"match_id": "int", "player_id": "int", "goal": "int", "pass_acc": "decimal",
+                 "assist": "int", "playtime": "int"}},
+    {"table": "FavoritePlayers", "csv": "sample_favoriteplayers.csv", "key": ["user_id", "player_id"],
+     "columns": {"user_id": "int", "player_id": "int", "dateAdded": "date"}},
+    {"table": "FavoriteTeams", "csv": "sample_favoriteteams.csv", "key": ["user_id", "team_id"],
+     "columns": {"user_id": "int", "team_id": "int", "dateAdded": "date"}},
+]
+
+
+def connect(**overrides):
+    settings = {
+        "host": os.getenv('DB_HOST', 'localhost'),
+        "database": os.getenv('DB_NAME', 'soccer_app'),
+        "user": os.getenv('DB_USER'),
+        "password": os.getenv('DB_PASSWORD'),
+        # Needed for LOAD DATA LOCAL INFILE, the server must also have local_infile=ON
+        "allow_local_infile": True,
+    }
+    settings.update(overrides)
+    return mysql.connector.connect(**settings)
+
+
+##### Vectorized conversion
+# Converts whole columns at once instead of casting every value of every row.
+def prepare_frame(data, columns):
+    frame = pd.DataFrame(index=data.index)
+    for column, kind in columns.items():
+        values = data[column]
+        if kind == "int":
+            frame[column] = pd.to_numeric(values).astype("Int64")
+        elif kind == "decimal":
+            frame[column] = pd.to_numeric(values).round(2)
+        elif kind == "date":
+            frame[column] = pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+        else:
+            frame[column] = values.astype("string")
+    return frame
+
+
+def upsert_clause(columns, key):
+    return ", ".join(f"{column} = VALUES({column})" for column in columns if column not in key)
+
+
+def local_infile_enabled(cursor):
+    cursor.execute("SELECT @@GLOBAL.local_infile")
+    return bool(cursor.fetchone()[0])
+
+
+##### executemany path: one multi-row INSERT per batch
+def insert_batches(connection, cursor, spec, frame, batch_size):
+    columns = list(spec["columns"])
+    query = (f"INSERT INTO {spec['table']} ({', '.join(columns)}) "
+             f"VALUES ({', '.join(['%s'] * len(columns))}) "
+             f"ON DUPLICATE KEY UPDATE {upsert_clause(columns, spec['key'])}")
+
+    # astype(object) turns numpy scalars into plain python values the driver understands
+    rows = list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(query, rows[start:start + batch_size])
+        connection.commit()
+
+
+##### LOAD DATA path: stream the file into a staging table, then upsert from it in one statement
+def load_data_infile(connection, cursor, spec, frame):
+    table = spec["table"]
+    stage = f"stage_{table}"
+    columns = ", ".join(spec["columns"])
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8") as handle:
+        frame.to_csv(handle, index=False, header=False, na_rep="NULL",
+                     quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+        path = handle.name
+
+    try:
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+        # Not LIKE: a temporary table cannot copy the partitioning of Matches/Statistics
+        cursor.execute(f"CREATE TEMPORARY TABLE {stage} SELECT {columns} FROM {table} LIMIT 0")
+        # ESCAPED BY '' keeps backslashes in passwords intact; unquoted NULL is read as SQL NULL
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {stage} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({columns})",
+            (path,)
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage} "
+            f"ON DUPLICATE KEY UPDATE {upsert_clause(spec['columns'], spec['key'])}"
+        )
+        cursor.execute(f"DROP TEMPORARY TABLE {stage}")
+        connection.commit()
+    finally:
+        os.remove(path)
+
+
+# A table is either one CSV (sample_game.csv) or the chunks generateDataset.py writes
+# (sample_game.part-00000.csv, ... or .parquet), loaded in order
+def table_files(data_dir, csv_name):
+    single = os.path.join(data_dir, csv_name)
+    if os.path.exists(single):
+        return [single]
+    stem = os.path.splitext(csv_name)[0]
+    return sorted(glob.glob(os.path.join(data_dir, f"{stem}.part-*.csv"))
+                  + glob.glob(os.path.join(data_dir, f"{stem}.part-*.parquet")))
+
+
+def read_file(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_tables(connection, data_dir, batch_size=1000, use_load_data=True, tables=None):
+    """
+    Load every CSV (or chunked CSV/Parquet) in `data_dir` into its table, in foreign-key order.
+    Returns one {"table", "rows", "seconds", "rows_per_sec", "method"} dict per loaded table.
+    """
+    cursor = connection.cursor()
+    if use_load_data:
+        try:
+            use_load_data = local_infile_enabled(cursor)
+        except mysql.connector.Error:
+            use_load_data = False
+
+    # InnoDB has no DISABLE KEYS, so skip per-row FK checks for the session instead; rows
+    # arrive in dependency order and are already consistent.
+    cursor.execute("SET foreign_key_checks = 0")
+
+    results = []
+    try:
+        for spec in TABLES:
+            if tables and spec["table"] not in tables:
+                continue
+            files = table_files(data_dir, spec["csv"])
+            if not files:
+                print(f"{spec['table']}: {os.path.join(data_dir, spec['csv'])} not found, skipped.")
+                continue
+
+            started = time.perf_counter()
+            rows = 0
+            # Secondary unique index checks are only skipped when filling an empty table: without
+            # them InnoDB may miss duplicates of existing rows (e.g. Users.username) on a re-run
+            cursor.execute(f"SELECT 1 FROM {spec['table']} LIMIT 1")
+            empty = not cursor.fetchall()
+            cursor.execute(f"SET unique_checks = {0 if empty else 1}")
+            # One chunk at a time, so memory use does not grow with the size of the table
+            for path in files:
+                frame = prepare_frame(read_file(path), spec["columns"])
+                method = "executemany"
+                if use_load_data:
+                    try:
+                        load_data_infile(connection, cursor, spec, frame)
+                        method = "load data"
+                    except mysql.connector.Error as err:
+                        # e.g. local_infile refused by the client or server, fall back for the rest of the run
+                        print(f"{spec['table']}: LOAD DATA failed ({err}), falling back to executemany.")
+                        connection.rollback()
+                        use_load_data = False
+                if method == "executemany":
+                    insert_batches(connection, cursor, spec, frame, batch_size)
+                rows += len(frame)
+
+            seconds = time.perf_counter() - started
+            rows_per_sec = rows / seconds if seconds else 0.0
+            results.append({"table": spec["table"], "rows": rows, "seconds": round(seconds, 3),
+                            "rows_per_sec": round(rows_per_sec), "method": method})
+            print(f"{spec['table']} Data imported successfully! "
+                  f"({rows} rows in {len(files)} file(s), {seconds:.2f}s, {rows_per_sec:,.0f} rows/sec, {method})")
+    finally:
+        cursor.execute("SET unique_checks = 1")
+        cursor.execute("SET foreign_key_checks = 1")
+        cursor.close()
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bulk load the soccer_app CSV files.")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "production_data"))
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per executemany batch")
+    parser.add_argument("--no-load-data", action="store_true", help="never use LOAD DATA LOCAL INFILE")
+    parser.add_argument("--tables", nargs="*", help="only load these tables")
+    args = parser.parse_args()
+
+    connection = connect()
+    load_tables(connection, args.data_dir, batch_size=args.batch_size,
+                use_load_data=not args.no_load_data, tables=args.tables)
+    connection.close()
@@ -1,61 +1,13 @@
-import mysql.connector
 import os
-from dotenv import load_dotenv
+import sys
 
-load_dotenv()
+from migrate import connect, migrate
 
-# General schema file
-schema_path = 'createTables.sql'
-# Trigger file
-trigger_path = 'triggers.sql'
-# Procedure file
-procedure_path = 'procedure.sql'
+# Bring the schema (tables, indexes, triggers, procedures) up to date by applying any
+# pending migrations from migrations/. Existing data is kept; pass --reset to start
+# from an empty database instead.
+database = os.getenv('DB_NAME', 'soccer_app')
 
-connection = mysql.connector.connect(
-    host=os.getenv('DB_HOST', 'localhost'),
-    user=os.getenv('DB_USER'),
-    password=os.getenv('DB_PASSWORD')
-)
-
-cursor = connection.cursor()
-
-# Step 1: Run basic schema commands (split safely)
-with open(schema_path, 'r') as file:
-    schema_sql = file.read()
-
-for statement in schema_sql.strip().split(';'):
-    stmt = statement.strip()
-    if stmt:
-        try:
-            cursor.execute(stmt)
-        except mysql.connector.Error as err:
-            print("Schema Error:", err)
-
-# Step 2: Run trigger/event block in full
-with open(trigger_path, 'r') as file:
-    trigger_sql = file.read()
-
-try:
-    for result in cursor.execute(trigger_sql, multi=True):
-        pass  # consume result
-    connection.commit()
-    print("Trigger/event created successfully!")
-except mysql.connector.Error as err:
-    print("Trigger/Event Error:", err)
-
-
-# Step 3: Run the Procedure block in full
-with open(procedure_path, 'r') as file:
-    procedure_sql = file.read()
-
-try:
-    for result in cursor.execute(procedure_sql, multi=True):
-        pass  # consume result
-    connection.commit()
-    print("Procedure created successfully!")
-except mysql.connector.Error as err:
-    print("Procedure Error:", err)
-
-
-cursor.close()
-connection.close()
\ No newline at end of file
+connection = connect()
+migrate(connection, database, reset='--reset' in sys.argv[1:])
+connection.close()
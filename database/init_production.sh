@@ -13,8 +13,8 @@ echo "✅ Dependencies installed."
 
 echo "Starting production initialization..."
 
-# Execute the initial database setup script
-python init_production.py
+# Apply pending schema migrations (pass --reset to this script to start from an empty database)
+python init_production.py "$@"
 if [ $? -ne 0 ]; then
   echo "Failed to execute init_production.py"
   exit 1
@@ -33,4 +33,23 @@ else
     exit 1
 fi
 
+# One partition per season of the loaded fixtures (Matches/Statistics are partitioned by season)
+echo "Updating season partitions..."
+python partitions.py add
+if [ $? -ne 0 ]; then
+  echo "Failed to update season partitions"
+  exit 1
+fi
+
+# Make sure the summary tables match the loaded fixtures and statistics
+echo "Rebuilding summary tables..."
+python rebuild_aggregates.py
+if [ $? -ne 0 ]; then
+  echo "Failed to rebuild summary tables"
+  exit 1
+fi
+
+# Drop cached reference data if the backend is already running
+curl -s -X POST -H "X-Admin-Token: ${ADMIN_TOKEN:-}" "${BACKEND_URL:-http://localhost:5001}/cache/invalidate" > /dev/null 2>&1 || true
+
 echo "Production initialization completed successfully!"
\ No newline at end of file
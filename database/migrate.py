@@ -0,0 +1,117 @@
+import argparse
+import os
+import re
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Versioned schema migrations.
+# Every file in migrations/ is named <version>_<name>.sql and is applied once, in version
+# order; applied versions are recorded in the SchemaMigrations table. A file is sent to
+# the server as one multi-statement batch, so trigger/procedure bodies need no DELIMITER.
+# MySQL DDL is not transactional: if a migration fails halfway, fix it and re-run by hand.
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def list_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+
+def applied_versions(cursor):
+    cursor.execute("""CREATE TABLE IF NOT EXISTS SchemaMigrations(
+                          version INT PRIMARY KEY,
+                          name VARCHAR(255) NOT NULL,
+                          applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                      )""")
+    cursor.execute("SELECT version FROM SchemaMigrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def record(cursor, version, name):
+    cursor.execute("INSERT INTO SchemaMigrations(version, name) VALUES (%s, %s)", (version, name))
+
+
+def migrate(connection, database, reset=False, baseline=None, target=None):
+    cursor = connection.cursor()
+
+    if reset:
+        cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+        print(f"Dropped database {database}.")
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    cursor.execute(f"USE {database}")
+
+    applied = applied_versions(cursor)
+    migrations = list_migrations()
+
+    # Mark migrations as applied without running them (databases created before migrations existed)
+    if baseline is not None:
+        for version, name, _ in migrations:
+            if version <= baseline and version not in applied:
+                record(cursor, version, name)
+                applied.add(version)
+                print(f"Baselined {version:04d}_{name}")
+        connection.commit()
+
+    pending = [m for m in migrations if m[0] not in applied and (target is None or m[0] <= target)]
+    if not pending:
+        print("Schema is up to date.")
+
+    for version, name, path in pending:
+        with open(path, 'r') as file:
+            sql = file.read()
+        try:
+            for result in cursor.execute(sql, multi=True):
+                if result.with_rows:
+                    result.fetchall()  # consume result
+            record(cursor, version, name)
+            connection.commit()
+            print(f"Applied {version:04d}_{name}")
+        except mysql.connector.Error as err:
+            print(f"Migration {version:04d}_{name} failed:", err)
+            raise
+
+    cursor.close()
+    return [m[0] for m in pending]
+
+
+def status(connection, database):
+    cursor = connection.cursor()
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    cursor.execute(f"USE {database}")
+    applied = applied_versions(cursor)
+    for version, name, _ in list_migrations():
+        print(f"[{'x' if version in applied else ' '}] {version:04d}_{name}")
+    cursor.close()
+
+
+def connect():
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--reset", action="store_true", help="drop the database first (destroys all data)")
+    parser.add_argument("--baseline", type=int, help="record migrations up to VERSION as applied without running them")
+    parser.add_argument("--target", type=int, help="stop after VERSION")
+    parser.add_argument("--status", action="store_true", help="list migrations and whether they are applied")
+    args = parser.parse_args()
+
+    database = os.getenv('DB_NAME', 'soccer_app')
+    connection = connect()
+    if args.status:
+        status(connection, database)
+    else:
+        migrate(connection, database, reset=args.reset, baseline=args.baseline, target=args.target)
+    connection.close()
@@ -1,7 +1,3 @@
-DROP DATABASE IF EXISTS soccer_app;
-CREATE DATABASE soccer_app;
-USE soccer_app;
-
 CREATE TABLE Country(
     country_id INT PRIMARY KEY,
     countryname VARCHAR(100) NOT NULL UNIQUE,
@@ -122,6 +118,23 @@ CREATE TABLE Notifications (
     FOREIGN KEY (user_id) REFERENCES Users(user_id) ON DELETE CASCADE
 );
 
+-- Create TeamStandings
+-- Per team/league/season results summary kept current by the Matches triggers.
+-- season is the year the season started (matches before July count towards the previous year).
+CREATE TABLE TeamStandings(
+    team_id INT NOT NULL,
+    league_id INT NOT NULL,
+    season INT NOT NULL,
+    played INT NOT NULL DEFAULT 0,
+    win INT NOT NULL DEFAULT 0,
+    lose INT NOT NULL DEFAULT 0,
+    draw INT NOT NULL DEFAULT 0,
+    goals_for INT NOT NULL DEFAULT 0,
+    goals_against INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (team_id, league_id, season),
+    FOREIGN KEY (team_id) REFERENCES Teams(team_id) ON DELETE CASCADE,
+    FOREIGN KEY (league_id) REFERENCES Leagues(league_id) ON DELETE CASCADE
+);
 
 -- Create AuditLogs
 CREATE TABLE AuditLogs(
@@ -134,4 +147,9 @@ CREATE TABLE AuditLogs(
 );
 
 -- Index
-CREATE INDEX idx_players_team_id ON Players(team_id);
\ No newline at end of file
+CREATE INDEX idx_players_team_id ON Players(team_id);
+CREATE INDEX idx_standings_league_season ON TeamStandings(league_id, season);
+-- Keyset pagination: seek by (date, match_id) and (playername, player_id) instead of OFFSET scans
+CREATE INDEX idx_matches_date ON Matches(date, match_id);
+CREATE INDEX idx_matches_league_date ON Matches(league_id, date, match_id);
+CREATE INDEX idx_players_name ON Players(playername, player_id);
\ No newline at end of file
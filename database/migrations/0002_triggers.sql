@@ -19,6 +19,35 @@ BEGIN
 END;
 
 
+-- Triggers: Keep TeamStandings in sync with every change to Matches
+CREATE TRIGGER standings_match_insert
+AFTER INSERT ON Matches
+FOR EACH ROW
+BEGIN
+    CALL ApplyMatchToStandings(NEW.date, NEW.league_id, NEW.hometeam_id, NEW.awayteam_id,
+                               NEW.hometeam_score, NEW.awayteam_score, 1);
+END;
+
+CREATE TRIGGER standings_match_update
+AFTER UPDATE ON Matches
+FOR EACH ROW
+BEGIN
+    -- Retract the old result and apply the new one (team, league or date may have changed too)
+    CALL ApplyMatchToStandings(OLD.date, OLD.league_id, OLD.hometeam_id, OLD.awayteam_id,
+                               OLD.hometeam_score, OLD.awayteam_score, -1);
+    CALL ApplyMatchToStandings(NEW.date, NEW.league_id, NEW.hometeam_id, NEW.awayteam_id,
+                               NEW.hometeam_score, NEW.awayteam_score, 1);
+END;
+
+CREATE TRIGGER standings_match_delete
+AFTER DELETE ON Matches
+FOR EACH ROW
+BEGIN
+    CALL ApplyMatchToStandings(OLD.date, OLD.league_id, OLD.hometeam_id, OLD.awayteam_id,
+                               OLD.hometeam_score, OLD.awayteam_score, -1);
+END;
+
+
 -- Event: Scheduled daily job to notify users when a favorite player reaches a goal milestone
 CREATE EVENT daily_player_milestone_event
 ON SCHEDULE EVERY 1 DAY -- This event runs once every day
@@ -0,0 +1,87 @@
+CREATE PROCEDURE TransferPlayer(
+    IN player INT,      -- Player's ID to be transferred
+    IN new_team_id INT  -- ID of the new team the player will join
+)
+BEGIN
+    DECLARE old_team_id INT;   -- Temporarily stores the player's current team ID
+
+    -- Fetch the player's current team and store it in "old_team"
+    SELECT team_id INTO old_team_id FROM Players WHERE player_id = player;
+    -- Start the transaction
+    START TRANSACTION;
+        -- Update the player's team to the new team
+        UPDATE Players SET team_id = new_team_id WHERE player_id = player;
+        -- Log this action into AuditLogs
+        INSERT INTO AuditLogs(action_type, table_name, action_details, performed_by)
+        VALUES (
+            'UPDATE',
+            'Players',
+            CONCAT('Player ID ', player, 
+                   ' transferred from team ', old_team_id, 
+                   ' to team ', new_team_id),
+            CURRENT_USER()  -- The database user performing the action
+        );
+    -- Complete the transaction
+    COMMIT;
+END;
+
+
+-- Apply (direction = 1) or retract (direction = -1) one match result in TeamStandings.
+-- Called by the Matches triggers so standings never need to be recomputed per request.
+CREATE PROCEDURE ApplyMatchToStandings(
+    IN match_date DATE,
+    IN league INT,
+    IN home_team INT,
+    IN away_team INT,
+    IN home_score INT,
+    IN away_score INT,
+    IN direction INT
+)
+BEGIN
+    -- Seasons start in July, so a match in March 2025 belongs to season 2024
+    DECLARE match_season INT DEFAULT YEAR(match_date) - (MONTH(match_date) < 7);
+
+    INSERT INTO TeamStandings(team_id, league_id, season, played, win, lose, draw, goals_for, goals_against)
+    VALUES
+        (home_team, league, match_season, direction,
+         direction * (home_score > away_score), direction * (home_score < away_score), direction * (home_score = away_score),
+         direction * home_score, direction * away_score),
+        (away_team, league, match_season, direction,
+         direction * (away_score > home_score), direction * (away_score < home_score), direction * (away_score = home_score),
+         direction * away_score, direction * home_score)
+    ON DUPLICATE KEY UPDATE
+        played = played + VALUES(played),
+        win = win + VALUES(win),
+        lose = lose + VALUES(lose),
+        draw = draw + VALUES(draw),
+        goals_for = goals_for + VALUES(goals_for),
+        goals_against = goals_against + VALUES(goals_against);
+END;
+
+
+-- Recompute TeamStandings from scratch out of the Matches table
+CREATE PROCEDURE RebuildTeamStandings()
+BEGIN
+    START TRANSACTION;
+        DELETE FROM TeamStandings;
+
+        INSERT INTO TeamStandings(team_id, league_id, season, played, win, lose, draw, goals_for, goals_against)
+        SELECT team_id, league_id, season, COUNT(*), SUM(win), SUM(lose), SUM(draw), SUM(goals_for), SUM(goals_against)
+        FROM (
+            SELECT hometeam_id AS team_id, league_id, YEAR(date) - (MONTH(date) < 7) AS season,
+                   hometeam_score > awayteam_score AS win,
+                   hometeam_score < awayteam_score AS lose,
+                   hometeam_score = awayteam_score AS draw,
+                   hometeam_score AS goals_for, awayteam_score AS goals_against
+            FROM Matches
+            UNION ALL
+            SELECT awayteam_id AS team_id, league_id, YEAR(date) - (MONTH(date) < 7) AS season,
+                   awayteam_score > hometeam_score AS win,
+                   awayteam_score < hometeam_score AS lose,
+                   awayteam_score = hometeam_score AS draw,
+                   awayteam_score AS goals_for, hometeam_score AS goals_against
+            FROM Matches
+        ) AS results
+        GROUP BY team_id, league_id, season;
+    COMMIT;
+END
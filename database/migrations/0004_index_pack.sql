@@ -0,0 +1,17 @@
+-- Tuned secondary indexes for the API queries in backend/routes/app.py.
+-- (Matches(date), Matches(league_id, date) and Players(playername) already ship with 0001.)
+
+-- Per-player lookups (form tracker, goal totals, milestones) lead on player_id and carry
+-- the stat columns so they are answered from the index alone.
+CREATE INDEX idx_statistics_player ON Statistics(player_id, goal, assist, playtime, pass_acc);
+
+-- Latest notifications of one user
+CREATE INDEX idx_notifications_user_created ON Notifications(user_id, created_at);
+
+-- Favorites views: rows of one user ordered by dateAdded
+CREATE INDEX idx_favoriteplayers_user_added ON FavoritePlayers(user_id, dateAdded);
+CREATE INDEX idx_favoriteteams_user_added ON FavoriteTeams(user_id, dateAdded);
+
+-- Team fixtures by date, home and away
+CREATE INDEX idx_matches_home_date ON Matches(hometeam_id, date);
+CREATE INDEX idx_matches_away_date ON Matches(awayteam_id, date);
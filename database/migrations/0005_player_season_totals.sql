@@ -0,0 +1,131 @@
+-- Per player/season totals of the Statistics table, maintained by triggers so the
+-- top scorers ranking never has to aggregate raw Statistics rows.
+-- team_id/league_id/nationality_id mirror the player's current team and nationality
+-- (kept in sync by the Players update trigger) so ranking filters are index lookups.
+CREATE TABLE PlayerSeasonTotals(
+    player_id INT NOT NULL,
+    season INT NOT NULL,
+    team_id INT NOT NULL,
+    league_id INT NOT NULL,
+    nationality_id INT NULL,
+    appearances INT NOT NULL DEFAULT 0,
+    goals INT NOT NULL DEFAULT 0,
+    assists INT NOT NULL DEFAULT 0,
+    minutes INT NOT NULL DEFAULT 0,
+    pass_acc_total DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    avg_pass_acc DECIMAL(5, 2) AS (IF(appearances > 0, pass_acc_total / appearances, 0)) VIRTUAL,
+    PRIMARY KEY (player_id, season),
+    FOREIGN KEY (player_id) REFERENCES Players(player_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_totals_season_goals ON PlayerSeasonTotals(season, goals);
+CREATE INDEX idx_totals_league_goals ON PlayerSeasonTotals(league_id, season, goals);
+CREATE INDEX idx_totals_team_goals ON PlayerSeasonTotals(team_id, season, goals);
+CREATE INDEX idx_totals_nationality_goals ON PlayerSeasonTotals(nationality_id, season, goals);
+
+
+-- Apply (direction = 1) or retract (direction = -1) one Statistics row
+CREATE PROCEDURE ApplyStatToPlayerTotals(
+    IN match_ref INT,
+    IN player_ref INT,
+    IN stat_goal INT,
+    IN stat_assist INT,
+    IN stat_playtime INT,
+    IN stat_pass_acc DECIMAL(5, 2),
+    IN direction INT
+)
+BEGIN
+    DECLARE stat_season INT;
+    DECLARE player_team INT;
+    DECLARE player_league INT;
+    DECLARE player_nationality INT;
+
+    -- Same season rule as TeamStandings: seasons start in July
+    SELECT YEAR(date) - (MONTH(date) < 7) INTO stat_season
+    FROM Matches WHERE match_id = match_ref;
+
+    SELECT p.team_id, t.league_id, p.player_nationality_id
+    INTO player_team, player_league, player_nationality
+    FROM Players p JOIN Teams t ON p.team_id = t.team_id
+    WHERE p.player_id = player_ref;
+
+    INSERT INTO PlayerSeasonTotals(player_id, season, team_id, league_id, nationality_id,
+                                   appearances, goals, assists, minutes, pass_acc_total)
+    VALUES (player_ref, stat_season, player_team, player_league, player_nationality,
+            direction, direction * stat_goal, direction * stat_assist, direction * stat_playtime, direction * stat_pass_acc)
+    ON DUPLICATE KEY UPDATE
+        team_id = VALUES(team_id),
+        league_id = VALUES(league_id),
+        nationality_id = VALUES(nationality_id),
+        appearances = appearances + VALUES(appearances),
+        goals = goals + VALUES(goals),
+        assists = assists + VALUES(assists),
+        minutes = minutes + VALUES(minutes),
+        pass_acc_total = pass_acc_total + VALUES(pass_acc_total);
+END;
+
+
+-- Recompute PlayerSeasonTotals from scratch out of Statistics
+CREATE PROCEDURE RebuildPlayerSeasonTotals()
+BEGIN
+    START TRANSACTION;
+        DELETE FROM PlayerSeasonTotals;
+
+        INSERT INTO PlayerSeasonTotals(player_id, season, team_id, league_id, nationality_id,
+                                       appearances, goals, assists, minutes, pass_acc_total)
+        SELECT s.player_id, YEAR(m.date) - (MONTH(m.date) < 7) AS season,
+               p.team_id, t.league_id, p.player_nationality_id,
+               COUNT(*), SUM(s.goal), SUM(s.assist), SUM(s.playtime), SUM(s.pass_acc)
+        FROM Statistics s
+        JOIN Matches m ON s.match_id = m.match_id
+        JOIN Players p ON s.player_id = p.player_id
+        JOIN Teams t ON p.team_id = t.team_id
+        GROUP BY s.player_id, season, p.team_id, t.league_id, p.player_nationality_id;
+    COMMIT;
+END;
+
+
+-- Triggers: Keep PlayerSeasonTotals in sync with every change to Statistics
+CREATE TRIGGER totals_stat_insert
+AFTER INSERT ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist,
+                                 NEW.playtime, NEW.pass_acc, 1);
+END;
+
+CREATE TRIGGER totals_stat_update
+AFTER UPDATE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(OLD.match_id, OLD.player_id, OLD.goal, OLD.assist,
+                                 OLD.playtime, OLD.pass_acc, -1);
+    CALL ApplyStatToPlayerTotals(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist,
+                                 NEW.playtime, NEW.pass_acc, 1);
+END;
+
+CREATE TRIGGER totals_stat_delete
+AFTER DELETE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(OLD.match_id, OLD.player_id, OLD.goal, OLD.assist,
+                                 OLD.playtime, OLD.pass_acc, -1);
+END;
+
+-- Transfers and nationality changes move the player's totals to the new filter values
+CREATE TRIGGER totals_player_update
+AFTER UPDATE ON Players
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.team_id <=> OLD.team_id) OR NOT (NEW.player_nationality_id <=> OLD.player_nationality_id) THEN
+        UPDATE PlayerSeasonTotals
+        SET team_id = NEW.team_id,
+            league_id = (SELECT league_id FROM Teams WHERE team_id = NEW.team_id),
+            nationality_id = NEW.player_nationality_id
+        WHERE player_id = NEW.player_id;
+    END IF;
+END;
+
+
+-- Backfill from the existing Statistics rows
+CALL RebuildPlayerSeasonTotals();
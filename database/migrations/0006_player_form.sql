@@ -0,0 +1,153 @@
+-- Each player's appearances in career order with running totals of their stats.
+-- A rolling average over any window N is then (cum[i] - cum[i - N]) / min(i, N): two
+-- primary key lookups per row, whatever the length of the career.
+-- appearance_no is the 1-based position of the match, ordered by (date, match_id).
+CREATE TABLE PlayerForm(
+    player_id INT NOT NULL,
+    appearance_no INT NOT NULL,
+    match_id INT NOT NULL,
+    date DATE NOT NULL,
+    goal INT NOT NULL,
+    assist INT NOT NULL,
+    pass_acc DECIMAL(5, 2) NOT NULL,
+    playtime INT NOT NULL,
+    cum_goals INT NOT NULL,
+    cum_assists INT NOT NULL,
+    cum_pass_acc DECIMAL(12, 2) NOT NULL,
+    cum_playtime INT NOT NULL,
+    PRIMARY KEY (player_id, appearance_no),
+    UNIQUE KEY uq_playerform_match (player_id, match_id),
+    FOREIGN KEY (player_id) REFERENCES Players(player_id) ON DELETE CASCADE,
+    FOREIGN KEY (match_id) REFERENCES Matches(match_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_playerform_date ON PlayerForm(player_id, date, match_id);
+
+
+-- Insert one appearance. New matches normally land at the end of the career (O(1));
+-- a match that arrives out of date order shifts the later appearances by one.
+CREATE PROCEDURE AddPlayerFormEntry(
+    IN match_ref INT,
+    IN player_ref INT,
+    IN stat_goal INT,
+    IN stat_assist INT,
+    IN stat_pass_acc DECIMAL(5, 2),
+    IN stat_playtime INT
+)
+BEGIN
+    DECLARE match_date DATE;
+    DECLARE previous_no INT DEFAULT 0;
+    DECLARE previous_goals INT DEFAULT 0;
+    DECLARE previous_assists INT DEFAULT 0;
+    DECLARE previous_pass_acc DECIMAL(12, 2) DEFAULT 0;
+    DECLARE previous_playtime INT DEFAULT 0;
+
+    SELECT date INTO match_date FROM Matches WHERE match_id = match_ref;
+
+    -- The appearance right before this match (index seek on player_id, date, match_id)
+    SELECT appearance_no, cum_goals, cum_assists, cum_pass_acc, cum_playtime
+    INTO previous_no, previous_goals, previous_assists, previous_pass_acc, previous_playtime
+    FROM PlayerForm
+    WHERE player_id = player_ref
+      AND (date < match_date OR (date = match_date AND match_id < match_ref))
+    ORDER BY date DESC, match_id DESC
+    LIMIT 1;
+
+    UPDATE PlayerForm
+    SET appearance_no = appearance_no + 1,
+        cum_goals = cum_goals + stat_goal,
+        cum_assists = cum_assists + stat_assist,
+        cum_pass_acc = cum_pass_acc + stat_pass_acc,
+        cum_playtime = cum_playtime + stat_playtime
+    WHERE player_id = player_ref AND appearance_no > previous_no
+    ORDER BY appearance_no DESC;
+
+    INSERT INTO PlayerForm(player_id, appearance_no, match_id, date, goal, assist, pass_acc, playtime,
+                           cum_goals, cum_assists, cum_pass_acc, cum_playtime)
+    VALUES (player_ref, previous_no + 1, match_ref, match_date, stat_goal, stat_assist, stat_pass_acc, stat_playtime,
+            previous_goals + stat_goal, previous_assists + stat_assist,
+            previous_pass_acc + stat_pass_acc, previous_playtime + stat_playtime);
+END;
+
+
+-- Remove one appearance and close the gap behind it
+CREATE PROCEDURE RemovePlayerFormEntry(
+    IN match_ref INT,
+    IN player_ref INT
+)
+BEGIN
+    DECLARE removed_no INT DEFAULT NULL;
+    DECLARE removed_goal INT;
+    DECLARE removed_assist INT;
+    DECLARE removed_pass_acc DECIMAL(5, 2);
+    DECLARE removed_playtime INT;
+
+    SELECT appearance_no, goal, assist, pass_acc, playtime
+    INTO removed_no, removed_goal, removed_assist, removed_pass_acc, removed_playtime
+    FROM PlayerForm
+    WHERE player_id = player_ref AND match_id = match_ref;
+
+    IF removed_no IS NOT NULL THEN
+        DELETE FROM PlayerForm WHERE player_id = player_ref AND appearance_no = removed_no;
+
+        UPDATE PlayerForm
+        SET appearance_no = appearance_no - 1,
+            cum_goals = cum_goals - removed_goal,
+            cum_assists = cum_assists - removed_assist,
+            cum_pass_acc = cum_pass_acc - removed_pass_acc,
+            cum_playtime = cum_playtime - removed_playtime
+        WHERE player_id = player_ref AND appearance_no > removed_no
+        ORDER BY appearance_no ASC;
+    END IF;
+END;
+
+
+-- Recompute PlayerForm from scratch out of Statistics
+CREATE PROCEDURE RebuildPlayerForm()
+BEGIN
+    START TRANSACTION;
+        DELETE FROM PlayerForm;
+
+        INSERT INTO PlayerForm(player_id, appearance_no, match_id, date, goal, assist, pass_acc, playtime,
+                               cum_goals, cum_assists, cum_pass_acc, cum_playtime)
+        SELECT s.player_id,
+               ROW_NUMBER() OVER career,
+               s.match_id, m.date, s.goal, s.assist, s.pass_acc, s.playtime,
+               SUM(s.goal) OVER career,
+               SUM(s.assist) OVER career,
+               SUM(s.pass_acc) OVER career,
+               SUM(s.playtime) OVER career
+        FROM Statistics s
+        JOIN Matches m ON s.match_id = m.match_id
+        WINDOW career AS (PARTITION BY s.player_id ORDER BY m.date, s.match_id
+                          ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW);
+    COMMIT;
+END;
+
+
+-- Triggers: Keep PlayerForm in sync with every change to Statistics
+CREATE TRIGGER form_stat_insert
+AFTER INSERT ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL AddPlayerFormEntry(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist, NEW.pass_acc, NEW.playtime);
+END;
+
+CREATE TRIGGER form_stat_update
+AFTER UPDATE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL RemovePlayerFormEntry(OLD.match_id, OLD.player_id);
+    CALL AddPlayerFormEntry(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist, NEW.pass_acc, NEW.playtime);
+END;
+
+CREATE TRIGGER form_stat_delete
+AFTER DELETE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL RemovePlayerFormEntry(OLD.match_id, OLD.player_id);
+END;
+
+
+-- Backfill from the existing Statistics rows
+CALL RebuildPlayerForm();
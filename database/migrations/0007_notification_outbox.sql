@@ -0,0 +1,68 @@
+-- Notifications are no longer fanned out inside the Matches insert. Writes only append a
+-- row to NotificationOutbox; the API's notification worker (backend/routes/notifications.py)
+-- turns outbox rows into per-follower Notifications in batches.
+DROP TRIGGER IF EXISTS notify_match_insert;
+DROP EVENT IF EXISTS daily_player_milestone_event;
+
+-- kind = 'match': entity_id is the match_id
+-- kind = 'goal_milestone': entity_id is the player_id, season/milestone the goal total reached
+CREATE TABLE NotificationOutbox(
+    outbox_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    kind VARCHAR(32) NOT NULL,
+    entity_id INT NOT NULL,
+    season INT NOT NULL DEFAULT 0,
+    milestone INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
+    processed_at TIMESTAMP(3) NULL
+);
+
+CREATE INDEX idx_outbox_pending ON NotificationOutbox(processed_at, outbox_id);
+
+-- Structured dedupe key: one notification per (user, kind, entity, season, milestone).
+-- Rows written before this migration keep NULL keys and are not deduplicated.
+ALTER TABLE Notifications
+    ADD COLUMN kind VARCHAR(32) NULL,
+    ADD COLUMN entity_id INT NULL,
+    ADD COLUMN season INT NOT NULL DEFAULT 0,
+    ADD COLUMN milestone INT NOT NULL DEFAULT 0,
+    ADD UNIQUE KEY uq_notifications_dedupe (user_id, kind, entity_id, season, milestone);
+
+
+-- Trigger: Queue a notification event for every new match (one row, whatever the number of fans)
+CREATE TRIGGER outbox_match_insert
+AFTER INSERT ON Matches
+FOR EACH ROW
+BEGIN
+    INSERT INTO NotificationOutbox(kind, entity_id) VALUES ('match', NEW.match_id);
+END;
+
+
+-- Triggers: Queue goal milestones (10, 20, 30 goals in a season) the moment a player's
+-- PlayerSeasonTotals row crosses them, instead of re-summing Statistics every day
+CREATE TRIGGER outbox_totals_insert
+AFTER INSERT ON PlayerSeasonTotals
+FOR EACH ROW
+BEGIN
+    INSERT INTO NotificationOutbox(kind, entity_id, season, milestone)
+    SELECT 'goal_milestone', NEW.player_id, NEW.season, milestone
+    FROM (SELECT 10 AS milestone UNION ALL SELECT 20 UNION ALL SELECT 30) AS milestones
+    WHERE NEW.goals >= milestone;
+END;
+
+CREATE TRIGGER outbox_totals_update
+AFTER UPDATE ON PlayerSeasonTotals
+FOR EACH ROW
+BEGIN
+    INSERT INTO NotificationOutbox(kind, entity_id, season, milestone)
+    SELECT 'goal_milestone', NEW.player_id, NEW.season, milestone
+    FROM (SELECT 10 AS milestone UNION ALL SELECT 20 UNION ALL SELECT 30) AS milestones
+    WHERE OLD.goals < milestone AND NEW.goals >= milestone;
+END;
+
+
+-- Event: Drop processed outbox rows after a day
+CREATE EVENT cleanup_notification_outbox
+ON SCHEDULE EVERY 1 DAY
+DO
+DELETE FROM NotificationOutbox
+WHERE processed_at < NOW() - INTERVAL 1 DAY;
@@ -0,0 +1,11 @@
+-- Score corrections and live score updates are queued for the live push channel
+-- (the notification worker publishes 'score' events to both teams and the league;
+-- they create no Notifications rows).
+CREATE TRIGGER outbox_match_score
+AFTER UPDATE ON Matches
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.hometeam_score <=> OLD.hometeam_score) OR NOT (NEW.awayteam_score <=> OLD.awayteam_score) THEN
+        INSERT INTO NotificationOutbox(kind, entity_id) VALUES ('score', NEW.match_id);
+    END IF;
+END;
@@ -0,0 +1,277 @@
+-- Matches and Statistics are partitioned by season: RANGE COLUMNS on the match date, one
+-- partition per season starting July 1st (the TeamStandings season rule) plus a catch-all
+-- pmax. Reads bounded by date or season only open the partitions they need, and whole
+-- seasons can be archived by dropping a partition (database/partitions.py).
+--
+-- MySQL partitioning rules shape the rest of this migration:
+--   - every unique key must contain the partitioning column: the primary keys become
+--     Matches(match_id, date) and Statistics(match_id, player_id, match_date)
+--   - partitioned InnoDB tables can have no foreign keys, in either direction: the keys
+--     from and to Matches/Statistics are replaced by the triggers at the end
+-- Statistics gets match_date, a copy of its match's date set by trigger, so it is
+-- partitioned (and pruned) on the same boundaries as Matches.
+
+
+-- Partition `table_name` on `column_name`: p<season> holds dates before July 1st of
+-- season + 1 (p<first_season> also takes everything older), pmax everything after last_season
+CREATE PROCEDURE PartitionBySeason(
+    IN table_name VARCHAR(64),
+    IN column_name VARCHAR(64),
+    IN first_season INT,
+    IN last_season INT
+)
+BEGIN
+    DECLARE next_season INT DEFAULT first_season;
+    DECLARE definitions TEXT DEFAULT '';
+
+    WHILE next_season <= last_season DO
+        SET definitions = CONCAT(definitions, 'PARTITION p', next_season,
+                                 ' VALUES LESS THAN (''', next_season + 1, '-07-01''), ');
+        SET next_season = next_season + 1;
+    END WHILE;
+
+    SET @partition_sql = CONCAT('ALTER TABLE ', table_name, ' PARTITION BY RANGE COLUMNS(', column_name, ') (',
+                                definitions, 'PARTITION pmax VALUES LESS THAN (MAXVALUE))');
+    PREPARE partition_statement FROM @partition_sql;
+    EXECUTE partition_statement;
+    DEALLOCATE PREPARE partition_statement;
+END;
+
+-- From the oldest season on record through next season
+SELECT COALESCE(MIN(YEAR(date) - (MONTH(date) < 7)), YEAR(CURDATE()) - (MONTH(CURDATE()) < 7)),
+       GREATEST(COALESCE(MAX(YEAR(date) - (MONTH(date) < 7)), 0), YEAR(CURDATE()) - (MONTH(CURDATE()) < 7) + 1)
+INTO @first_season, @last_season
+FROM Matches;
+
+
+-- Statistics is rebuilt rather than altered: filling match_date with an UPDATE would run
+-- the PlayerSeasonTotals/PlayerForm triggers once per row
+CREATE TABLE StatisticsPartitioned(
+    match_id INT NOT NULL,
+    player_id INT NOT NULL,
+    match_date DATE NOT NULL,
+    goal INT NOT NULL DEFAULT 0,
+    pass_acc DECIMAL (5, 2) NOT NULL DEFAULT 0,
+    assist INT NOT NULL DEFAULT 0,
+    playtime INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (match_id, player_id, match_date),
+    CHECK (goal >= 0),
+    CHECK (assist >= 0),
+    CHECK (playtime >= 0),
+    CHECK (pass_acc BETWEEN 0 AND 100)
+);
+
+-- Same covering index as 0004, with the date so per-player windows seek inside a partition
+CREATE INDEX idx_statistics_player ON StatisticsPartitioned(player_id, match_date, goal, assist, playtime, pass_acc);
+
+CALL PartitionBySeason('StatisticsPartitioned', 'match_date', @first_season, @last_season);
+
+INSERT INTO StatisticsPartitioned(match_id, player_id, match_date, goal, pass_acc, assist, playtime)
+SELECT s.match_id, s.player_id, m.date, s.goal, s.pass_acc, s.assist, s.playtime
+FROM Statistics s
+JOIN Matches m ON s.match_id = m.match_id;
+
+-- Drops the 0005/0006 Statistics triggers with the table, recreated below
+DROP TABLE Statistics;
+RENAME TABLE StatisticsPartitioned TO Statistics;
+
+
+-- Matches: foreign keys to Teams/Leagues (default InnoDB names, 0001 declaration order)
+-- and from PlayerForm go, match_id alone is no longer unique at the key level
+ALTER TABLE PlayerForm DROP FOREIGN KEY PlayerForm_ibfk_2;
+ALTER TABLE Matches
+    DROP FOREIGN KEY Matches_ibfk_1,
+    DROP FOREIGN KEY Matches_ibfk_2,
+    DROP FOREIGN KEY Matches_ibfk_3;
+ALTER TABLE Matches DROP PRIMARY KEY, ADD PRIMARY KEY (match_id, date);
+
+CALL PartitionBySeason('Matches', 'date', @first_season, @last_season);
+
+
+-- Archived seasons (database/partitions.py archive) are moved here, compressed and unpartitioned.
+-- Their TeamStandings, PlayerSeasonTotals and PlayerForm rows stay in place.
+CREATE TABLE MatchesArchive(
+    match_id INT PRIMARY KEY,
+    date DATE NOT NULL,
+    match_location VARCHAR(255) NOT NULL,
+    hometeam_score INT DEFAULT 0,
+    awayteam_score INT DEFAULT 0,
+    hometeam_id INT NOT NULL,
+    awayteam_id INT NOT NULL,
+    league_id INT NOT NULL,
+    INDEX idx_matchesarchive_date (date, match_id)
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+
+CREATE TABLE StatisticsArchive(
+    match_id INT NOT NULL,
+    player_id INT NOT NULL,
+    match_date DATE NOT NULL,
+    goal INT NOT NULL DEFAULT 0,
+    pass_acc DECIMAL (5, 2) NOT NULL DEFAULT 0,
+    assist INT NOT NULL DEFAULT 0,
+    playtime INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (match_id, player_id),
+    INDEX idx_statisticsarchive_player (player_id, match_date)
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+
+
+-- Triggers: Keep PlayerSeasonTotals and PlayerForm in sync with Statistics (as in 0005/0006)
+CREATE TRIGGER totals_stat_insert
+AFTER INSERT ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist,
+                                 NEW.playtime, NEW.pass_acc, 1);
+END;
+
+CREATE TRIGGER totals_stat_update
+AFTER UPDATE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(OLD.match_id, OLD.player_id, OLD.goal, OLD.assist,
+                                 OLD.playtime, OLD.pass_acc, -1);
+    CALL ApplyStatToPlayerTotals(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist,
+                                 NEW.playtime, NEW.pass_acc, 1);
+END;
+
+CREATE TRIGGER totals_stat_delete
+AFTER DELETE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(OLD.match_id, OLD.player_id, OLD.goal, OLD.assist,
+                                 OLD.playtime, OLD.pass_acc, -1);
+END;
+
+CREATE TRIGGER form_stat_insert
+AFTER INSERT ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL AddPlayerFormEntry(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist, NEW.pass_acc, NEW.playtime);
+END;
+
+CREATE TRIGGER form_stat_update
+AFTER UPDATE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL RemovePlayerFormEntry(OLD.match_id, OLD.player_id);
+    CALL AddPlayerFormEntry(NEW.match_id, NEW.player_id, NEW.goal, NEW.assist, NEW.pass_acc, NEW.playtime);
+END;
+
+CREATE TRIGGER form_stat_delete
+AFTER DELETE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL RemovePlayerFormEntry(OLD.match_id, OLD.player_id);
+END;
+
+
+-- Triggers: Stand-ins for the foreign keys. SQLSTATE 23000 is what a foreign key or
+-- duplicate key violation reports, so callers see the same IntegrityError as before.
+CREATE TRIGGER stat_check_insert
+BEFORE INSERT ON Statistics
+FOR EACH ROW
+BEGIN
+    SET NEW.match_date = (SELECT date FROM Matches WHERE match_id = NEW.match_id);
+    IF NEW.match_date IS NULL THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Statistics references an unknown match';
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM Players WHERE player_id = NEW.player_id) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Statistics references an unknown player';
+    END IF;
+END;
+
+CREATE TRIGGER stat_check_update
+BEFORE UPDATE ON Statistics
+FOR EACH ROW
+BEGIN
+    IF NEW.match_id <> OLD.match_id THEN
+        SET NEW.match_date = (SELECT date FROM Matches WHERE match_id = NEW.match_id);
+        IF NEW.match_date IS NULL THEN
+            SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Statistics references an unknown match';
+        END IF;
+    END IF;
+    IF NEW.player_id <> OLD.player_id AND NOT EXISTS (SELECT 1 FROM Players WHERE player_id = NEW.player_id) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Statistics references an unknown player';
+    END IF;
+END;
+
+CREATE TRIGGER matches_check_insert
+BEFORE INSERT ON Matches
+FOR EACH ROW
+BEGIN
+    -- The same (match_id, date) is left to the primary key (and ON DUPLICATE KEY UPDATE reloads)
+    IF EXISTS (SELECT 1 FROM Matches WHERE match_id = NEW.match_id AND date <> NEW.date) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Duplicate match_id';
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM Leagues WHERE league_id = NEW.league_id)
+       OR NOT EXISTS (SELECT 1 FROM Teams WHERE team_id = NEW.hometeam_id)
+       OR NOT EXISTS (SELECT 1 FROM Teams WHERE team_id = NEW.awayteam_id) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Matches references an unknown team or league';
+    END IF;
+END;
+
+CREATE TRIGGER matches_check_update
+BEFORE UPDATE ON Matches
+FOR EACH ROW
+BEGIN
+    IF NEW.match_id <> OLD.match_id THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'match_id cannot be changed';
+    END IF;
+    IF (NEW.league_id <> OLD.league_id AND NOT EXISTS (SELECT 1 FROM Leagues WHERE league_id = NEW.league_id))
+       OR (NEW.hometeam_id <> OLD.hometeam_id AND NOT EXISTS (SELECT 1 FROM Teams WHERE team_id = NEW.hometeam_id))
+       OR (NEW.awayteam_id <> OLD.awayteam_id AND NOT EXISTS (SELECT 1 FROM Teams WHERE team_id = NEW.awayteam_id)) THEN
+        SIGNAL SQLSTATE '23000' SET MESSAGE_TEXT = 'Matches references an unknown team or league';
+    END IF;
+END;
+
+-- A rescheduled match moves its Statistics rows to the new date (and partition)
+CREATE TRIGGER matches_move_stats
+AFTER UPDATE ON Matches
+FOR EACH ROW
+BEGIN
+    IF NEW.date <> OLD.date THEN
+        UPDATE Statistics SET match_date = NEW.date
+        WHERE match_id = NEW.match_id AND match_date = OLD.date;
+    END IF;
+END;
+
+-- ON DELETE CASCADE replacements. These run BEFORE the delete, while the match and player
+-- rows the PlayerSeasonTotals triggers look up still exist, and unlike a cascade they
+-- fire the Statistics triggers, so the summary tables stay correct.
+CREATE TRIGGER matches_cascade_delete
+BEFORE DELETE ON Matches
+FOR EACH ROW
+BEGIN
+    DELETE FROM Statistics WHERE match_id = OLD.match_id AND match_date = OLD.date;
+END;
+
+CREATE TRIGGER players_cascade_delete
+BEFORE DELETE ON Players
+FOR EACH ROW
+BEGIN
+    DELETE FROM Statistics WHERE player_id = OLD.player_id;
+END;
+
+-- Teams and Leagues cascade to Players by foreign key, which fires no trigger on Players
+CREATE TRIGGER teams_cascade_delete
+BEFORE DELETE ON Teams
+FOR EACH ROW
+BEGIN
+    DELETE FROM Matches WHERE hometeam_id = OLD.team_id OR awayteam_id = OLD.team_id;
+    DELETE s FROM Statistics s JOIN Players p ON s.player_id = p.player_id
+    WHERE p.team_id = OLD.team_id;
+END;
+
+CREATE TRIGGER leagues_cascade_delete
+BEFORE DELETE ON Leagues
+FOR EACH ROW
+BEGIN
+    DELETE m FROM Matches m
+    LEFT JOIN Teams home ON m.hometeam_id = home.team_id
+    LEFT JOIN Teams away ON m.awayteam_id = away.team_id
+    WHERE m.league_id = OLD.league_id OR home.league_id = OLD.league_id OR away.league_id = OLD.league_id;
+    DELETE s FROM Statistics s
+    JOIN Players p ON s.player_id = p.player_id
+    JOIN Teams t ON p.team_id = t.team_id
+    WHERE t.league_id = OLD.league_id;
+END;
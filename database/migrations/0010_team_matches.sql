@@ -0,0 +1,96 @@
+-- Every match twice, once from each team's side: the per-team match index behind /teams/h2h
+-- and /teams/form. Rows are clustered by (team_id, date, match_id), so a team's last k
+-- results are a backward range scan of k rows; the secondary indexes give the same for
+-- one opponent (head-to-head) and for home or away matches only.
+CREATE TABLE TeamMatches(
+    team_id INT NOT NULL,
+    date DATE NOT NULL,
+    match_id INT NOT NULL,
+    opponent_id INT NOT NULL,
+    league_id INT NOT NULL,
+    is_home TINYINT(1) NOT NULL,
+    goals_for INT NOT NULL,
+    goals_against INT NOT NULL,
+    result CHAR(1) AS (CASE WHEN goals_for > goals_against THEN 'W'
+                            WHEN goals_for < goals_against THEN 'L' ELSE 'D' END) STORED,
+    PRIMARY KEY (team_id, date, match_id),
+    FOREIGN KEY (team_id) REFERENCES Teams(team_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_teammatches_opponent ON TeamMatches(team_id, opponent_id, date, match_id);
+CREATE INDEX idx_teammatches_venue ON TeamMatches(team_id, is_home, date, match_id);
+
+
+-- Insert both sides of one match (a reloaded match overwrites its rows)
+CREATE PROCEDURE AddMatchToTeamMatches(
+    IN match_ref INT,
+    IN match_date DATE,
+    IN league INT,
+    IN home_team INT,
+    IN away_team INT,
+    IN home_score INT,
+    IN away_score INT
+)
+BEGIN
+    INSERT INTO TeamMatches(team_id, date, match_id, opponent_id, league_id, is_home, goals_for, goals_against)
+    VALUES
+        (home_team, match_date, match_ref, away_team, league, 1, IFNULL(home_score, 0), IFNULL(away_score, 0)),
+        (away_team, match_date, match_ref, home_team, league, 0, IFNULL(away_score, 0), IFNULL(home_score, 0))
+    ON DUPLICATE KEY UPDATE
+        opponent_id = VALUES(opponent_id),
+        league_id = VALUES(league_id),
+        is_home = VALUES(is_home),
+        goals_for = VALUES(goals_for),
+        goals_against = VALUES(goals_against);
+END;
+
+
+-- Recompute TeamMatches from scratch out of the Matches table
+CREATE PROCEDURE RebuildTeamMatches()
+BEGIN
+    START TRANSACTION;
+        DELETE FROM TeamMatches;
+
+        INSERT INTO TeamMatches(team_id, date, match_id, opponent_id, league_id, is_home, goals_for, goals_against)
+        SELECT hometeam_id, date, match_id, awayteam_id, league_id, 1,
+               IFNULL(hometeam_score, 0), IFNULL(awayteam_score, 0)
+        FROM Matches
+        UNION ALL
+        SELECT awayteam_id, date, match_id, hometeam_id, league_id, 0,
+               IFNULL(awayteam_score, 0), IFNULL(hometeam_score, 0)
+        FROM Matches;
+    COMMIT;
+END;
+
+
+-- Triggers: Keep TeamMatches in sync with every change to Matches
+CREATE TRIGGER team_matches_insert
+AFTER INSERT ON Matches
+FOR EACH ROW
+BEGIN
+    CALL AddMatchToTeamMatches(NEW.match_id, NEW.date, NEW.league_id, NEW.hometeam_id, NEW.awayteam_id,
+                               NEW.hometeam_score, NEW.awayteam_score);
+END;
+
+CREATE TRIGGER team_matches_update
+AFTER UPDATE ON Matches
+FOR EACH ROW
+BEGIN
+    -- Teams or date may have changed: remove the old sides before adding the new ones
+    DELETE FROM TeamMatches
+    WHERE team_id IN (OLD.hometeam_id, OLD.awayteam_id) AND date = OLD.date AND match_id = OLD.match_id;
+    CALL AddMatchToTeamMatches(NEW.match_id, NEW.date, NEW.league_id, NEW.hometeam_id, NEW.awayteam_id,
+                               NEW.hometeam_score, NEW.awayteam_score);
+END;
+
+CREATE TRIGGER team_matches_delete
+AFTER DELETE ON Matches
+FOR EACH ROW
+BEGIN
+    DELETE FROM TeamMatches
+    WHERE team_id IN (OLD.hometeam_id, OLD.awayteam_id) AND date = OLD.date AND match_id = OLD.match_id;
+END;
+
+
+-- Backfill from the existing Matches rows
+CALL RebuildTeamMatches();
@@ -0,0 +1,79 @@
+-- PlayerSeasonTotals: take the season from Statistics.match_date (added in 0009) instead of
+-- looking the match up. When a match is rescheduled, matches_move_stats rewrites match_date
+-- and the Statistics update trigger retracts the row from its old season and applies it to
+-- the new one; the lookup found the already updated Matches date for both, so a match moved
+-- across the July season boundary kept its goals, assists and minutes in the old season.
+DROP TRIGGER IF EXISTS totals_stat_insert;
+DROP TRIGGER IF EXISTS totals_stat_update;
+DROP TRIGGER IF EXISTS totals_stat_delete;
+DROP PROCEDURE IF EXISTS ApplyStatToPlayerTotals;
+
+
+-- Apply (direction = 1) or retract (direction = -1) one Statistics row
+CREATE PROCEDURE ApplyStatToPlayerTotals(
+    IN stat_date DATE,
+    IN player_ref INT,
+    IN stat_goal INT,
+    IN stat_assist INT,
+    IN stat_playtime INT,
+    IN stat_pass_acc DECIMAL(5, 2),
+    IN direction INT
+)
+BEGIN
+    DECLARE player_team INT;
+    DECLARE player_league INT;
+    DECLARE player_nationality INT;
+    -- Same season rule as TeamStandings: seasons start in July
+    DECLARE stat_season INT DEFAULT YEAR(stat_date) - (MONTH(stat_date) < 7);
+
+    SELECT p.team_id, t.league_id, p.player_nationality_id
+    INTO player_team, player_league, player_nationality
+    FROM Players p JOIN Teams t ON p.team_id = t.team_id
+    WHERE p.player_id = player_ref;
+
+    INSERT INTO PlayerSeasonTotals(player_id, season, team_id, league_id, nationality_id,
+                                   appearances, goals, assists, minutes, pass_acc_total)
+    VALUES (player_ref, stat_season, player_team, player_league, player_nationality,
+            direction, direction * stat_goal, direction * stat_assist, direction * stat_playtime, direction * stat_pass_acc)
+    ON DUPLICATE KEY UPDATE
+        team_id = VALUES(team_id),
+        league_id = VALUES(league_id),
+        nationality_id = VALUES(nationality_id),
+        appearances = appearances + VALUES(appearances),
+        goals = goals + VALUES(goals),
+        assists = assists + VALUES(assists),
+        minutes = minutes + VALUES(minutes),
+        pass_acc_total = pass_acc_total + VALUES(pass_acc_total);
+END;
+
+
+-- Triggers: Keep PlayerSeasonTotals in sync with every change to Statistics
+CREATE TRIGGER totals_stat_insert
+AFTER INSERT ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(NEW.match_date, NEW.player_id, NEW.goal, NEW.assist,
+                                 NEW.playtime, NEW.pass_acc, 1);
+END;
+
+CREATE TRIGGER totals_stat_update
+AFTER UPDATE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(OLD.match_date, OLD.player_id, OLD.goal, OLD.assist,
+                                 OLD.playtime, OLD.pass_acc, -1);
+    CALL ApplyStatToPlayerTotals(NEW.match_date, NEW.player_id, NEW.goal, NEW.assist,
+                                 NEW.playtime, NEW.pass_acc, 1);
+END;
+
+CREATE TRIGGER totals_stat_delete
+AFTER DELETE ON Statistics
+FOR EACH ROW
+BEGIN
+    CALL ApplyStatToPlayerTotals(OLD.match_date, OLD.player_id, OLD.goal, OLD.assist,
+                                 OLD.playtime, OLD.pass_acc, -1);
+END;
+
+
+-- Repair totals left in the wrong season by earlier reschedules
+CALL RebuildPlayerSeasonTotals();
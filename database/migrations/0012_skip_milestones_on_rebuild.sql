@@ -0,0 +1,64 @@
+-- RebuildPlayerSeasonTotals deletes and re-inserts every PlayerSeasonTotals row, so the
+-- outbox triggers from 0007 queued a goal milestone for every past player-season on each
+-- rebuild (migrations, rebuild_aggregates.py). Once cleanup_old_notifications has dropped
+-- the old notifications the dedupe key no longer catches them and fans are notified again.
+-- The rebuild now sets @rebuilding_totals for its session and both triggers skip while it is set.
+DROP TRIGGER IF EXISTS outbox_totals_insert;
+DROP TRIGGER IF EXISTS outbox_totals_update;
+DROP PROCEDURE IF EXISTS RebuildPlayerSeasonTotals;
+
+
+-- Recompute PlayerSeasonTotals from scratch out of Statistics (no milestone notifications)
+CREATE PROCEDURE RebuildPlayerSeasonTotals()
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        SET @rebuilding_totals = NULL;
+        RESIGNAL;
+    END;
+
+    SET @rebuilding_totals = 1;
+    START TRANSACTION;
+        DELETE FROM PlayerSeasonTotals;
+
+        INSERT INTO PlayerSeasonTotals(player_id, season, team_id, league_id, nationality_id,
+                                       appearances, goals, assists, minutes, pass_acc_total)
+        SELECT s.player_id, YEAR(m.date) - (MONTH(m.date) < 7) AS season,
+               p.team_id, t.league_id, p.player_nationality_id,
+               COUNT(*), SUM(s.goal), SUM(s.assist), SUM(s.playtime), SUM(s.pass_acc)
+        FROM Statistics s
+        JOIN Matches m ON s.match_id = m.match_id
+        JOIN Players p ON s.player_id = p.player_id
+        JOIN Teams t ON p.team_id = t.team_id
+        GROUP BY s.player_id, season, p.team_id, t.league_id, p.player_nationality_id;
+    COMMIT;
+    SET @rebuilding_totals = NULL;
+END;
+
+
+-- Triggers: Queue goal milestones (10, 20, 30 goals in a season) the moment a player's
+-- PlayerSeasonTotals row crosses them, except while the table is being rebuilt
+CREATE TRIGGER outbox_totals_insert
+AFTER INSERT ON PlayerSeasonTotals
+FOR EACH ROW
+BEGIN
+    IF @rebuilding_totals IS NULL THEN
+        INSERT INTO NotificationOutbox(kind, entity_id, season, milestone)
+        SELECT 'goal_milestone', NEW.player_id, NEW.season, milestone
+        FROM (SELECT 10 AS milestone UNION ALL SELECT 20 UNION ALL SELECT 30) AS milestones
+        WHERE NEW.goals >= milestone;
+    END IF;
+END;
+
+CREATE TRIGGER outbox_totals_update
+AFTER UPDATE ON PlayerSeasonTotals
+FOR EACH ROW
+BEGIN
+    IF @rebuilding_totals IS NULL THEN
+        INSERT INTO NotificationOutbox(kind, entity_id, season, milestone)
+        SELECT 'goal_milestone', NEW.player_id, NEW.season, milestone
+        FROM (SELECT 10 AS milestone UNION ALL SELECT 20 UNION ALL SELECT 30) AS milestones
+        WHERE OLD.goals < milestone AND NEW.goals >= milestone;
+    END IF;
+END;
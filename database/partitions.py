@@ -0,0 +1,156 @@
+import argparse
+import os
+from datetime import date
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Season partition maintenance for Matches and Statistics (migrations/0009_season_partitions.sql).
+# Partition p<season> holds the dates before July 1st of season + 1, the lowest one also
+# everything older, and pmax everything after the newest season.
+#   python partitions.py status                 # partitions with approximate rows and size
+#   python partitions.py add --ahead 2          # one partition per season, oldest stored through current + 2
+#   python partitions.py archive --before 2015  # move seasons before 2015 to the compressed archive tables
+# Every statement is printed before it runs; --dry-run only prints them.
+#
+# Archiving drops the partitions without firing triggers, so TeamStandings, PlayerSeasonTotals,
+# PlayerForm and TeamMatches keep the archived seasons. rebuild_aggregates.py recomputes them
+# from the live partitions only: run it after archiving only if the archived seasons should go too.
+
+# table -> (partitioning date column, archive table, columns copied to the archive)
+PARTITIONED = {
+    "Statistics": ("match_date", "StatisticsArchive",
+                   ["match_id", "player_id", "match_date", "goal", "pass_acc", "assist", "playtime"]),
+    "Matches": ("date", "MatchesArchive",
+                ["match_id", "date", "match_location", "hometeam_score", "awayteam_score",
+                 "hometeam_id", "awayteam_id", "league_id"]),
+}
+
+
+def season_of(day):
+    # Same season rule as TeamStandings: seasons start in July
+    return day.year - (day.month < 7)
+
+
+def partition_definition(season):
+    return f"PARTITION p{season} VALUES LESS THAN ('{season + 1}-07-01')"
+
+
+def list_partitions(cursor, table):
+    """[(name, season or None for pmax, approximate rows, bytes)] in partition order."""
+    cursor.execute("""SELECT PARTITION_NAME, TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH
+                      FROM INFORMATION_SCHEMA.PARTITIONS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+                      ORDER BY PARTITION_ORDINAL_POSITION""", (table,))
+    return [(name, int(name[1:]) if name != "pmax" else None, rows, size)
+            for name, rows, size in cursor.fetchall()]
+
+
+def run(cursor, statement, dry_run):
+    print(statement + ";")
+    if not dry_run:
+        cursor.execute(statement)
+
+
+def status(connection):
+    cursor = connection.cursor()
+    for table, (column, archive_table, _) in PARTITIONED.items():
+        partitions = list_partitions(cursor, table)
+        if not partitions:
+            print(f"{table}: not partitioned (apply migration 0009 first)")
+            continue
+        print(f"{table} (by {column})")
+        for name, season, rows, size in partitions:
+            label = f"{season}/{(season + 1) % 100:02d}" if season is not None else "later"
+            print(f"  {name:<8}{label:>10}{rows:>12} rows{size / 1024 / 1024:>10.1f} MB")
+        cursor.execute("""SELECT TABLE_ROWS, DATA_LENGTH + INDEX_LENGTH FROM INFORMATION_SCHEMA.TABLES
+                          WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s""", (archive_table,))
+        archived = cursor.fetchone()
+        if archived:
+            print(f"  {archive_table}: {archived[0]} rows, {archived[1] / 1024 / 1024:.1f} MB")
+    cursor.close()
+
+
+def add(connection, ahead=1, dry_run=False):
+    """Give every season from the oldest stored match through the current season + `ahead` its own partition."""
+    cursor = connection.cursor()
+    current = season_of(date.today())
+    # Statistics dates are copies of Matches dates, and Matches has an index leading on date
+    cursor.execute("SELECT MIN(date) FROM Matches")
+    oldest = cursor.fetchone()[0]
+    oldest = season_of(oldest) if oldest else current
+
+    for table in PARTITIONED:
+        seasons = [season for _, season, _, _ in list_partitions(cursor, table) if season is not None]
+        # The lowest partition holds every older date: split the seasons it covers out of it
+        if seasons and oldest < seasons[0]:
+            definitions = ", ".join(partition_definition(season) for season in range(oldest, seasons[0] + 1))
+            run(cursor, f"ALTER TABLE {table} REORGANIZE PARTITION p{seasons[0]} INTO ({definitions})", dry_run)
+        # Future seasons come out of pmax (normally empty, so this only moves metadata)
+        newest = seasons[-1] if seasons else min(oldest, current) - 1
+        if newest < current + ahead:
+            definitions = ", ".join(partition_definition(season) for season in range(newest + 1, current + ahead + 1))
+            run(cursor, f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO "
+                        f"({definitions}, PARTITION pmax VALUES LESS THAN (MAXVALUE))", dry_run)
+    cursor.close()
+
+
+def archive(connection, before, dry_run=False):
+    """Move every season before `before` to the archive tables, one season at a time."""
+    if before > season_of(date.today()):
+        raise SystemExit("Refusing to archive the current season.")
+    cursor = connection.cursor()
+    partitions = {table: {season for _, season, _, _ in list_partitions(cursor, table)} for table in PARTITIONED}
+    seasons = sorted(season for season in partitions["Matches"] if season is not None and season < before)
+    if not seasons:
+        print(f"No season before {before} left to archive.")
+
+    for season in seasons:
+        # Statistics first, so a failure never leaves statistics without their match
+        for table, (_, archive_table, columns) in PARTITIONED.items():
+            if season not in partitions[table]:
+                continue
+            column_list = ", ".join(columns)
+            # REPLACE makes a re-run after a failed DROP PARTITION harmless
+            run(cursor, f"REPLACE INTO {archive_table} ({column_list}) "
+                        f"SELECT {column_list} FROM {table} PARTITION (p{season})", dry_run)
+            if not dry_run:
+                connection.commit()
+            run(cursor, f"ALTER TABLE {table} DROP PARTITION p{season}", dry_run)
+        print(f"Archived season {season}.")
+    cursor.close()
+
+
+def connect():
+    return mysql.connector.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        database=os.getenv('DB_NAME', 'soccer_app'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Manage the season partitions of Matches and Statistics.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list partitions with approximate rows and size")
+    add_parser = commands.add_parser("add", help="create partitions for stored and upcoming seasons")
+    add_parser.add_argument("--ahead", type=int, default=1, help="seasons after the current one to create (default 1)")
+    add_parser.add_argument("--dry-run", action="store_true", help="print the statements without running them")
+    archive_parser = commands.add_parser("archive", help="move old seasons to MatchesArchive/StatisticsArchive")
+    archive_parser.add_argument("--before", type=int, required=True, help="archive seasons starting before this year")
+    archive_parser.add_argument("--dry-run", action="store_true", help="print the statements without running them")
+    args = parser.parse_args()
+
+    connection = connect()
+    try:
+        if args.command == "status":
+            status(connection)
+        elif args.command == "add":
+            add(connection, args.ahead, args.dry_run)
+        else:
+            archive(connection, args.before, args.dry_run)
+    finally:
+        connection.close()
@@ -0,0 +1,336 @@
+import argparse
+import os
+import shutil
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # pandas' parquet engine
+except ImportError:
+    pyarrow = None
+
+# Production-size synthetic dataset for reproducing performance issues locally.
+# Every table is generated column-wise with NumPy (no per-row Python loops), deterministic
+# for a given --seed, and written as chunked CSV or Parquet files bulk_load.py ingests:
+#   python generateDataset.py --seed 1 --leagues 100 --teams-per-league 20 --seasons 30 \
+#       --players-per-team 25 --users 1000000 --out-dir /tmp/big_data
+#   python ../bulk_load.py --data-dir /tmp/big_data
+#   python ../partitions.py add && python ../rebuild_aggregates.py
+# That is 1.1M matches, 50k players, 24M statistics rows, 1M users and their favorites.
+#
+# Shapes follow real leagues:
+#   - fixtures: a double round robin per league and season (circle method), one round a
+#     week from August, Saturday or Sunday; ids ascend with the date
+#   - scores: Poisson goals from per-team attack/defence strengths, with home advantage
+#   - statistics: line-ups drawn from the squad (regulars play far more often), the side's
+#     goals split over the line-up by position, assists for ~70% of goals, pass accuracy
+#     by position, most starters playing the full 90
+#   - favorites: a Poisson number per user, team and player popularity Zipf-distributed
+# Fixtures after --as-of are left out: the standings triggers count every Matches row as
+# played, so an unplayed 0-0 would show up as a draw.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Squad order: the first eleven are the regulars
+POSITIONS = np.array(['GK', 'DEF', 'DEF', 'DEF', 'DEF', 'MID', 'MID', 'MID', 'FWD', 'FWD', 'FWD'])
+# position -> (weight of scoring a goal, of assisting, mean pass accuracy)
+POSITION_PROFILE = {'GK': (0.02, 0.1, 68.0), 'DEF': (0.7, 1.0, 84.0), 'MID': (2.5, 3.0, 86.0), 'FWD': (5.0, 2.0, 75.0)}
+MATCH_BATCH = 50_000  # matches per statistics batch (fixed, so output does not depend on --chunk-rows)
+
+
+########## Output #################
+class ChunkWriter:
+    """Buffers frames and writes `<name>.part-NNNNN.<format>` files of `chunk_rows` rows."""
+
+    def __init__(self, out_dir, name, fmt, chunk_rows):
+        self.out_dir = out_dir
+        self.name = name
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.parts = 0
+        self.rows = 0
+        self._buffer = []
+        self._buffered = 0
+        for stale in os.listdir(out_dir):
+            if stale.startswith(f"{name}.") and stale.endswith((".csv", ".parquet")):
+                os.remove(os.path.join(out_dir, stale))
+
+    def write(self, frame):
+        self._buffer.append(frame)
+        self._buffered += len(frame)
+        self.rows += len(frame)
+        while self._buffered >= self.chunk_rows:
+            self._flush(self.chunk_rows)
+
+    def close(self):
+        if self._buffered or not self.parts:
+            self._flush(self._buffered)
+        return self.rows
+
+    def _flush(self, rows):
+        frame = pd.concat(self._buffer, ignore_index=True)
+        part, rest = frame.iloc[:rows], frame.iloc[rows:]
+        self._buffer, self._buffered = ([rest], len(rest)) if len(rest) else ([], 0)
+        path = os.path.join(self.out_dir, f"{self.name}.part-{self.parts:05d}.{self.fmt}")
+        if self.fmt == "parquet":
+            part.to_parquet(path, index=False)
+        else:
+            part.to_csv(path, index=False)
+        self.parts += 1
+
+
+########## Reference data and squads #################
+def name_pools():
+    # First and last names of the sample players, combined at random
+    names = pd.read_csv(os.path.join(HERE, 'sample_player.csv'))['playername'].str.split()
+    first = names.str[0].dropna().unique()
+    first = first[pd.Series(first).str.isalpha().to_numpy()]  # no titles or initials ("Mrs.", "J.")
+    last = names[names.str.len() > 1].str[-1].unique()
+    return first, last
+
+
+def generate_clubs(rng, config, country_ids):
+    leagues, teams_per_league = config.leagues, config.teams_per_league
+    league_ids = np.arange(1, leagues + 1)
+    league_frame = pd.DataFrame({
+        'league_id': league_ids,
+        'leaguename': "League " + pd.Series(league_ids).astype(str),
+        'league_nationality_id': rng.choice(country_ids, leagues),
+    })
+    team_ids = np.arange(1, leagues * teams_per_league + 1)
+    team_frame = pd.DataFrame({
+        'team_id': team_ids,
+        'teamname': "Team " + pd.Series(team_ids).astype(str),
+        'league_id': np.repeat(league_ids, teams_per_league),
+    })
+    return league_frame, team_frame
+
+
+def generate_players(rng, config, teams, country_ids, first, last):
+    per_team = config.players_per_team
+    count = len(teams) * per_team
+    # Player ids are contiguous per team: team t owns (t - 1) * per_team + 1 .. t * per_team
+    player_ids = np.arange(1, count + 1)
+    team_ids = np.repeat(teams['team_id'].to_numpy(), per_team)
+    league_country = teams['league_id'].map(config.league_country).to_numpy()
+    # Most players come from the league's country
+    nationality = np.where(rng.random(count) < 0.6, np.repeat(league_country, per_team), rng.choice(country_ids, count))
+    return pd.DataFrame({
+        'player_id': player_ids,
+        'playername': pd.Series(rng.choice(first, count)) + " " + pd.Series(rng.choice(last, count)),
+        'player_nationality_id': nationality,
+        'team_id': team_ids,
+        'age': np.clip(np.rint(rng.normal(26, 4.5, count)), 16, 40).astype(int),
+        'position': np.resize(POSITIONS, per_team)[np.arange(count) % per_team],
+    })
+
+
+########## Fixtures #################
+def round_robin_template(teams):
+    """Double round robin of team indexes 0..teams-1 as flat (round, home, away) arrays, and the round count."""
+    size = teams + teams % 2  # odd leagues get a bye, dropped below
+    order = np.arange(size)
+    home, away = [], []
+    for r in range(size - 1):
+        lineup = np.concatenate(([order[0]], np.roll(order[1:], r)))
+        first, second = lineup[:size // 2], lineup[::-1][:size // 2]
+        # Alternate the fixed team's home and away games
+        if r % 2:
+            first, second = second, first
+        home.append(first)
+        away.append(second)
+    home, away = np.array(home + away), np.array(away + home)
+    round_no = np.arange(len(home))[:, None].repeat(size // 2, axis=1)
+    real = (home < teams) & (away < teams)
+    return round_no[real], home[real], away[real], len(home)
+
+
+def generate_matches(rng, config, teams):
+    leagues, per_league, seasons = config.leagues, config.teams_per_league, config.seasons
+    round_index, home_index, away_index, rounds = round_robin_template(per_league)
+
+    # Broadcast the template over (season, league, fixture)
+    shape = (seasons, leagues, len(home_index))
+    base = (np.arange(leagues) * per_league)[None, :, None]
+    home = np.broadcast_to(home_index + base, shape).ravel()
+    away = np.broadcast_to(away_index + base, shape).ravel()
+    round_no = np.broadcast_to(round_index, shape).ravel()
+    season = np.broadcast_to(np.arange(seasons)[:, None, None], shape).ravel()
+
+    # Weekly rounds from the first weekend of August (closer together when a season has more rounds than weeks)
+    starts = np.array([np.datetime64(f"{s}-08-01") for s in range(config.first_season, config.first_season + seasons)])
+    weekday = (starts.view('int64') + 3) % 7  # 1970-01-01 was a Thursday; 0 = Monday
+    starts = starts + ((5 - weekday) % 7).astype('timedelta64[D]')
+    spacing = max(1, min(7, 280 // rounds))
+    dates = (starts[season] + (round_no * spacing).astype('timedelta64[D]')
+             + rng.integers(0, 2, home.size).astype('timedelta64[D]'))
+
+    # Goals: Poisson around attack / opposing defence, home side slightly favoured
+    attack = rng.lognormal(0, 0.25, len(teams))
+    defence = rng.lognormal(0, 0.2, len(teams))
+    home_goals = rng.poisson(1.5 * attack[home] / defence[away])
+    away_goals = rng.poisson(1.15 * attack[away] / defence[home])
+
+    team_ids = teams['team_id'].to_numpy()
+    names = teams['teamname'].to_numpy()
+    frame = pd.DataFrame({
+        'league_id': teams['league_id'].to_numpy()[home],
+        'hometeam_id': team_ids[home],
+        'awayteam_id': team_ids[away],
+        'hometeam_score': home_goals,
+        'awayteam_score': away_goals,
+        'date': dates,
+        'match_location': pd.Series(names[home]) + " Stadium",
+    })
+    # Drawn for every fixture first, so played matches do not depend on --as-of
+    frame = frame[frame['date'] <= np.datetime64(config.as_of)]
+    frame = frame.sort_values(['date', 'league_id', 'hometeam_id'], kind='stable', ignore_index=True)
+    frame.insert(0, 'match_id', np.arange(1, len(frame) + 1))
+    return frame
+
+
+########## Statistics #################
+def generate_statistics(rng, config, matches):
+    """Yields statistics frames for batches of MATCH_BATCH played matches."""
+    per_team, lineup = config.players_per_team, min(config.stats_per_match // 2, config.players_per_team)
+    slots = np.resize(POSITIONS, per_team)
+    goal_weight, assist_weight, pass_mean = (np.array([POSITION_PROFILE[p][i] for p in slots]) for i in range(3))
+    # Gumbel top-k: drawing k slots with these weights without replacement, all rows at once
+    log_weight = np.log(np.where(np.arange(per_team) < len(POSITIONS), 6.0, 1.0))
+
+    for start in range(0, len(matches), MATCH_BATCH):
+        batch = matches.iloc[start:start + MATCH_BATCH]
+        # One row per side: home sides then away sides
+        match_ids = np.tile(batch['match_id'].to_numpy(), 2)
+        team_ids = np.concatenate((batch['hometeam_id'].to_numpy(), batch['awayteam_id'].to_numpy()))
+        scored = np.concatenate((batch['hometeam_score'].to_numpy(), batch['awayteam_score'].to_numpy()))
+        sides = len(match_ids)
+
+        keys = log_weight + rng.gumbel(size=(sides, per_team))
+        chosen = np.argpartition(-keys, lineup - 1, axis=1)[:, :lineup]
+
+        goal_p = goal_weight[chosen]
+        goals = rng.multinomial(scored, goal_p / goal_p.sum(axis=1, keepdims=True))
+        assist_p = assist_weight[chosen]
+        assists = rng.multinomial(rng.binomial(scored, 0.7), assist_p / assist_p.sum(axis=1, keepdims=True))
+        pass_acc = np.clip(rng.normal(pass_mean[chosen], 5.0), 40, 99).round(2)
+        keeper = slots[chosen] == 'GK'
+        playtime = np.where(keeper | (rng.random(chosen.shape) < 0.8), 90, rng.integers(46, 90, chosen.shape))
+
+        yield pd.DataFrame({
+            'match_id': np.repeat(match_ids, lineup),
+            'player_id': ((team_ids - 1) * per_team)[:, None].repeat(lineup, axis=1).ravel() + chosen.ravel() + 1,
+            'goal': goals.ravel(),
+            'pass_acc': pass_acc.ravel(),
+            'assist': assists.ravel(),
+            'playtime': playtime.ravel(),
+        })
+
+
+########## Users and favorites #################
+def generate_users(rng, config, first):
+    user_ids = np.arange(1, config.users + 1)
+    usernames = pd.Series(rng.choice(first, config.users)).str.lower() + pd.Series(user_ids).astype(str)
+    return pd.DataFrame({
+        'user_id': user_ids,
+        'username': usernames,
+        'password': pd.Series(rng.integers(0, 2 ** 62, config.users)).map('{:016x}'.format),
+        'email': usernames + "@example.com",
+        'role_id': np.where(rng.random(config.users) < 0.001, 1, 2),
+    })
+
+
+def generate_favorites(rng, config, column, ids, per_user):
+    counts = rng.poisson(per_user, config.users)
+    # Zipf popularity over a random ranking of the ids
+    popularity = 1.0 / np.arange(1, len(ids) + 1) ** 1.1
+    ranked = rng.permutation(ids)
+    frame = pd.DataFrame({
+        'user_id': np.repeat(np.arange(1, config.users + 1), counts),
+        column: rng.choice(ranked, counts.sum(), p=popularity / popularity.sum()),
+    }).drop_duplicates(ignore_index=True)
+    frame['dateAdded'] = np.datetime64(config.as_of) - rng.integers(0, 730, len(frame)).astype('timedelta64[D]')
+    return frame
+
+
+def generate(config):
+    """Write the dataset described by `config` (the parsed CLI options) and return rows written per table."""
+    os.makedirs(config.out_dir, exist_ok=True)
+    if config.first_season is None:
+        config.first_season = config.current_season - config.seasons + 1
+    # Independent streams per table: changing --users does not change the fixtures
+    clubs_rng, players_rng, matches_rng, stats_rng, users_rng, favorites_rng = (
+        np.random.default_rng(seed) for seed in np.random.SeedSequence(config.seed).spawn(6))
+
+    countries = pd.read_csv(os.path.join(HERE, 'sample_country.csv'))
+    country_ids = countries['country_id'].to_numpy()
+    first, last = name_pools()
+
+    def write(name, frames):
+        writer = ChunkWriter(config.out_dir, name, config.format, config.chunk_rows)
+        started = time.perf_counter()
+        for frame in frames:
+            writer.write(frame)
+        rows = writer.close()
+        print(f"{name}: {rows:,} rows in {writer.parts} file(s), {time.perf_counter() - started:.1f}s")
+        return rows
+
+    leagues, teams = generate_clubs(clubs_rng, config, country_ids)
+    config.league_country = dict(zip(leagues['league_id'], leagues['league_nationality_id']))
+    counts = {'Leagues': write('sample_league', [leagues]), 'Teams': write('sample_team', [teams])}
+    if config.players_per_team:
+        players = generate_players(players_rng, config, teams, country_ids, first, last)
+        counts['Players'] = write('sample_player', [players])
+    matches = generate_matches(matches_rng, config, teams)
+    if matches.empty:
+        raise ValueError(f"no fixtures on or before --as-of {config.as_of}: use a later date or earlier seasons")
+    counts['Matches'] = write('sample_game', [matches.assign(date=matches['date'].dt.strftime('%Y-%m-%d'))])
+    if config.players_per_team and config.stats_per_match:
+        counts['Statistics'] = write('sample_statistics', generate_statistics(stats_rng, config, matches))
+    if config.users:
+        counts['Users'] = write('sample_app_user', [generate_users(users_rng, config, first)])
+        counts['FavoriteTeams'] = write('sample_favoriteteams', [
+            generate_favorites(favorites_rng, config, 'team_id', teams['team_id'].to_numpy(), config.favorite_teams)])
+        if config.players_per_team:
+            counts['FavoritePlayers'] = write('sample_favoriteplayers', [generate_favorites(
+                favorites_rng, config, 'player_id', players['player_id'].to_numpy(), config.favorite_players)])
+
+    # Reference data is reused as is
+    if os.path.abspath(config.out_dir) != HERE:
+        for name in ('sample_role.csv', 'sample_country.csv'):
+            shutil.copy(os.path.join(HERE, name), os.path.join(config.out_dir, name))
+    return counts
+
+
+def parser():
+    current_season = date.today().year - (date.today().month < 7)
+    parser = argparse.ArgumentParser(description="Generate a production-size synthetic dataset for bulk_load.py.")
+    parser.add_argument("--out-dir", required=True, help="directory the files are written to")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--leagues", type=int, default=10)
+    parser.add_argument("--teams-per-league", type=int, default=20)
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--first-season", type=int, help="defaults to the season making the last one current")
+    parser.add_argument("--players-per-team", type=int, default=25)
+    parser.add_argument("--stats-per-match", type=int, default=22, help="statistics rows per match (split over both teams)")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--favorite-teams", type=float, default=2.0, help="mean favorite teams per user")
+    parser.add_argument("--favorite-players", type=float, default=4.0, help="mean favorite players per user")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(),
+                        help="only matches up to this date are generated (YYYY-MM-DD, default today)")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows per output file")
+    parser.set_defaults(current_season=current_season)
+    return parser
+
+
+if __name__ == '__main__':
+    arg_parser = parser()
+    config = arg_parser.parse_args()
+    if config.format == "parquet" and pyarrow is None:
+        arg_parser.error("--format parquet needs pyarrow installed")
+    started = time.perf_counter()
+    generate(config)
+    print(f"Dataset written to {config.out_dir} in {time.perf_counter() - started:.1f}s")
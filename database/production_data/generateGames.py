@@ -1,37 +1,96 @@
-import pandas as pd
+import argparse
+import os
 import random
 from datetime import datetime, timedelta
 
-# Load team data
-teams = pd.read_csv('sample_team.csv')
+import pandas as pd
+
+import generateDataset
+
+# Generates the match fixtures (sample_game.csv).
+#
+# Without options it keeps the original behaviour: every team in sample_team.csv plays
+# every other team of its league once, one match per day from today.
+#
+# With --leagues it instead hands over to generateDataset.py, which synthesizes a scaled
+# dataset (leagues, fixtures, players, statistics, users and favorites) for benchmarking:
+#   python generateGames.py --leagues 10 --teams-per-league 20 --seasons 5 \
+#       --players-per-team 25 --stats-per-match 22 --out-dir /tmp/bench_data
+#   python ../bulk_load.py --data-dir /tmp/bench_data
+# See generateDataset.py for the full set of options (users, favorites, Parquet output).
 
-matches = []
-match_id = 1
-base_date = datetime.now()
+HERE = os.path.dirname(os.path.abspath(__file__))
 
-# Iterate through each league
-for league_id in teams['league_id'].unique():
-    league_teams = teams[teams['league_id'] == league_id]
 
-    # Generate all unique matches within the league (excluding self-match)
-    for i, home_team in league_teams.iterrows():
-        for j, away_team in league_teams.iterrows():
-            if home_team['team_id'] != away_team['team_id']:
-                match = {
+def round_robin(teams, league_id, match_id, base_date):
+    # Original fixture list: every ordered pair once, one match per day
+    matches = []
+    for home in teams:
+        for away in teams:
+            if home['team_id'] != away['team_id']:
+                matches.append({
                     'match_id': match_id,
                     'league_id': league_id,
-                    'hometeam_id': home_team['team_id'],
-                    'awayteam_id': away_team['team_id'],
+                    'hometeam_id': home['team_id'],
+                    'awayteam_id': away['team_id'],
                     'hometeam_score': random.randint(0, 5),
                     'awayteam_score': random.randint(0, 5),
                     'date': (base_date + timedelta(days=match_id)).strftime('%Y/%m/%d'),
-                    'match_location': home_team['teamname'] + " Stadium"
-                }
-                matches.append(match)
+                    'match_location': home['teamname'] + " Stadium"
+                })
                 match_id += 1
+    return matches, match_id
+
+
+def generate_scaled(args):
+    # Scaled datasets come from the vectorized generator, these options map onto its own
+    options = ["--out-dir", args.out_dir, "--leagues", str(args.leagues),
+               "--teams-per-league", str(args.teams_per_league), "--seasons", str(args.seasons),
+               "--first-season", str(args.first_season), "--players-per-team", str(args.players_per_team),
+               "--stats-per-match", str(args.stats_per_match)]
+    if args.seed is not None:
+        options += ["--seed", str(args.seed)]
+    generateDataset.generate(generateDataset.parser().parse_args(options))
+
+
+def generate_default(args):
+    # Load team data
+    teams = pd.read_csv(os.path.join(HERE, 'sample_team.csv'))
+
+    matches = []
+    match_id = 1
+    base_date = datetime.now()
+
+    # Iterate through each league
+    for league_id in teams['league_id'].unique():
+        league_teams = teams[teams['league_id'] == league_id].to_dict('records')
+        # Generate all unique matches within the league (excluding self-match)
+        league_matches, match_id = round_robin(league_teams, league_id, match_id, base_date)
+        matches.extend(league_matches)
+
+    # Create DataFrame and export to CSV
+    matches_df = pd.DataFrame(matches)
+    matches_df.to_csv(os.path.join(args.out_dir, 'sample_game.csv'), index=False)
+
+    print('sample_game.csv generated successfully.')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate match fixtures (and scaled benchmark datasets).")
+    parser.add_argument("--out-dir", default=HERE, help="directory the CSV files are written to")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible output")
+    parser.add_argument("--leagues", type=int, default=0, help="synthesize this many leagues instead of using sample_team.csv")
+    parser.add_argument("--teams-per-league", type=int, default=20)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--first-season", type=int, default=datetime.now().year - 1)
+    parser.add_argument("--players-per-team", type=int, default=0)
+    parser.add_argument("--stats-per-match", type=int, default=0, help="statistics rows per match (split over both teams)")
+    args = parser.parse_args()
 
-# Create DataFrame and export to CSV
-matches_df = pd.DataFrame(matches)
-matches_df.to_csv('sample_game.csv', index=False)
+    if args.seed is not None:
+        random.seed(args.seed)
 
-print('sample_game.csv generated successfully.')
\ No newline at end of file
+    if args.leagues:
+        generate_scaled(args)
+    else:
+        generate_default(args)
@@ -0,0 +1,37 @@
+import mysql.connector
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Recomputes the trigger-maintained summary tables from the raw Matches/Statistics rows.
+# The triggers keep them current, so this is only needed after changes that bypass
+# them (e.g. FK cascades when a team or league is deleted).
+# (procedure, summary table)
+AGGREGATES = [
+    ('RebuildTeamStandings', 'TeamStandings'),
+    ('RebuildPlayerSeasonTotals', 'PlayerSeasonTotals'),
+    ('RebuildPlayerForm', 'PlayerForm'),
+    ('RebuildTeamMatches', 'TeamMatches'),
+]
+
+connection = mysql.connector.connect(
+    host=os.getenv('DB_HOST', 'localhost'),
+    database=os.getenv('DB_NAME', 'soccer_app'),
+    user=os.getenv('DB_USER'),
+    password=os.getenv('DB_PASSWORD')
+)
+
+cursor = connection.cursor()
+
+for procedure, table in AGGREGATES:
+    try:
+        cursor.callproc(procedure)
+        connection.commit()
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        print(f"{table} rebuilt successfully! ({cursor.fetchone()[0]} rows)")
+    except mysql.connector.Error as err:
+        print(f"{table} Rebuild Error:", err)
+
+cursor.close()
+connection.close()
@@ -0,0 +1,32 @@
+import api from './api';
+
+// Favorites, notifications and recent games for one user in a single request.
+// fields: optional array, e.g. ['notifications', 'recent_games']
+export const fetchDashboard = async (userId, fields = null, league = null) => {
+    try {
+        const params = {};
+        if (fields) params.fields = fields.join(',');
+        if (league) params.league = league;
+        const response = await api.get(`/dashboard/${userId}`, { params });
+        return response.data;
+    } catch (error) {
+        console.error('Error fetching dashboard:', error);
+        throw error.response ? error.response.data : { message: 'An unexpected error occurred' };
+    }
+};
+
+// Favorites and notifications of the signed-in user. Components mounting together (the
+// notification bell and a favorites view) share one in-flight request.
+let shared = null;
+
+export const fetchUserDashboard = (userId) => {
+    if (!shared || shared.userId !== userId) {
+        const request = fetchDashboard(userId, ['favorite_teams', 'favorite_players', 'notifications']);
+        shared = { userId, request };
+        const done = () => {
+            if (shared && shared.request === request) shared = null;
+        };
+        request.then(done, done);
+    }
+    return shared.request;
+};
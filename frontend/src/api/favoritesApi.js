@@ -1,61 +1,35 @@
 import api from './api';
 
-export const fetchFavoriteTeams = async (userId) => {
-    try {
-        const response = await api.get('/favorite/team/view', { params: { userid: userId } });
-        return response.data;
-    } catch (error) {
-        console.error('Error fetching favorite teams:', error);
-        throw error.response ? error.response.data : { message: 'An unexpected error occurred' };
-    }
-};
-
-export const fetchFavoritePlayers = async (userId) => {
-    try {
-        const response = await api.get('/favorite/player/view', { params: { userid: userId } });
-        return response.data;
-    } catch (error) {
-        console.error('Error fetching favorite players:', error);
-        throw error.response ? error.response.data : { message: 'An unexpected error occurred' };
-    }
+// Add (favorite = true) or remove one favorite; the backend takes lists of ids
+const updateFavorites = async (kind, userId, ids, favorite) => {
+    const config = { params: { userid: userId } };
+    const response = favorite
+        ? await api.put(`/favorite/${kind}`, { ids }, config)
+        : await api.delete(`/favorite/${kind}`, { ...config, data: { ids } });
+    return response.data;
 };
 
-export const modifyFavoriteTeam = async (userId, teamId) => {
+export const saveFavoriteTeam = async (userId, teamId, favorite) => {
     try {
-        const response = await api.get('/favorite/team/add', { 
-        params: { 
-            userid: userId,
-            teamid: teamId 
-        } 
-        });
-        return response.data;
+        return await updateFavorites('team', userId, [Number(teamId)], favorite);
     } catch (error) {
         console.error('Error modifying favorite team:', error);
         throw error.response ? error.response.data : { message: 'An unexpected error occurred' };
     }
 };
 
-export const modifyFavoritePlayer = async (userId, playerId) => {
+export const saveFavoritePlayer = async (userId, playerId, favorite) => {
     try {
-        const response = await api.get('/favorite/player/add', { 
-        params: { 
-            userid: userId,
-            playerid: playerId 
-        } 
-        });
-        return response.data;
+        return await updateFavorites('player', userId, [Number(playerId)], favorite);
     } catch (error) {
         console.error('Error modifying favorite player:', error);
         throw error.response ? error.response.data : { message: 'An unexpected error occurred' };
     }
 };
 
-export const fetchNotifications = async (userId) => {
-    try {
-        const response = await api.get(`/notifications/${userId}`);
-        return response.data;
-    } catch (error) {
-        console.error('Error fetching notifications:', error);
-        throw error.response ? error.response.data : { message: 'An unexpected error occurred' };
-    }
+// Live notifications over Server-Sent Events; returns the EventSource so callers can close it
+export const subscribeNotifications = (userId, onNotification) => {
+    const source = new EventSource(`${api.defaults.baseURL}/events/${userId}`);
+    source.addEventListener('notification', (event) => onNotification(JSON.parse(event.data)));
+    return source;
 };
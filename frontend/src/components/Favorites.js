@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { modifyFavoriteTeam, modifyFavoritePlayer } from '../api/favoritesApi';
+import { saveFavoriteTeam, saveFavoritePlayer } from '../api/favoritesApi';
 import { getUserId, fetchUserFavorites, requireAuth } from '../utils/authUtils';
 import './Favorites.css';
 import ConfirmModal from './ConfirmModal';
@@ -74,10 +74,10 @@ const Favorites = () => {
 
         try {
             if (modalState.isTeam) {
-                await modifyFavoriteTeam(userId, modalState.itemToRemove);
+                await saveFavoriteTeam(userId, modalState.itemToRemove, false);
                 setFavoriteTeams(teams => teams.filter(team => team.team_id !== modalState.itemToRemove));
             } else {
-                await modifyFavoritePlayer(userId, modalState.itemToRemove);
+                await saveFavoritePlayer(userId, modalState.itemToRemove, false);
                 setFavoritePlayers(players => players.filter(player => player.player_id !== modalState.itemToRemove));
             }
         } catch (err) {
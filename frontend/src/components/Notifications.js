@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useRef } from 'react';
-import { fetchNotifications } from '../api/favoritesApi';
+import { subscribeNotifications } from '../api/favoritesApi';
+import { fetchUserDashboard } from '../api/dashboardApi';
 import { getUserId } from '../utils/authUtils';
 import './Notifications.css';
 
@@ -13,6 +14,13 @@ const Notifications = () => {
     const userId = getUserId();
     if (userId) {
       getNotifications(userId);
+
+      // New notifications are pushed by the server instead of re-fetching the list
+      const source = subscribeNotifications(userId, (notification) => {
+        setNotifications((previous) => [notification, ...previous].slice(0, 20));
+        setUnreadCount((count) => count + 1);
+      });
+      return () => source.close();
     }
   }, []);
 
@@ -31,7 +39,7 @@ const Notifications = () => {
 
   const getNotifications = async (userId) => {
     try {
-      const data = await fetchNotifications(userId);
+      const data = (await fetchUserDashboard(userId)).notifications || [];
       setNotifications(data);
 
       setUnreadCount(data.length > 0 ? data.length : 0);
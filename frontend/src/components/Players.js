@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { getPlayers, searchPlayers } from '../api/playersApi';
-import { modifyFavoritePlayer } from '../api/favoritesApi';
+import { saveFavoritePlayer } from '../api/favoritesApi';
 import ReactCountryFlag from 'react-country-flag';
 import nationalityToCode from '../utils/nationalityToCode';
 import { getUserId, fetchUserFavorites, requireAuth } from '../utils/authUtils';
@@ -115,7 +115,7 @@ const Players = () => {
   const handleFavoritePlayer = async (playerId) => {
     try {
       const userId = requireAuth();
-      await modifyFavoritePlayer(userId, playerId);
+      await saveFavoritePlayer(userId, playerId, !favoritePlayers.has(playerId));
       setFavoritePlayers(prev => {
         const newSet = new Set(prev);
         if (newSet.has(playerId)) {
@@ -133,7 +133,7 @@ const Players = () => {
   // const handleFavoriteTeam = async (teamId) => {
   //   try {
   //     const userId = requireAuth();
-  //     await modifyFavoriteTeam(userId, teamId);
+  //     await saveFavoriteTeam(userId, teamId, !favoriteTeams.has(teamId));
   //     setFavoriteTeams(prev => {
   //       const newSet = new Set(prev);
   //       if (newSet.has(teamId)) {
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate, useLocation } from 'react-router-dom'; // Add useLocation
 import FavoriteButton from './FavoriteButton';
 import { getTeamDetails } from '../api/teamStatsApi';
-import { modifyFavoriteTeam, modifyFavoritePlayer } from '../api/favoritesApi';
+import { saveFavoriteTeam, saveFavoritePlayer } from '../api/favoritesApi';
 import { getUserId, fetchUserFavorites, requireAuth } from '../utils/authUtils';
 import './TeamDetails.css';
 
@@ -19,7 +19,7 @@ const TeamDetails = () => {
   const handleFavoriteTeam = async () => {
     try {
       const userId = requireAuth();
-      await modifyFavoriteTeam(userId, teamId);
+      await saveFavoriteTeam(userId, teamId, !favoriteTeam);
       setFavoriteTeam(!favoriteTeam);
     } catch (error) {
       console.error('Error modifying favorite team:', error);
@@ -29,7 +29,7 @@ const TeamDetails = () => {
   const handleFavoritePlayer = async (playerId) => {
     try {
       const userId = requireAuth();
-      await modifyFavoritePlayer(userId, playerId);
+      await saveFavoritePlayer(userId, playerId, !favoritePlayers.has(playerId));
       setFavoritePlayers(prev => {
         const newSet = new Set(prev);
         if (newSet.has(playerId)) {
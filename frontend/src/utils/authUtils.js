@@ -1,4 +1,4 @@
-import { fetchFavoritePlayers, fetchFavoriteTeams } from '../api/favoritesApi';
+import { fetchUserDashboard } from '../api/dashboardApi';
 
 export const getUserId = () => {
     const userCookie = document.cookie
@@ -28,13 +28,10 @@ export const fetchUserFavorites = async () => {
     }
 
     try {
-        const [teams, players] = await Promise.all([
-            fetchFavoriteTeams(userId),
-            fetchFavoritePlayers(userId)
-        ]);
+        const dashboard = await fetchUserDashboard(userId);
         return {
-            teams: teams || [],
-            players: players || []
+            teams: dashboard.favorite_teams || [],
+            players: dashboard.favorite_players || []
         };
     } catch (error) {
         console.error('Error fetching favorites:', error);